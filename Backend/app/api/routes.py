@@ -1,99 +1,213 @@
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Depends
-from typing import List, Optional
-from datetime import datetime
-from ..models import ImageResponse, ScrapeRequest, ScrapeResponse, StatsResponse
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from ..cache import image_cache
+from ..config import settings
+from ..models import (
+    IMAGE_FIELDS, COMPACT_IMAGE_FIELDS, ImageBatchRequest, ImageBatchResponse, ImageFacetsResponse, ImageResponse,
+    ScrapeRequest, ScrapeResponse, StatsResponse, SuggestResponse
+)
 from ..database import db
-from ..scraper.selenium_scraper import SeleniumScraper
-import uuid
-import logging
+from ..jobs import CANCELLED, FINISHED_STATES, job_store, scrape_dedupe_key
+from ..responses import FastJSONResponse, cached_json_response, dumps
+from ..scheduler import PRIORITIES, QueueFullError, admit, client_id_for
+from ..suggest import suggestions
 import asyncio
+import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory task storage (replace with Redis in production)
-scraping_tasks = {}
-
-# Task cleanup after 1 hour
-TASK_CLEANUP_DELAY = 3600  # 1 hour in seconds
-
 async def get_db():
     return db
 
-async def cleanup_task(task_id: str):
-    await asyncio.sleep(TASK_CLEANUP_DELAY)
-    if task_id in scraping_tasks:
-        del scraping_tasks[task_id]
-        logger.info(f"Cleaned up task {task_id}")
+async def get_job_store():
+    return job_store
+
+def resolve_fields(fields: Optional[str], compact: bool) -> Optional[List[str]]:
+    """Projection for the ``fields`` and ``compact`` query parameters ("id" is an alias of "_id")"""
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        requested = ["_id" if f == "id" else f for f in requested]
+        invalid = [f for f in requested if f not in IMAGE_FIELDS]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(invalid)}")
+        return ["_id"] + [f for f in dict.fromkeys(requested) if f != "_id"]
+    if compact:
+        return COMPACT_IMAGE_FIELDS
+    return None
+
+# Serializes the find-or-enqueue step per request key within this process;
+# entries are [lock, number of requests using it] and dropped when unused
+scrape_key_locks: Dict[str, list] = {}
 
 @router.post("/scrape", response_model=ScrapeResponse)
-async def start_scraping(
-    request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
-    db=Depends(get_db)
-):
-    task_id = str(uuid.uuid4())
-    
-    async def scrape_task():
-        try:
-            scraper = SeleniumScraper()
-            images_data = await scraper.scrape_images(
-                url=request.url,
-                category=request.category,
-                max_images=request.max_images
+async def start_scraping(request: ScrapeRequest, http_request: Request, job_store=Depends(get_job_store)):
+    request_data = request.dict()
+    client_id = client_id_for(http_request)
+    dedupe_key = scrape_dedupe_key(request_data)
+    entry = scrape_key_locks.setdefault(dedupe_key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    lock = entry[0]
+    try:
+        async with lock:
+            # Attach to an in-flight job, or reuse a recent one, for the same request
+            fresh_after = datetime.utcnow() - timedelta(seconds=settings.SCRAPE_REUSE_WINDOW)
+            job = await job_store.find_reusable(dedupe_key, request.max_images, fresh_after)
+            if job is not None:
+                logger.info(f"Coalesced scrape request for '{request.category}' into task {job['task_id']}")
+                return ScrapeResponse(
+                    task_id=job["task_id"],
+                    status=job["status"],
+                    message=job["message"],
+                    coalesced=True,
+                    queue_position=await job_store.queue_position(job)
+                )
+
+            await admit(job_store, client_id)
+            job = await job_store.enqueue(
+                request_data,
+                message=f"Download queued for category '{request.category}'",
+                client_id=client_id,
+                priority=PRIORITIES[request.priority]
             )
-            
-            if not images_data:
-                scraping_tasks[task_id] = {
-                    "status": "failed",
-                    "message": f"No images found for category '{request.category}'"
-                }
-                return
-            
-            # Save images to database
-            saved_count = 0
-            for image_data in images_data:
-                try:
-                    await db.create_image(image_data)
-                    saved_count += 1
-                except Exception as e:
-                    logger.error(f"Error saving image: {str(e)}")
-                    continue
-            
-            if saved_count > 0:
-                scraping_tasks[task_id] = {
-                    "status": "completed",
-                    "message": f"Successfully downloaded {saved_count} images for category '{request.category}'"
-                }
-            else:
-                scraping_tasks[task_id] = {
-                    "status": "failed",
-                    "message": "Failed to save any images"
-                }
-        except Exception as e:
-            logger.error(f"Error in scrape task: {str(e)}")
-            scraping_tasks[task_id] = {
-                "status": "failed",
-                "message": f"Error: {str(e)}"
-            }
-        finally:
-            # Schedule task cleanup
-            asyncio.create_task(cleanup_task(task_id))
-    
-    background_tasks.add_task(scrape_task)
-    scraping_tasks[task_id] = {
-        "status": "running",
-        "message": f"Download started for category '{request.category}'"
-    }
+            queue_position = await job_store.queue_position(job)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.error(f"Error queueing scrape job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to queue scrape job")
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            scrape_key_locks.pop(dedupe_key, None)
     
     return ScrapeResponse(
-        task_id=task_id,
-        status="running",
-        message=f"Download task started for category '{request.category}'"
+        task_id=job["task_id"],
+        status=job["status"],
+        message=f"Download task queued for category '{request.category}'",
+        queue_position=queue_position
     )
 
-@router.get("/images", response_model=List[ImageResponse])
+def image_query_params(
+    search: Optional[str],
+    source: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    sort_by: str,
+    sort_order: str,
+    category: Optional[str]
+) -> Dict[str, Any]:
+    """Normalize the filter and sort query parameters of the image listing endpoints"""
+    # Convert sort_by to match database field
+    sort_mapping = {
+        "newest": "scraped_at",
+        "oldest": "scraped_at",
+        "a-z": "title",
+        "popular": "views",
+        "downloads": "downloads"
+    }
+    db_sort_by = sort_mapping.get(sort_by, "scraped_at")
+    
+    # Convert sort_order to string format
+    if sort_order in ["1", "-1"]:
+        sort_order = "asc" if sort_order == "1" else "desc"
+    elif sort_order.lower() not in ["asc", "desc"]:
+        sort_order = "desc"  # Default to desc if invalid
+    
+    # Convert dates to ISO format if provided
+    if date_from:
+        try:
+            date_from = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
+        except ValueError:
+            logger.warning(f"Invalid date_from format: {date_from}")
+            date_from = None
+    if date_to:
+        try:
+            date_to = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
+        except ValueError:
+            logger.warning(f"Invalid date_to format: {date_to}")
+            date_to = None
+
+    # Expanded valid_categories to include all main categories, subcategories, and related terms
+    valid_categories = [
+        "all", "editorial", "wallpapers", "3d", "nature", "architecture",
+        "people", "film", "travel", "animals", "food", "technology",
+        "business", "sports", "art", "fashion", "music", "education",
+        "health", "automotive", "abstract", "other",
+        # sports
+        "football", "soccer", "basketball", "tennis", "golf", "baseball",
+        "cricket", "rugby", "hockey", "volleyball", "swimming", "athletics",
+        "boxing", "martial arts", "wrestling", "gymnastics", "cycling",
+        "racing", "surfing", "skiing", "snowboarding", "skateboarding",
+        "fitness", "exercise", "athletic", "game", "competition", "sport",
+        # nature
+        "landscape", "mountains", "forest", "ocean", "beach", "sunset",
+        "wildlife", "flowers", "garden", "plants", "trees", "waterfall",
+        "outdoors", "environment", "natural", "scenic",
+        # technology
+        "computer", "smartphone", "robot", "ai", "gadget", "electronics",
+        "software", "hardware", "internet", "data", "cybersecurity",
+        "digital", "innovation", "tech", "modern",
+        # business
+        "office", "meeting", "presentation", "startup", "entrepreneur",
+        "corporate", "finance", "marketing", "team", "workplace",
+        "professional", "work", "career", "industry",
+        # art
+        "painting", "sculpture", "drawing", "illustration", "digital art",
+        "gallery", "museum", "exhibition", "artist", "creative",
+        "design", "artistic", "visual",
+        # fashion
+        "clothing", "accessories", "runway", "model", "style", "designer",
+        "fashion show", "outfit", "trend", "luxury", "apparel", "wear", "trendy",
+        # music
+        "concert", "band", "musician", "instrument", "performance",
+        "studio", "recording", "sound", "dj", "festival", "audio", "melody", "rhythm", "song",
+        # education
+        "school", "university", "classroom", "student", "teacher",
+        "learning", "study", "campus", "library", "research", "academic", "teaching", "knowledge", "training",
+        # health
+        "wellness", "medical", "doctor", "hospital", "healthcare", "yoga", "meditation", "nutrition",
+        # automotive
+        "car", "vehicle", "automobile", "transportation", "driving", "road", "highway", "motorcycle", "luxury car", "transport",
+        # abstract
+        "pattern", "texture", "background", "minimal", "geometric", "shape", "form", "color",
+        # editorial
+        "magazine", "cover", "story", "feature", "journalism", "press", "media", "publication", "article", "news",
+        # film
+        "movie", "cinema", "theater", "actor", "actress", "director", "scene", "set", "production", "hollywood",
+        # 3d
+        "3d-rendering", "3d-model", "3d-art", "animation", "cg", "computer-graphics", "virtual", "simulation", "3d-design",
+        # architecture
+        "building", "city", "urban", "interior", "house", "apartment", "structure", "construction",
+        # people
+        "portrait", "person", "human", "face", "lifestyle", "beauty", "family", "friends",
+        # animals
+        "pet", "dog", "cat", "bird", "mammal", "reptile", "fish", "insect", "zoo", "creature",
+        # food
+        "meal", "restaurant", "cooking", "recipe", "cuisine", "dessert", "breakfast", "lunch", "dinner", "snack", "dining",
+        # travel
+        "vacation", "tourism", "destination", "journey", "adventure", "explore", "trip", "holiday", "backpacking", "roadtrip",
+    ]
+    if category and category.lower() not in valid_categories:
+        logger.warning(f"Invalid category: {category}")
+        category = None
+
+    query_params = {
+        "search": search,
+        "source": source,
+        "date_from": date_from,
+        "date_to": date_to,
+        "sort_by": db_sort_by,
+        "sort_order": sort_order.lower(),  # Ensure lowercase
+        "category": category.lower() if category else None
+    }
+    return query_params
+
+@router.get("/images", response_model=List[ImageResponse], response_class=FastJSONResponse)
 async def get_images(
+    http_request: Request,
     search: Optional[str] = None,
     source: Optional[str] = None,
     date_from: Optional[str] = None,
@@ -103,164 +217,209 @@ async def get_images(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=1000, description="Number of images per page (1-1000)"),
     category: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    compact: bool = Query(False, description="Return only the fields the gallery grid needs"),
     db=Depends(get_db)
 ):
     try:
-        # Convert sort_by to match database field
-        sort_mapping = {
-            "newest": "scraped_at",
-            "oldest": "scraped_at",
-            "a-z": "title",
-            "popular": "views",
-            "downloads": "downloads"
-        }
-        db_sort_by = sort_mapping.get(sort_by, "scraped_at")
-        
-        # Convert sort_order to string format
-        if sort_order in ["1", "-1"]:
-            sort_order = "asc" if sort_order == "1" else "desc"
-        elif sort_order.lower() not in ["asc", "desc"]:
-            sort_order = "desc"  # Default to desc if invalid
-        
-        # Convert dates to ISO format if provided
-        if date_from:
-            try:
-                date_from = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            except ValueError:
-                logger.warning(f"Invalid date_from format: {date_from}")
-                date_from = None
-        if date_to:
-            try:
-                date_to = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            except ValueError:
-                logger.warning(f"Invalid date_to format: {date_to}")
-                date_to = None
+        selected_fields = resolve_fields(fields, compact)
 
-        # Expanded valid_categories to include all main categories, subcategories, and related terms
-        valid_categories = [
-            "all", "editorial", "wallpapers", "3d", "nature", "architecture",
-            "people", "film", "travel", "animals", "food", "technology",
-            "business", "sports", "art", "fashion", "music", "education",
-            "health", "automotive", "abstract", "other",
-            # sports
-            "football", "soccer", "basketball", "tennis", "golf", "baseball",
-            "cricket", "rugby", "hockey", "volleyball", "swimming", "athletics",
-            "boxing", "martial arts", "wrestling", "gymnastics", "cycling",
-            "racing", "surfing", "skiing", "snowboarding", "skateboarding",
-            "fitness", "exercise", "athletic", "game", "competition", "sport",
-            # nature
-            "landscape", "mountains", "forest", "ocean", "beach", "sunset",
-            "wildlife", "flowers", "garden", "plants", "trees", "waterfall",
-            "outdoors", "environment", "natural", "scenic",
-            # technology
-            "computer", "smartphone", "robot", "ai", "gadget", "electronics",
-            "software", "hardware", "internet", "data", "cybersecurity",
-            "digital", "innovation", "tech", "modern",
-            # business
-            "office", "meeting", "presentation", "startup", "entrepreneur",
-            "corporate", "finance", "marketing", "team", "workplace",
-            "professional", "work", "career", "industry",
-            # art
-            "painting", "sculpture", "drawing", "illustration", "digital art",
-            "gallery", "museum", "exhibition", "artist", "creative",
-            "design", "artistic", "visual",
-            # fashion
-            "clothing", "accessories", "runway", "model", "style", "designer",
-            "fashion show", "outfit", "trend", "luxury", "apparel", "wear", "trendy",
-            # music
-            "concert", "band", "musician", "instrument", "performance",
-            "studio", "recording", "sound", "dj", "festival", "audio", "melody", "rhythm", "song",
-            # education
-            "school", "university", "classroom", "student", "teacher",
-            "learning", "study", "campus", "library", "research", "academic", "teaching", "knowledge", "training",
-            # health
-            "wellness", "medical", "doctor", "hospital", "healthcare", "yoga", "meditation", "nutrition",
-            # automotive
-            "car", "vehicle", "automobile", "transportation", "driving", "road", "highway", "motorcycle", "luxury car", "transport",
-            # abstract
-            "pattern", "texture", "background", "minimal", "geometric", "shape", "form", "color",
-            # editorial
-            "magazine", "cover", "story", "feature", "journalism", "press", "media", "publication", "article", "news",
-            # film
-            "movie", "cinema", "theater", "actor", "actress", "director", "scene", "set", "production", "hollywood",
-            # 3d
-            "3d-rendering", "3d-model", "3d-art", "animation", "cg", "computer-graphics", "virtual", "simulation", "3d-design",
-            # architecture
-            "building", "city", "urban", "interior", "house", "apartment", "structure", "construction",
-            # people
-            "portrait", "person", "human", "face", "lifestyle", "beauty", "family", "friends",
-            # animals
-            "pet", "dog", "cat", "bird", "mammal", "reptile", "fish", "insect", "zoo", "creature",
-            # food
-            "meal", "restaurant", "cooking", "recipe", "cuisine", "dessert", "breakfast", "lunch", "dinner", "snack", "dining",
-            # travel
-            "vacation", "tourism", "destination", "journey", "adventure", "explore", "trip", "holiday", "backpacking", "roadtrip",
-        ]
-        if category and category.lower() not in valid_categories:
-            logger.warning(f"Invalid category: {category}")
-            category = None
+        query_params = image_query_params(search, source, date_from, date_to, sort_by, sort_order, category)
+        cache_scope = query_params["category"] or "all"
+        cache_params = {**query_params, "page": page, "limit": limit, "fields": selected_fields}
+        cached = await image_cache.get(cache_scope, cache_params)
+        if cached is not None:
+            return cached_json_response(http_request, cached, settings.CACHE_CONTROL_IMAGES, {"X-Cache": "HIT"})
 
         skip = (page - 1) * limit
-        images = await db.get_images(
-            skip=skip,
-            limit=limit,
-            search=search,
-            source=source,
-            date_from=date_from,
-            date_to=date_to,
-            sort_by=db_sort_by,
-            sort_order=sort_order.lower(),  # Ensure lowercase
-            category=category.lower() if category else None
-        )
+        images = await db.get_images(skip=skip, limit=limit, fields=selected_fields, **query_params)
         
         if not images and page > 1:
             # If no results on current page, try first page
-            images = await db.get_images(
-                skip=0,
-                limit=limit,
-                search=search,
-                source=source,
-                date_from=date_from,
-                date_to=date_to,
-                sort_by=db_sort_by,
-                sort_order=sort_order.lower(),  # Ensure lowercase
-                category=category.lower() if category else None
-            )
+            images = await db.get_images(skip=0, limit=limit, fields=selected_fields, **query_params)
             
-        return images
+        body = dumps(images)
+        await image_cache.set(cache_scope, cache_params, body)
+        return cached_json_response(http_request, body, settings.CACHE_CONTROL_IMAGES, {"X-Cache": "MISS"})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching images: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch images")
 
-@router.get("/images/{image_id}", response_model=ImageResponse)
-async def get_image(image_id: str, db=Depends(get_db)):
+@router.get("/images/facets", response_model=ImageFacetsResponse, response_class=FastJSONResponse)
+async def get_image_facets(
+    http_request: Request,
+    search: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort_by: str = Query("scraped_at", description="Field to sort by"),
+    sort_order: str = Query("desc", description="Sort order (asc, desc, 1, or -1)"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=1000, description="Number of images per page (1-1000)"),
+    category: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    compact: bool = Query(False, description="Return only the fields the gallery grid needs"),
+    facet_limit: int = Query(20, ge=1, le=100, description="Values returned per facet"),
+    db=Depends(get_db)
+):
+    """A page of images with category, source and tag counts for the same filters, in one query"""
+    try:
+        selected_fields = resolve_fields(fields, compact)
+        query_params = image_query_params(search, source, date_from, date_to, sort_by, sort_order, category)
+        cache_scope = query_params["category"] or "all"
+        cache_params = {
+            **query_params, "page": page, "limit": limit, "fields": selected_fields, "facets": facet_limit
+        }
+        cached = await image_cache.get(cache_scope, cache_params)
+        if cached is not None:
+            return cached_json_response(http_request, cached, settings.CACHE_CONTROL_IMAGES, {"X-Cache": "HIT"})
+
+        result = await db.get_image_facets(
+            skip=(page - 1) * limit,
+            limit=limit,
+            fields=selected_fields,
+            facet_limit=facet_limit,
+            **query_params
+        )
+        body = dumps(result)
+        await image_cache.set(cache_scope, cache_params, body)
+        return cached_json_response(http_request, body, settings.CACHE_CONTROL_IMAGES, {"X-Cache": "MISS"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching image facets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch image facets")
+
+@router.post("/images/batch", response_model=ImageBatchResponse, response_class=FastJSONResponse)
+async def get_images_batch(
+    request: ImageBatchRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    compact: bool = Query(False, description="Return only the fields the gallery grid needs"),
+    db=Depends(get_db)
+):
+    """Look up many images in one query, in request order, listing the IDs not found"""
+    if len(request.ids) > settings.IMAGES_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.IMAGES_BATCH_MAX_IDS} ids per request")
+    try:
+        images, missing = await db.get_images_by_ids(request.ids, fields=resolve_fields(fields, compact))
+        return FastJSONResponse({"images": images, "missing": missing})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching image batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch images")
+
+@router.get("/images/{image_id}", response_model=ImageResponse, response_class=FastJSONResponse)
+async def get_image(image_id: str, http_request: Request, db=Depends(get_db)):
     try:
         image = await db.get_image(image_id)
         if not image:
             raise HTTPException(status_code=404, detail="Image not found")
-        return image
+        return cached_json_response(http_request, dumps(image), settings.CACHE_CONTROL_IMAGE)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching image {image_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch image")
 
-@router.get("/stats", response_model=StatsResponse)
-async def get_stats(db=Depends(get_db)):
+@router.get("/stats", response_model=StatsResponse, response_class=FastJSONResponse)
+async def get_stats(http_request: Request, db=Depends(get_db)):
     try:
         stats = await db.get_stats()
-        return StatsResponse(**stats)
+        return cached_json_response(http_request, dumps(StatsResponse(**stats)), settings.CACHE_CONTROL_STATS)
     except Exception as e:
         logger.error(f"Error fetching stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch stats")
 
+@router.get("/suggest", response_model=SuggestResponse, response_class=FastJSONResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=settings.SUGGEST_MAX_RESULTS)
+):
+    """Search-as-you-type: most frequent titles, tags and categories starting with ``q``"""
+    # Served from the in-memory index; no database round trip
+    return FastJSONResponse({"query": q, "suggestions": suggestions.suggest(q, limit)})
+
 @router.get("/scrape/{task_id}", response_model=ScrapeResponse)
-async def get_scrape_status(task_id: str):
-    if task_id not in scraping_tasks:
+async def get_scrape_status(task_id: str, job_store=Depends(get_job_store)):
+    task = await job_store.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    task = scraping_tasks[task_id]
     return ScrapeResponse(
         task_id=task_id,
         status=task["status"],
-        message=task["message"]
-    ) 
\ No newline at end of file
+        message=task["message"],
+        queue_position=await job_store.queue_position(task)
+    )
+
+@router.delete("/scrape/{task_id}", response_model=ScrapeResponse)
+async def cancel_scrape(task_id: str, job_store=Depends(get_job_store)):
+    """Cancel a scrape job; a running job stops promptly and keeps the images saved so far"""
+    task = await job_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] not in FINISHED_STATES:
+        task = await job_store.cancel(task_id)
+        if task["status"] == CANCELLED:
+            # Never started: no worker will report it, so end its event stream here
+            await job_store.add_events(task_id, [{
+                "type": "status",
+                "data": {"status": task["status"], "message": task["message"]}
+            }])
+    return ScrapeResponse(task_id=task_id, status=task["status"], message=task["message"])
+
+def format_sse(event_id: Optional[str], event_type: str, data) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {dumps(data).decode()}")
+    return "\n".join(lines) + "\n\n"
+
+@router.get("/scrape/{task_id}/events")
+async def stream_scrape_events(task_id: str, request: Request, job_store=Depends(get_job_store)):
+    """Server-Sent Events stream of a scrape job's progress and saved images"""
+    task = await job_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def event_stream():
+        last_event_id = request.headers.get("last-event-id")
+        yield format_sse(None, "status", {"status": task["status"], "message": task["message"]})
+        idle = 0.0
+        while True:
+            if await request.is_disconnected():
+                return
+            events = await job_store.get_events(task_id, after=last_event_id)
+            for event in events:
+                last_event_id = event["id"]
+                yield format_sse(event["id"], event["type"], event["data"])
+                if event["type"] == "status" and event["data"].get("status") in FINISHED_STATES:
+                    return
+            if events:
+                idle = 0.0
+                continue
+
+            # Nothing new: the job may have finished without a final event (e.g. swept)
+            current = await job_store.get(task_id)
+            if current is None or current["status"] in FINISHED_STATES:
+                final = current or {"status": "failed", "message": "Task expired"}
+                yield format_sse(None, "status", {"status": final["status"], "message": final["message"]})
+                return
+            if idle >= settings.SSE_KEEPALIVE_INTERVAL:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+            idle += settings.SSE_POLL_INTERVAL
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return image_cache.stats()
@@ -0,0 +1,205 @@
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+import json
+import logging
+import time
+from pymongo import ReturnDocument
+from .config import settings
+from .resources import resources
+
+logger = logging.getLogger(__name__)
+
+class LocalCacheBackend:
+    """In-process LRU cache with per-entry TTL.
+
+    Images are ingested by the worker processes, so with ``generations`` (a
+    MongoDB collection) the scope generations are shared: invalidations are
+    published there and picked up at most ``sync_interval`` seconds later.
+    Without it, only invalidations made in this process are seen.
+    """
+
+    def __init__(self, max_entries: int = 512, generations=None, sync_interval: float = 1.0):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+        self.generations = generations
+        self.sync_interval = sync_interval
+        self._synced_at: Optional[float] = None
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_generation(self, scope: str) -> int:
+        if self.generations is not None:
+            now = time.monotonic()
+            if self._synced_at is None or now - self._synced_at >= self.sync_interval:
+                self._synced_at = now
+                async for doc in self.generations.find({}):
+                    if doc["generation"] != self._generations[doc["_id"]]:
+                        self._generations[doc["_id"]] = doc["generation"]
+                        self._drop_scope(doc["_id"])
+        return self._generations[scope]
+
+    async def bump_generation(self, scope: str):
+        if self.generations is not None:
+            doc = await self.generations.find_one_and_update(
+                {"_id": scope},
+                {"$inc": {"generation": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self._generations[scope] = doc["generation"]
+        else:
+            self._generations[scope] += 1
+        self._drop_scope(scope)
+
+    def _drop_scope(self, scope: str):
+        # Entries of older generations can never be hit again
+        prefix = f"{scope}:"
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def close(self):
+        self._entries.clear()
+
+class RedisCacheBackend:
+    """Shared cache backend so every API worker sees the same entries and invalidations"""
+
+    def __init__(self, url: str, namespace: str = "scrapershorts:cache"):
+        # Optional dependency, only needed for multi-worker deployments
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.namespace = namespace
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.namespace}:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(f"{self.namespace}:{key}", value, ex=ttl)
+
+    async def get_generation(self, scope: str) -> int:
+        value = await self.client.get(f"{self.namespace}:generation:{scope}")
+        return int(value) if value else 0
+
+    async def bump_generation(self, scope: str):
+        # Stale entries are unreachable under the new generation and expire on their own
+        await self.client.incr(f"{self.namespace}:generation:{scope}")
+
+    def size(self) -> int:
+        return -1
+
+    async def close(self):
+        await self.client.close()
+
+class QueryCache:
+    """Cache of serialized query responses, invalidated per scope (category)"""
+
+    def __init__(self, backend, ttl: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> str:
+        """Canonical form of the query parameters, independent of argument order"""
+        normalized = {k: v for k, v in params.items() if v is not None}
+        return json.dumps(normalized, sort_keys=True, default=str)
+
+    async def make_key(self, scope: str, params: Dict[str, Any]) -> str:
+        generation = await self.backend.get_generation(scope)
+        digest = hashlib.sha1(self.normalize_params(params).encode()).hexdigest()
+        return f"{scope}:{generation}:{digest}"
+
+    async def get(self, scope: str, params: Dict[str, Any]) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            value = await self.backend.get(await self.make_key(scope, params))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache lookup failed: {str(e)}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, scope: str, params: Dict[str, Any], value: bytes):
+        if not self.enabled:
+            return
+        try:
+            await self.backend.set(await self.make_key(scope, params), value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache store failed: {str(e)}")
+
+    async def invalidate(self, scopes: Iterable[str]):
+        for scope in set(scopes):
+            try:
+                await self.backend.bump_generation(scope)
+                self.invalidations += 1
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Cache invalidation failed for '{scope}': {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+            "entries": self.backend.size()
+        }
+
+def create_cache_backend():
+    if settings.CACHE_BACKEND == "redis" and settings.CACHE_REDIS_URL:
+        try:
+            return RedisCacheBackend(settings.CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, falling back to local cache")
+    generations = None
+    if settings.CACHE_SHARED_GENERATIONS:
+        generations = resources.mongo[settings.MONGODB_DB_NAME].cache_generations
+    return LocalCacheBackend(
+        max_entries=settings.IMAGES_CACHE_MAX_ENTRIES,
+        generations=generations,
+        sync_interval=settings.CACHE_GENERATION_SYNC_INTERVAL
+    )
+
+image_cache = QueryCache(
+    create_cache_backend(),
+    ttl=settings.IMAGES_CACHE_TTL,
+    enabled=settings.IMAGES_CACHE_ENABLED
+)
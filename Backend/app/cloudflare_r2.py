@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import Optional
 from dotenv import load_dotenv
@@ -69,5 +70,8 @@ async def upload_image_bytes_to_r2(image_bytes: bytes, object_name: str) -> str:
         content_type = "image/png"
     else:
         content_type = "application/octet-stream"
-    s3.put_object(Bucket=CLOUDFLARE_R2_BUCKET_NAME, Key=object_name, Body=image_bytes, ContentType=content_type)
+    # boto3 blocks; upload from a thread so the event loop keeps serving other downloads
+    await asyncio.to_thread(
+        s3.put_object, Bucket=CLOUDFLARE_R2_BUCKET_NAME, Key=object_name, Body=image_bytes, ContentType=content_type
+    )
     return f"{CLOUDFLARE_R2_PUBLIC_URL}/{object_name}" 
\ No newline at end of file
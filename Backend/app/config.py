@@ -13,6 +13,18 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "scrapershorts"
+    MONGODB_MAX_POOL_SIZE: int = 100  # connections per server, shared by the API, job stores and scrapers
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: int = 60000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 10000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None  # no limit on a single operation by default
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # how long to wait for a free pooled connection
+    # e.g. "secondaryPreferred" to serve image listings from replicas; job leases
+    # are writes and always go to the primary
+    MONGODB_READ_PREFERENCE: str = "primary"
+    BULK_WRITE_BATCH_SIZE: int = 100
+    STATS_RECONCILE_INTERVAL: int = 3600  # seconds between full stats rebuilds
     
     # Selenium
     SELENIUM_DRIVER_PATH: Optional[str] = None
@@ -20,9 +32,92 @@ class Settings(BaseSettings):
     SELENIUM_TIMEOUT: int = 30
     SELENIUM_SCROLL_DELAY: float = 1.0
     
+    # Shared HTTP client for page fetches and image downloads
+    HTTP_POOL_LIMIT: int = 100  # open connections in total
+    HTTP_POOL_LIMIT_PER_HOST: int = 10
+    HTTP_DNS_CACHE_TTL: int = 300  # seconds
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0  # seconds an idle connection is kept for reuse
+    HTTP_TOTAL_TIMEOUT: float = 60.0  # seconds per request, including reading the body
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_READ_TIMEOUT: float = 30.0  # seconds between reads of the body
+    HTTP_COMPRESSION: bool = True  # gzip/deflate, and brotli when the Brotli package is installed
+    
+    # On-disk cache of the scraper's page and image fetches
+    SCRAPER_HTTP_CACHE_ENABLED: bool = True
+    SCRAPER_HTTP_CACHE_DIR: str = "http_cache"
+    SCRAPER_HTTP_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    SCRAPER_HTTP_CACHE_OFFLINE: bool = False  # serve cached URLs without the network (repeatable dev/benchmark runs)
+    
+    # Per-host politeness
+    SCRAPER_PAGE_RATE: float = 0.5  # page loads per second per host
+    SCRAPER_PAGE_BURST: int = 2
+    SCRAPER_DOWNLOAD_RATE: float = 10.0  # image downloads per second per host
+    SCRAPER_DOWNLOAD_BURST: int = 20
+    SCRAPER_BACKOFF_MAX: int = 300  # seconds
+    SCRAPER_BREAKER_THRESHOLD: int = 5  # consecutive failures before a host is taken out of rotation
+    SCRAPER_BREAKER_COOLDOWN: int = 300  # seconds
+    
+    # Site/term prioritization
+    SCRAPER_YIELD_EXPLORATION: float = 1.0  # UCB exploration weight
+    SCRAPER_YIELD_MIN_PAGES: int = 3  # page loads before a pair can be skipped
+    SCRAPER_YIELD_SKIP_DUPLICATE_RATE: float = 0.9
+    SCRAPER_YIELD_RETRY_AFTER: int = 604800  # seconds before a skipped pair is tried again
+    
+    # Incremental re-crawl
+    SCRAPER_CHECKPOINT_SIZE: int = 200  # newest image IDs remembered per site/term
+    SCRAPER_CHECKPOINT_STOP_RUN: int = 5  # consecutive known images before a page is considered caught up
+    
+    # Scrape job queue
+    JOB_STORE: str = "mongo"  # "mongo" or "sqlite" for local single-machine setups
+    JOB_SQLITE_PATH: str = "jobs.db"
+    JOB_LEASE_SECONDS: int = 120
+    JOB_HEARTBEAT_INTERVAL: int = 30
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: int = 30  # seconds, doubled per attempt
+    JOB_POLL_INTERVAL: float = 2.0
+    JOB_RESULT_TTL: int = 3600  # seconds a finished job's status is kept
+    JOB_SWEEP_INTERVAL: int = 60
+    WORKER_CONCURRENCY: int = 1
+    SCRAPE_MAX_CONCURRENT: int = 4  # running scrapes across all workers (0 = unlimited)
+    SCRAPE_QUEUE_LIMIT: int = 100  # queued jobs before POST /scrape answers 429
+    SCRAPE_MAX_QUEUED_PER_CLIENT: int = 5
+    # Proxies (addresses or networks) whose X-Client-Id header identifies the caller; others are keyed by address
+    TRUSTED_PROXIES: List[str] = []
+    SCRAPE_AVG_JOB_SECONDS: int = 60  # used to estimate Retry-After
+    SCRAPE_REUSE_WINDOW: int = 300  # seconds a completed job is reused for identical requests
+    SCRAPE_MAX_DEADLINE: int = 1800  # hard cap on a job's run time in seconds (0 = unlimited)
+    SCRAPE_MAX_PAGES: int = 200  # hard cap on a job's page loads (0 = unlimited)
+    SSE_POLL_INTERVAL: float = 0.5
+    SSE_KEEPALIVE_INTERVAL: float = 15.0
+    EMBEDDED_WORKER: bool = False  # run a worker inside the API process (development)
+    
     # Image Storage
     IMAGE_STORAGE_PATH: str = "images"
     MAX_IMAGES_PER_SCRAPE: int = 100
+    IMAGES_BATCH_MAX_IDS: int = 500  # IDs accepted by POST /images/batch
+    
+    # Query cache
+    IMAGES_CACHE_ENABLED: bool = True
+    IMAGES_CACHE_TTL: int = 30  # seconds
+    IMAGES_CACHE_MAX_ENTRIES: int = 512
+    CACHE_BACKEND: str = "local"  # "local" or "redis"
+    CACHE_REDIS_URL: Optional[str] = None
+    # Local backend: share invalidations with the workers that ingest images through MongoDB
+    CACHE_SHARED_GENERATIONS: bool = True
+    CACHE_GENERATION_SYNC_INTERVAL: float = 1.0  # seconds an API process may serve entries older than an ingest
+    
+    # Search suggestions (GET /suggest)
+    SUGGEST_MAX_TERMS: int = 50000  # terms kept in memory; the least frequent are dropped
+    SUGGEST_TITLE_LIMIT: int = 20000  # newest images whose titles are indexed
+    SUGGEST_REFRESH_INTERVAL: int = 300  # seconds between rebuilds (picks up worker ingests)
+    SUGGEST_MAX_RESULTS: int = 20
+    
+    # Responses
+    FAST_JSON_RESPONSES: bool = True
+    # Cache-Control of the read endpoints, which also send ETags and answer If-None-Match with 304
+    CACHE_CONTROL_IMAGES: str = "public, max-age=30, stale-while-revalidate=60"
+    CACHE_CONTROL_IMAGE: str = "public, max-age=300, stale-while-revalidate=3600"
+    CACHE_CONTROL_STATS: str = "public, max-age=60, stale-while-revalidate=300"
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -1,20 +1,204 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
+from .cache import image_cache
+from .resources import resources
+from .suggest import suggestions
 from .models import ImageCreate, ImageInDB, ImageResponse
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
 from bson import ObjectId
+from collections import Counter
+from urllib.parse import unquote, urlparse
+import heapq
 import logging
-from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 
 logger = logging.getLogger(__name__)
 
+STATS_DOCUMENT_ID = "global"
+
+# Host part of source_url, computed inside aggregations
+SOURCE_HOST_EXPR = {"$let": {
+    "vars": {"match": {"$regexFind": {
+        "input": {"$toString": "$source_url"},
+        "regex": "^[a-zA-Z][a-zA-Z0-9+.-]*://([^/:?#]+)"
+    }}},
+    "in": {"$ifNull": [{"$arrayElemAt": ["$$match.captures", 0]}, "unknown"]}
+}}
+
+# Category mappings with subcategories
+CATEGORY_MAPPING = {
+    "sports": {
+        "subcategories": [
+            "football", "soccer", "basketball", "tennis", "golf", "baseball",
+            "cricket", "rugby", "hockey", "volleyball", "swimming", "athletics",
+            "boxing", "martial arts", "wrestling", "gymnastics", "cycling",
+            "racing", "surfing", "skiing", "snowboarding", "skateboarding"
+        ],
+        "related": ["fitness", "exercise", "athletic", "game", "competition", "sport"]
+    },
+    "nature": {
+        "subcategories": [
+            "landscape", "mountains", "forest", "ocean", "beach", "sunset",
+            "wildlife", "flowers", "garden", "plants", "trees", "waterfall"
+        ],
+        "related": ["outdoors", "environment", "natural", "scenic"]
+    },
+    "technology": {
+        "subcategories": [
+            "computer", "smartphone", "robot", "ai", "gadget", "electronics",
+            "software", "hardware", "internet", "data", "cybersecurity"
+        ],
+        "related": ["digital", "innovation", "tech", "modern"]
+    },
+    "business": {
+        "subcategories": [
+            "office", "meeting", "presentation", "startup", "entrepreneur",
+            "corporate", "finance", "marketing", "team", "workplace"
+        ],
+        "related": ["professional", "work", "career", "industry"]
+    },
+    "art": {
+        "subcategories": [
+            "painting", "sculpture", "drawing", "illustration", "digital art",
+            "gallery", "museum", "exhibition", "artist", "creative"
+        ],
+        "related": ["creative", "design", "artistic", "visual"]
+    },
+    "fashion": {
+        "subcategories": [
+            "clothing", "accessories", "runway", "model", "style", "designer",
+            "fashion show", "outfit", "trend", "luxury"
+        ],
+        "related": ["style", "apparel", "wear", "trendy"]
+    },
+    "music": {
+        "subcategories": [
+            "concert", "band", "musician", "instrument", "performance",
+            "studio", "recording", "sound", "dj", "festival"
+        ],
+        "related": ["audio", "melody", "rhythm", "song"]
+    },
+    "education": {
+        "subcategories": [
+            "school", "university", "classroom", "student", "teacher",
+            "learning", "study", "campus", "library", "research"
+        ],
+        "related": ["academic", "teaching", "knowledge", "training"]
+    },
+    "health": {
+        "subcategories": [
+            "fitness", "wellness", "medical", "doctor", "hospital",
+            "healthcare", "exercise", "yoga", "meditation", "nutrition"
+        ],
+        "related": ["medical", "wellness", "fitness", "healthcare"]
+    },
+    "automotive": {
+        "subcategories": [
+            "car", "vehicle", "automobile", "transportation", "driving",
+            "road", "highway", "racing", "motorcycle", "luxury car"
+        ],
+        "related": ["transport", "vehicle", "automobile", "driving"]
+    },
+    "abstract": {
+        "subcategories": [
+            "pattern", "texture", "background", "minimal", "geometric",
+            "shape", "form", "color", "design", "artistic"
+        ],
+        "related": ["artistic", "design", "pattern", "texture"]
+    },
+    "editorial": {
+        "subcategories": [
+            "magazine", "cover", "story", "feature", "journalism",
+            "press", "media", "publication", "article", "news"
+        ],
+        "related": ["media", "press", "publication", "story"]
+    },
+    "film": {
+        "subcategories": [
+            "movie", "cinema", "theater", "actor", "actress", "director",
+            "scene", "set", "production", "hollywood"
+        ],
+        "related": ["cinema", "movie", "theater", "production"]
+    },
+    "3d": {
+        "subcategories": [
+            "3d-rendering", "3d-model", "3d-art", "digital-art", "animation",
+            "cg", "computer-graphics", "virtual", "simulation", "3d-design"
+        ],
+        "related": ["digital", "virtual", "computer", "simulation"]
+    },
+    "architecture": {
+        "subcategories": [
+            "building", "city", "urban", "interior", "design", "modern",
+            "house", "apartment", "structure", "construction"
+        ],
+        "related": ["building", "design", "structure", "construction"]
+    },
+    "people": {
+        "subcategories": [
+            "portrait", "person", "human", "face", "lifestyle", "fashion",
+            "beauty", "model", "family", "friends"
+        ],
+        "related": ["human", "person", "portrait", "people"]
+    },
+    "animals": {
+        "subcategories": [
+            "pet", "dog", "cat", "wildlife", "bird", "mammal", "reptile",
+            "fish", "insect", "zoo"
+        ],
+        "related": ["wildlife", "pet", "animal", "creature"]
+    },
+    "food": {
+        "subcategories": [
+            "meal", "restaurant", "cooking", "recipe", "cuisine", "dessert",
+            "breakfast", "lunch", "dinner", "snack"
+        ],
+        "related": ["cuisine", "meal", "cooking", "dining"]
+    },
+    "travel": {
+        "subcategories": [
+            "vacation", "tourism", "destination", "journey", "adventure",
+            "explore", "trip", "holiday", "backpacking", "roadtrip"
+        ],
+        "related": ["tourism", "journey", "adventure", "exploration"]
+    }
+}
+
+def cache_scopes_for_categories(categories: Set[Optional[str]]) -> Set[str]:
+    """Cached /images scopes whose results can change when images of these categories are added"""
+    scopes = {"all"}
+    for category in categories:
+        if not category:
+            continue
+        category = category.lower()
+        scopes.add(category)
+        for parent, info in CATEGORY_MAPPING.items():
+            if category in info["subcategories"]:
+                scopes.add(parent)
+    return scopes
+
+def _stat_key(value: str) -> str:
+    """Escape a counter name so it is a valid MongoDB field name"""
+    value = str(value) or "unknown"
+    return value.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def _source_host(source_url: Optional[str]) -> str:
+    """Reduce a source URL to its host for the source breakdown"""
+    host = urlparse(str(source_url or "")).hostname
+    return host or "unknown"
+
 class Database:
     def __init__(self):
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+            # One pooled client for the whole process, owned by ``resources``
+            self.client = resources.mongo
             self.db = self.client[settings.MONGODB_DB_NAME]
             self.images = self.db.images
+            self.stats = self.db.stats
+            self.scrape_yield = self.db.scrape_yield
+            self.crawl_checkpoints = self.db.crawl_checkpoints
+            self.image_claims = self.db.image_claims
             logger.info("Database connection initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database connection: {str(e)}")
@@ -34,17 +218,26 @@ class Database:
             # Create index for sorting
             await self.images.create_index([("created_at", -1)])
             await self.images.create_index([("scraped_at", -1)])
+            # The scraper checks whether an image was stored by its original URL
+            await self.images.create_index("source_url")
+            await self.scrape_yield.create_index([("site", 1), ("term", 1)], unique=True)
+            await self.crawl_checkpoints.create_index([("site", 1), ("term", 1)], unique=True)
+            # Claims left by a crashed worker expire with its lease; claims of stored images are kept
+            await self.image_claims.create_index(
+                "claimed_at",
+                expireAfterSeconds=settings.JOB_LEASE_SECONDS,
+                partialFilterExpression={"stored": False}
+            )
+            await self.image_claims.create_index("unit_id", partialFilterExpression={"stored": False})
             logger.info("Database indexes created successfully")
         except Exception as e:
             logger.error(f"Failed to create database indexes: {str(e)}")
             raise
 
     async def close_database_connection(self):
-        """Close database connection"""
+        """Close the shared database connection and HTTP session at shutdown"""
         try:
-            if self.client:
-                self.client.close()
-                logger.info("Database connection closed successfully")
+            await resources.close()
         except Exception as e:
             logger.error(f"Failed to close database connection: {str(e)}")
 
@@ -65,6 +258,9 @@ class Database:
             try:
                 result = await self.images.insert_one(image_dict)
                 if result.inserted_id:
+                    await self._increment_stats([image_dict])
+                    await image_cache.invalidate(cache_scopes_for_categories({image_dict.get("category")}))
+                    suggestions.add_images([image_dict])
                     # Convert ObjectId to string before creating response
                     image_dict["_id"] = str(result.inserted_id)
                     logger.info(f"New image created: {image_dict['_id']}")
@@ -81,6 +277,62 @@ class Database:
             logger.error(f"Error creating image: {str(e)}")
             return None
 
+    async def create_images_bulk(self, images: List[ImageCreate]) -> Dict[str, Any]:
+        """Upsert a batch of images in a single unordered bulk write.
+
+        Images are keyed on ``image_url`` so existing documents are left
+        untouched. Returns the inserted/existing counts and the newly
+        inserted images.
+        """
+        result = {"inserted": 0, "existing": 0, "images": []}
+        if not images:
+            return result
+
+        now = datetime.utcnow()
+        documents = []
+        operations = []
+        for image in images:
+            image_dict = image.dict()
+            image_dict["image_url"] = str(image.image_url)
+            image_dict["source_url"] = str(image.source_url)
+            image_dict["created_at"] = now
+            image_dict["updated_at"] = now
+            # Assigned here so inserted documents are identified by _id, not by batch position
+            image_dict["_id"] = ObjectId()
+            documents.append(image_dict)
+            operations.append(UpdateOne(
+                {"image_url": image_dict["image_url"]},
+                {"$setOnInsert": image_dict},
+                upsert=True
+            ))
+
+        try:
+            write_result = await self.images.bulk_write(operations, ordered=False)
+            upserted_ids = write_result.upserted_ids or {}
+        except BulkWriteError as e:
+            # Concurrent upserts on the same image_url can race on the unique
+            # index; the remaining operations still went through.
+            details = e.details or {}
+            logger.warning(f"Bulk write completed with {len(details.get('writeErrors', []))} errors")
+            upserted_ids = {u["index"]: u["_id"] for u in details.get("upserted", [])}
+        except Exception as e:
+            logger.error(f"Error bulk creating images: {str(e)}")
+            return result
+
+        inserted_ids = set(upserted_ids.values())
+        inserted = [doc for doc in documents if doc["_id"] in inserted_ids]
+        if inserted:
+            await self._increment_stats(inserted)
+            await image_cache.invalidate(cache_scopes_for_categories({doc.get("category") for doc in inserted}))
+            suggestions.add_images(inserted)
+        for image_dict in inserted:
+            image_dict["_id"] = str(image_dict["_id"])
+            result["images"].append(ImageResponse(**image_dict))
+        result["inserted"] = len(inserted)
+        result["existing"] = len(images) - result["inserted"]
+        logger.info(f"Bulk write: {result['inserted']} inserted, {result['existing']} existing")
+        return result
+
     async def get_image(self, image_id: str) -> Optional[ImageResponse]:
         """Get a single image by ID"""
         try:
@@ -99,6 +351,95 @@ class Database:
             logger.error(f"Error getting image: {str(e)}")
             return None
 
+    async def get_images_by_ids(
+        self,
+        image_ids: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Any], List[str]]:
+        """Images for the given IDs in request order, fetched in one $in query, and the IDs not found
+
+        Rows are shaped like ``get_images`` results for the same ``fields``.
+        """
+        try:
+            image_ids = list(dict.fromkeys(image_ids))
+            object_ids = [ObjectId(image_id) for image_id in image_ids if ObjectId.is_valid(image_id)]
+            found = {}
+            if object_ids:
+                projection = {field: 1 for field in fields} if fields else None
+                async for image in self.images.find({"_id": {"$in": object_ids}}, projection):
+                    image["_id"] = str(image["_id"])
+                    found[image["_id"]] = image
+            images = []
+            for image_id in image_ids:
+                image = found.get(image_id)
+                if image is None:
+                    continue
+                if fields:
+                    images.append({field: image.get(field) for field in fields})
+                else:
+                    images.append(ImageResponse(**image))
+            return images, [image_id for image_id in image_ids if image_id not in found]
+        except Exception as e:
+            logger.error(f"Error getting images by ID: {str(e)}")
+            raise
+
+    @staticmethod
+    def image_query(
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """MongoDB filter for the image listing filters"""
+        # Build query
+        query = {}
+        
+        if search:
+            query["$or"] = [
+                {"title": {"$regex": search, "$options": "i"}},
+                {"tags": {"$regex": search, "$options": "i"}},
+                {"category": {"$regex": search, "$options": "i"}}
+            ]
+        
+        if source:
+            query["source_url"] = {"$regex": source, "$options": "i"}
+        
+        if date_from or date_to:
+            date_query = {}
+            if date_from:
+                date_query["$gte"] = date_from
+            if date_to:
+                date_query["$lte"] = date_to
+            query["scraped_at"] = date_query
+        
+        if category and category != "all":
+            # Get category mapping
+            category_info = CATEGORY_MAPPING.get(category.lower(), {
+                "subcategories": [category.lower()],
+                "related": []
+            })
+        
+            # Build category query - strict filtering for all categories
+            if category.lower() == "other":
+                # Only match exact 'other' category
+                category_query = {"category": {"$regex": "^other$", "$options": "i"}}
+            else:
+                # Strict filtering for all categories - only match exact category and subcategories
+                category_query = {
+                    "$or": [
+                        # Match exact category
+                        {"category": {"$regex": f"^{category.lower()}$", "$options": "i"}},
+                        # Match subcategories
+                        {"category": {"$in": [sub.lower() for sub in category_info["subcategories"]]}}
+                    ]
+                }
+        
+            # Add category query to main query
+            query["$and"] = [category_query]
+
+        return query
+
     async def get_images(
         self,
         search: Optional[str] = None,
@@ -110,194 +451,18 @@ class Database:
         page: int = 1,
         limit: int = 20,
         category: Optional[str] = None,
-        skip: Optional[int] = None
-    ) -> List[ImageResponse]:
-        """Get images from the database with filters"""
+        skip: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Any]:
+        """Get images from the database with filters
+
+        When ``fields`` is given only those fields are fetched and the rows are
+        returned as plain dicts, skipping model validation of trusted DB data.
+        Errors are raised, so an outage is not mistaken for an empty (and
+        cacheable) result.
+        """
         try:
-            # Build query
-            query = {}
-            
-            if search:
-                query["$or"] = [
-                    {"title": {"$regex": search, "$options": "i"}},
-                    {"tags": {"$regex": search, "$options": "i"}},
-                    {"category": {"$regex": search, "$options": "i"}}
-                ]
-            
-            if source:
-                query["source_url"] = {"$regex": source, "$options": "i"}
-            
-            if date_from or date_to:
-                date_query = {}
-                if date_from:
-                    date_query["$gte"] = date_from
-                if date_to:
-                    date_query["$lte"] = date_to
-                query["scraped_at"] = date_query
-            
-            if category and category != "all":
-                # Define category mappings with subcategories
-                category_mapping = {
-                    "sports": {
-                        "subcategories": [
-                            "football", "soccer", "basketball", "tennis", "golf", "baseball",
-                            "cricket", "rugby", "hockey", "volleyball", "swimming", "athletics",
-                            "boxing", "martial arts", "wrestling", "gymnastics", "cycling",
-                            "racing", "surfing", "skiing", "snowboarding", "skateboarding"
-                        ],
-                        "related": ["fitness", "exercise", "athletic", "game", "competition", "sport"]
-                    },
-                    "nature": {
-                        "subcategories": [
-                            "landscape", "mountains", "forest", "ocean", "beach", "sunset",
-                            "wildlife", "flowers", "garden", "plants", "trees", "waterfall"
-                        ],
-                        "related": ["outdoors", "environment", "natural", "scenic"]
-                    },
-                    "technology": {
-                        "subcategories": [
-                            "computer", "smartphone", "robot", "ai", "gadget", "electronics",
-                            "software", "hardware", "internet", "data", "cybersecurity"
-                        ],
-                        "related": ["digital", "innovation", "tech", "modern"]
-                    },
-                    "business": {
-                        "subcategories": [
-                            "office", "meeting", "presentation", "startup", "entrepreneur",
-                            "corporate", "finance", "marketing", "team", "workplace"
-                        ],
-                        "related": ["professional", "work", "career", "industry"]
-                    },
-                    "art": {
-                        "subcategories": [
-                            "painting", "sculpture", "drawing", "illustration", "digital art",
-                            "gallery", "museum", "exhibition", "artist", "creative"
-                        ],
-                        "related": ["creative", "design", "artistic", "visual"]
-                    },
-                    "fashion": {
-                        "subcategories": [
-                            "clothing", "accessories", "runway", "model", "style", "designer",
-                            "fashion show", "outfit", "trend", "luxury"
-                        ],
-                        "related": ["style", "apparel", "wear", "trendy"]
-                    },
-                    "music": {
-                        "subcategories": [
-                            "concert", "band", "musician", "instrument", "performance",
-                            "studio", "recording", "sound", "dj", "festival"
-                        ],
-                        "related": ["audio", "melody", "rhythm", "song"]
-                    },
-                    "education": {
-                        "subcategories": [
-                            "school", "university", "classroom", "student", "teacher",
-                            "learning", "study", "campus", "library", "research"
-                        ],
-                        "related": ["academic", "teaching", "knowledge", "training"]
-                    },
-                    "health": {
-                        "subcategories": [
-                            "fitness", "wellness", "medical", "doctor", "hospital",
-                            "healthcare", "exercise", "yoga", "meditation", "nutrition"
-                        ],
-                        "related": ["medical", "wellness", "fitness", "healthcare"]
-                    },
-                    "automotive": {
-                        "subcategories": [
-                            "car", "vehicle", "automobile", "transportation", "driving",
-                            "road", "highway", "racing", "motorcycle", "luxury car"
-                        ],
-                        "related": ["transport", "vehicle", "automobile", "driving"]
-                    },
-                    "abstract": {
-                        "subcategories": [
-                            "pattern", "texture", "background", "minimal", "geometric",
-                            "shape", "form", "color", "design", "artistic"
-                        ],
-                        "related": ["artistic", "design", "pattern", "texture"]
-                    },
-                    "editorial": {
-                        "subcategories": [
-                            "magazine", "cover", "story", "feature", "journalism",
-                            "press", "media", "publication", "article", "news"
-                        ],
-                        "related": ["media", "press", "publication", "story"]
-                    },
-                    "film": {
-                        "subcategories": [
-                            "movie", "cinema", "theater", "actor", "actress", "director",
-                            "scene", "set", "production", "hollywood"
-                        ],
-                        "related": ["cinema", "movie", "theater", "production"]
-                    },
-                    "3d": {
-                        "subcategories": [
-                            "3d-rendering", "3d-model", "3d-art", "digital-art", "animation",
-                            "cg", "computer-graphics", "virtual", "simulation", "3d-design"
-                        ],
-                        "related": ["digital", "virtual", "computer", "simulation"]
-                    },
-                    "architecture": {
-                        "subcategories": [
-                            "building", "city", "urban", "interior", "design", "modern",
-                            "house", "apartment", "structure", "construction"
-                        ],
-                        "related": ["building", "design", "structure", "construction"]
-                    },
-                    "people": {
-                        "subcategories": [
-                            "portrait", "person", "human", "face", "lifestyle", "fashion",
-                            "beauty", "model", "family", "friends"
-                        ],
-                        "related": ["human", "person", "portrait", "people"]
-                    },
-                    "animals": {
-                        "subcategories": [
-                            "pet", "dog", "cat", "wildlife", "bird", "mammal", "reptile",
-                            "fish", "insect", "zoo"
-                        ],
-                        "related": ["wildlife", "pet", "animal", "creature"]
-                    },
-                    "food": {
-                        "subcategories": [
-                            "meal", "restaurant", "cooking", "recipe", "cuisine", "dessert",
-                            "breakfast", "lunch", "dinner", "snack"
-                        ],
-                        "related": ["cuisine", "meal", "cooking", "dining"]
-                    },
-                    "travel": {
-                        "subcategories": [
-                            "vacation", "tourism", "destination", "journey", "adventure",
-                            "explore", "trip", "holiday", "backpacking", "roadtrip"
-                        ],
-                        "related": ["tourism", "journey", "adventure", "exploration"]
-                    }
-                }
-                
-                # Get category mapping
-                category_info = category_mapping.get(category.lower(), {
-                    "subcategories": [category.lower()],
-                    "related": []
-                })
-                
-                # Build category query - strict filtering for all categories
-                if category.lower() == "other":
-                    # Only match exact 'other' category
-                    category_query = {"category": {"$regex": "^other$", "$options": "i"}}
-                else:
-                    # Strict filtering for all categories - only match exact category and subcategories
-                    category_query = {
-                        "$or": [
-                            # Match exact category
-                            {"category": {"$regex": f"^{category.lower()}$", "$options": "i"}},
-                            # Match subcategories
-                            {"category": {"$in": [sub.lower() for sub in category_info["subcategories"]]}}
-                        ]
-                    }
-                
-                # Add category query to main query
-                query["$and"] = [category_query]
+            query = self.image_query(search, source, date_from, date_to, category)
 
             # Build sort
             sort_direction = -1 if sort_order.lower() == "desc" else 1
@@ -307,8 +472,11 @@ class Database:
             skip_value = skip if skip is not None else (page - 1) * limit
 
             # Use aggregation pipeline to deduplicate by _id before pagination
-            pipeline = [
-                {"$match": query},
+            pipeline = [{"$match": query}]
+            if fields:
+                # Project early so the remaining stages move only the requested fields
+                pipeline.append({"$project": {field: 1 for field in {*fields, sort_by}}})
+            pipeline += [
                 {"$group": {"_id": "$_id", "doc": {"$first": "$$ROOT"}}},
                 {"$replaceRoot": {"newRoot": "$doc"}},
                 {"$sort": {sort_by: sort_direction}},
@@ -317,45 +485,168 @@ class Database:
             ]
             images = await self.images.aggregate(pipeline).to_list(length=limit)
             
+            if fields:
+                return [
+                    {field: str(image["_id"]) if field == "_id" else image.get(field) for field in fields}
+                    for image in images
+                ]
+
             # Convert ObjectId to string for all images and create ImageResponse objects
             return [ImageResponse(**{**image, "_id": str(image["_id"])}) for image in images]
         except Exception as e:
             logger.error(f"Error getting images: {str(e)}")
-            return []
+            raise
 
-    async def get_stats(self) -> Dict[str, Any]:
-        """Get image statistics"""
-        try:
-            total_images = await self.images.count_documents({})
-            
-            # Get top tags
-            pipeline = [
-                {"$unwind": "$tags"},
-                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
+    async def get_image_facets(
+        self,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        facet_limit: int = 20
+    ) -> Dict[str, Any]:
+        """A page of images plus category, source host and tag counts for the same filters
+
+        Everything comes from one $facet aggregation, so the counts always
+        match the filtered results. Rows are shaped like ``get_images`` results.
+        """
+        def counts(*stages) -> List[Dict[str, Any]]:
+            return [
+                *stages,
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": facet_limit}
             ]
-            top_tags = await self.images.aggregate(pipeline).to_list(length=10)
-            
-            # Get source breakdown
+
+        try:
+            sort_direction = -1 if sort_order.lower() == "desc" else 1
+            page_stages = []
+            if fields:
+                page_stages.append({"$project": {field: 1 for field in {*fields, sort_by}}})
+            page_stages += [{"$sort": {sort_by: sort_direction}}, {"$skip": skip}, {"$limit": limit}]
             pipeline = [
-                {"$group": {"_id": "$source_url", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
+                {"$match": self.image_query(search, source, date_from, date_to, category)},
+                {"$facet": {
+                    "images": page_stages,
+                    "total": [{"$count": "count"}],
+                    "categories": counts(
+                        {"$group": {"_id": {"$ifNull": ["$category", "uncategorized"]}, "count": {"$sum": 1}}}
+                    ),
+                    "sources": counts({"$group": {"_id": {"$toLower": SOURCE_HOST_EXPR}, "count": {"$sum": 1}}}),
+                    "tags": counts({"$unwind": "$tags"}, {"$group": {"_id": "$tags", "count": {"$sum": 1}}})
+                }}
             ]
-            source_breakdown = await self.images.aggregate(pipeline).to_list(length=None)
-            
-            # Get category distribution
-            pipeline = [
-                {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
+            result = (await self.images.aggregate(pipeline).to_list(length=1))[0]
+
+            if fields:
+                images = [
+                    {field: str(image["_id"]) if field == "_id" else image.get(field) for field in fields}
+                    for image in result["images"]
+                ]
+            else:
+                images = [ImageResponse(**{**image, "_id": str(image["_id"])}) for image in result["images"]]
+            return {
+                "images": images,
+                "total": result["total"][0]["count"] if result["total"] else 0,
+                "facets": {
+                    "categories": result["categories"],
+                    "sources": result["sources"],
+                    "tags": result["tags"]
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error getting image facets: {str(e)}")
+            raise
+
+    async def _increment_stats(self, documents: List[Dict[str, Any]]):
+        """Apply newly inserted images to the materialized stats document"""
+        if not documents:
+            return
+        counters = Counter()
+        last_scraped = None
+        for doc in documents:
+            counters["total_images"] += 1
+            category = doc.get("category") or "uncategorized"
+            counters[f"categories.{_stat_key(category)}"] += 1
+            counters[f"sources.{_stat_key(_source_host(doc.get('source_url')))}"] += 1
+            for tag in doc.get("tags") or []:
+                counters[f"tags.{_stat_key(tag)}"] += 1
+            scraped_at = doc.get("scraped_at")
+            if isinstance(scraped_at, datetime) and (last_scraped is None or scraped_at > last_scraped):
+                last_scraped = scraped_at
+
+        update = {"$inc": dict(counters), "$set": {"updated_at": datetime.utcnow()}}
+        if last_scraped:
+            update["$max"] = {"last_scraped": last_scraped}
+        try:
+            await self.stats.update_one({"_id": STATS_DOCUMENT_ID}, update, upsert=True)
+        except Exception as e:
+            # The reconciliation job will repair any drift
+            logger.error(f"Error updating stats counters: {str(e)}")
+
+    async def reconcile_stats(self) -> Dict[str, Any]:
+        """Rebuild the materialized stats document from the images collection"""
+        pipeline = [{"$facet": {
+            "total": [{"$count": "count"}],
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}}
+            ],
+            "sources": [
+                {"$group": {"_id": {"$toLower": SOURCE_HOST_EXPR}, "count": {"$sum": 1}}}
+            ],
+            "categories": [
+                {"$group": {"_id": {"$ifNull": ["$category", "uncategorized"]}, "count": {"$sum": 1}}}
+            ],
+            "last_scraped": [
+                {"$group": {"_id": None, "value": {"$max": "$scraped_at"}}}
             ]
-            category_breakdown = await self.images.aggregate(pipeline).to_list(length=None)
-            
+        }}]
+        result = (await self.images.aggregate(pipeline).to_list(length=1))[0]
+
+        last_scraped = result["last_scraped"][0]["value"] if result["last_scraped"] else None
+        document = {
+            "total_images": result["total"][0]["count"] if result["total"] else 0,
+            "tags": {_stat_key(str(t["_id"])): t["count"] for t in result["tags"]},
+            "sources": {_stat_key(str(s["_id"])): s["count"] for s in result["sources"]},
+            "categories": {_stat_key(str(c["_id"])): c["count"] for c in result["categories"]},
+            "last_scraped": last_scraped if isinstance(last_scraped, datetime) else None,
+            "updated_at": datetime.utcnow(),
+            "reconciled_at": datetime.utcnow()
+        }
+        await self.stats.replace_one({"_id": STATS_DOCUMENT_ID}, document, upsert=True)
+        logger.info(f"Stats reconciled: {document['total_images']} images")
+        return document
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get image statistics from the materialized stats document"""
+        try:
+            document = await self.stats.find_one({"_id": STATS_DOCUMENT_ID})
+            if document is None:
+                # First call on a fresh deployment: build the document once
+                document = await self.reconcile_stats()
+
+            def breakdown(counters: Dict[str, int], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                items = [
+                    {"_id": unquote(key), "count": count}
+                    for key, count in (counters or {}).items()
+                    if count > 0
+                ]
+                if limit is not None:
+                    return heapq.nlargest(limit, items, key=lambda item: item["count"])
+                return sorted(items, key=lambda item: item["count"], reverse=True)
+
             return {
-                "total_images": total_images,
-                "top_tags": top_tags,
-                "source_breakdown": source_breakdown,
-                "category_breakdown": category_breakdown
+                "total_images": document.get("total_images", 0),
+                "top_tags": breakdown(document.get("tags"), limit=10),
+                "source_breakdown": breakdown(document.get("sources")),
+                "category_breakdown": breakdown(document.get("categories")),
+                "last_scraped": document.get("last_scraped")
             }
         except Exception as e:
             logger.error(f"Error getting stats: {str(e)}")
@@ -371,10 +662,126 @@ class Database:
         try:
             image = await self.images.find_one({"image_url": image_url})
             if image:
+                image["_id"] = str(image["_id"])
                 return ImageResponse(**image)
             return None
         except Exception as e:
             logger.error(f"Error getting image by URL: {str(e)}")
             return None
 
+    async def get_image_by_source_url(self, source_url: str) -> Optional[ImageResponse]:
+        """Get an image by the URL it was scraped from; ``image_url`` holds its R2 copy"""
+        try:
+            image = await self.images.find_one({"source_url": source_url})
+            if image:
+                image["_id"] = str(image["_id"])
+                return ImageResponse(**image)
+            return None
+        except Exception as e:
+            logger.error(f"Error getting image by source URL: {str(e)}")
+            return None
+
+    async def get_scrape_yield(self, sites: List[str], terms: List[str]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Historical per-(site, term) scrape stats keyed by (site, term)"""
+        try:
+            cursor = self.scrape_yield.find({"site": {"$in": sites}, "term": {"$in": terms}})
+            return {(doc["site"], doc["term"]): doc async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error getting scrape yield stats: {str(e)}")
+            return {}
+
+    async def record_scrape_yield(
+        self,
+        site: str,
+        term: str,
+        new_images: int,
+        duplicates: int,
+        latency: float,
+        failed: bool,
+        pages: int = 1
+    ):
+        """Add one run's outcome (over ``pages`` page loads) to the (site, term) stats"""
+        try:
+            await self.scrape_yield.update_one(
+                {"site": site, "term": term},
+                {
+                    "$inc": {
+                        "pages": pages,
+                        "runs": 1,
+                        "new_images": new_images,
+                        "duplicates": duplicates,
+                        "failures": int(failed),
+                        "latency_total": latency
+                    },
+                    "$set": {"last_run": datetime.utcnow()}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error recording scrape yield stats: {str(e)}")
+
+    async def get_crawl_checkpoints(self, sites: List[str], terms: List[str]) -> Dict[Tuple[str, str], List[str]]:
+        """Image IDs seen at the top of each (site, term) result page on the last crawl"""
+        try:
+            cursor = self.crawl_checkpoints.find({"site": {"$in": sites}, "term": {"$in": terms}})
+            return {(doc["site"], doc["term"]): doc.get("known_ids", []) async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error getting crawl checkpoints: {str(e)}")
+            return {}
+
+    async def save_crawl_checkpoint(self, site: str, term: str, known_ids: List[str]):
+        """Replace the (site, term) checkpoint, newest image IDs first"""
+        try:
+            await self.crawl_checkpoints.update_one(
+                {"site": site, "term": term},
+                {"$set": {"known_ids": known_ids, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error saving crawl checkpoint: {str(e)}")
+
+    async def claim_images(self, image_ids: List[str], unit_id: Optional[str] = None) -> Set[str]:
+        """Atomically claim image IDs for download; returns the ones no other scraper claimed first
+
+        Claims taken by a work unit are renewed by its heartbeat (see ``ShardStore.heartbeat``).
+        """
+        image_ids = list(dict.fromkeys(image_ids))
+        if not image_ids:
+            return set()
+        now = datetime.utcnow()
+        try:
+            await self.image_claims.insert_many(
+                [
+                    {"_id": image_id, "claimed_at": now, "stored": False, "unit_id": unit_id}
+                    for image_id in image_ids
+                ],
+                ordered=False
+            )
+            return set(image_ids)
+        except BulkWriteError as e:
+            # Duplicate keys are images already claimed; anything else is treated the same, to be safe
+            taken = {image_ids[error["index"]] for error in e.details.get("writeErrors", [])}
+            return set(image_ids) - taken
+        except Exception as e:
+            logger.error(f"Error claiming images: {str(e)}")
+            return set()
+
+    async def mark_claims_stored(self, image_ids: List[str]):
+        """Keep the claims of stored images so they are never downloaded again"""
+        if not image_ids:
+            return
+        try:
+            await self.image_claims.update_many({"_id": {"$in": image_ids}}, {"$set": {"stored": True}})
+        except Exception as e:
+            logger.error(f"Error marking image claims stored: {str(e)}")
+
+    async def release_image_claims(self, image_ids: List[str]):
+        """Give up claims on images that could not be stored"""
+        if not image_ids:
+            return
+        try:
+            await self.image_claims.delete_many({"_id": {"$in": image_ids}})
+        except Exception as e:
+            logger.error(f"Error releasing image claims: {str(e)}")
+
 db = Database() 
\ No newline at end of file
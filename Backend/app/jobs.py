@@ -0,0 +1,783 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import json
+import logging
+import sqlite3
+import uuid
+from pymongo import ReturnDocument
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+EPOCH = datetime(1970, 1, 1)
+
+def _timestamp(value: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime (SQLite stores REAL timestamps)"""
+    return (value - EPOCH).total_seconds()
+
+def scrape_dedupe_key(request: Dict[str, Any]) -> str:
+    """Normalized identity of a scrape request, used to coalesce identical jobs
+
+    max_images is deliberately not part of the key: a job collecting at least
+    as many images can serve the request (see ``find_reusable``). The budget
+    is: a job stopped at its deadline or page cap cannot serve a request
+    without one, or with a different one.
+    """
+    category = " ".join(str(request.get("category", "")).lower().split())
+    url = request.get("url") or ""
+    if url:
+        parts = urlsplit(url.strip())
+        url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+    key = f"{category}|{url}"
+    for field in ("deadline_seconds", "max_pages"):
+        if request.get(field):
+            key += f"|{field}={request[field]}"
+    # A sharded backfill and a regular scrape of the same category are different jobs
+    return f"{key}|sharded" if request.get("sharded") else key
+
+class JobStore(ABC):
+    """Durable queue of scrape jobs shared by the API and the scraper workers"""
+
+    def __init__(self, lease_seconds: int, max_attempts: int):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    async def setup(self):
+        """Create tables/indexes"""
+        pass
+
+    @abstractmethod
+    async def enqueue(
+        self,
+        request: Dict[str, Any],
+        message: str,
+        client_id: Optional[str] = None,
+        priority: int = 1
+    ) -> Dict[str, Any]:
+        """Add a new job to the queue and return it
+
+        ``client_seq`` records how many jobs the client already had queued or
+        running, so leasing serves every client's first job before anyone's
+        second one.
+        """
+        pass
+
+    @abstractmethod
+    async def count(self, status: str, client_id: Optional[str] = None) -> int:
+        """Number of jobs in a state, optionally for one client"""
+        pass
+
+    @abstractmethod
+    async def queue_position(self, job: Dict[str, Any]) -> Optional[int]:
+        """1-based position of a queued job in lease order; None if not queued"""
+        pass
+
+    @abstractmethod
+    async def find_reusable(self, dedupe_key: str, max_images: int, fresh_after: datetime) -> Optional[Dict[str, Any]]:
+        """Most recent job with this key that can serve a request for ``max_images``
+
+        Either still queued/running, or completed after ``fresh_after``.
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by its task id"""
+        pass
+
+    @abstractmethod
+    async def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim the next available job for a worker
+
+        Jobs are served by priority, then client_seq (fairness across
+        clients), then age. Jobs whose lease expired (worker died or stopped
+        heartbeating) are available again until they run out of attempts.
+        Nothing is leased while SCRAPE_MAX_CONCURRENT jobs are running.
+        """
+        pass
+
+    @abstractmethod
+    async def heartbeat(self, task_id: str, worker_id: str, message: Optional[str] = None) -> bool:
+        """Extend the lease of a running job; False if the worker lost the lease"""
+        pass
+
+    @abstractmethod
+    async def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        message: str,
+        result: Optional[Dict[str, Any]] = None,
+        status: str = COMPLETED
+    ):
+        """Mark a leased job as finished with its (possibly partial) result"""
+        pass
+
+    @abstractmethod
+    async def fail(self, task_id: str, worker_id: str, message: str, retry: bool = False):
+        """Fail a leased job, requeueing it with backoff if attempts remain"""
+        pass
+
+    @abstractmethod
+    async def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job outright, or ask the worker running it to stop
+
+        A running job gets ``cancel_requested``; its worker stops it and keeps
+        the images saved so far. Returns the job, or None if it does not exist.
+        """
+        pass
+
+    @abstractmethod
+    async def add_events(self, task_id: str, events: List[Dict[str, Any]]):
+        """Append progress events ({"type": ..., "data": {...}}) to a job's event log"""
+        pass
+
+    @abstractmethod
+    async def get_events(self, task_id: str, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Events of a job in order, starting after the event id ``after``"""
+        pass
+
+    @abstractmethod
+    async def sweep(self) -> int:
+        """Fail abandoned jobs that are out of attempts and purge expired records
+
+        Returns the number of jobs failed or purged.
+        """
+        pass
+
+    def expires_at(self) -> datetime:
+        """When a finished job's status record may be removed"""
+        return datetime.utcnow() + timedelta(seconds=settings.JOB_RESULT_TTL)
+
+    def retry_delay(self, attempts: int) -> int:
+        return min(settings.JOB_RETRY_BACKOFF * (2 ** max(attempts - 1, 0)), 600)
+
+    async def close(self):
+        pass
+
+class MongoJobStore(JobStore):
+    EVENT_GAP_GRACE = 5  # seconds a hole in the event sequence is waited on
+
+    def __init__(self, collection, events_collection, lease_seconds: int, max_attempts: int):
+        super().__init__(lease_seconds, max_attempts)
+        self.jobs = collection
+        self.events = events_collection
+
+    @staticmethod
+    def _to_job(document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if document is None:
+            return None
+        document["task_id"] = document.pop("_id")
+        return document
+
+    async def setup(self):
+        await self.jobs.create_index([("status", 1), ("priority", -1), ("client_seq", 1), ("created_at", 1)])
+        await self.jobs.create_index([("client_id", 1), ("status", 1)])
+        await self.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+        # Finished jobs are removed by MongoDB once expires_at passes
+        await self.jobs.create_index("expires_at", expireAfterSeconds=0)
+        await self.jobs.create_index([("dedupe_key", 1), ("created_at", -1)])
+        await self.events.create_index([("task_id", 1), ("seq", 1)])
+        await self.events.create_index("expires_at", expireAfterSeconds=0)
+
+    async def enqueue(
+        self,
+        request: Dict[str, Any],
+        message: str,
+        client_id: Optional[str] = None,
+        priority: int = 1
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        client_seq = 0
+        if client_id:
+            client_seq = await self.jobs.count_documents(
+                {"client_id": client_id, "status": {"$in": [QUEUED, RUNNING]}}
+            )
+        document = {
+            "_id": str(uuid.uuid4()),
+            "status": QUEUED,
+            "message": message,
+            "request": request,
+            "dedupe_key": scrape_dedupe_key(request),
+            "client_id": client_id,
+            "client_seq": client_seq,
+            "priority": priority,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "available_at": now,
+            "result": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.jobs.insert_one(document)
+        return self._to_job(document)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return self._to_job(await self.jobs.find_one({"_id": task_id}))
+
+    async def find_reusable(self, dedupe_key: str, max_images: int, fresh_after: datetime) -> Optional[Dict[str, Any]]:
+        document = await self.jobs.find_one(
+            {
+                "dedupe_key": dedupe_key,
+                "request.max_images": {"$gte": max_images},
+                "$or": [
+                    {"status": {"$in": [QUEUED, RUNNING]}, "cancel_requested": {"$ne": True}},
+                    {"status": COMPLETED, "updated_at": {"$gte": fresh_after}}
+                ]
+            },
+            sort=[("created_at", -1)]
+        )
+        return self._to_job(document)
+
+    async def count(self, status: str, client_id: Optional[str] = None) -> int:
+        query = {"status": status}
+        if status == RUNNING:
+            query["lease_expires_at"] = {"$gte": datetime.utcnow()}
+        if client_id:
+            query["client_id"] = client_id
+        return await self.jobs.count_documents(query)
+
+    async def queue_position(self, job: Dict[str, Any]) -> Optional[int]:
+        if job["status"] != QUEUED:
+            return None
+        priority, client_seq = job.get("priority", 1), job.get("client_seq", 0)
+        ahead = await self.jobs.count_documents({
+            "status": QUEUED,
+            "$or": [
+                {"priority": {"$gt": priority}},
+                {"priority": priority, "client_seq": {"$lt": client_seq}},
+                {"priority": priority, "client_seq": client_seq, "created_at": {"$lt": job["created_at"]}}
+            ]
+        })
+        return ahead + 1
+
+    async def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        # Checked before claiming; concurrent workers can overshoot the limit by at most one job each
+        if settings.SCRAPE_MAX_CONCURRENT and await self.count(RUNNING) >= settings.SCRAPE_MAX_CONCURRENT:
+            return None
+        document = await self.jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": QUEUED, "available_at": {"$lte": now}},
+                    {"status": RUNNING, "lease_expires_at": {"$lt": now}, "cancel_requested": {"$ne": True}}
+                ],
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "heartbeat_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", -1), ("client_seq", 1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return self._to_job(document)
+
+    async def heartbeat(self, task_id: str, worker_id: str, message: Optional[str] = None) -> bool:
+        now = datetime.utcnow()
+        update = {
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+            "heartbeat_at": now,
+            "updated_at": now
+        }
+        if message:
+            update["message"] = message
+        result = await self.jobs.update_one(
+            {"_id": task_id, "status": RUNNING, "lease_owner": worker_id},
+            {"$set": update}
+        )
+        return result.matched_count == 1
+
+    async def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        message: str,
+        result: Optional[Dict[str, Any]] = None,
+        status: str = COMPLETED
+    ):
+        await self.jobs.update_one(
+            {"_id": task_id, "lease_owner": worker_id},
+            {"$set": {
+                "status": status,
+                "message": message,
+                "result": result,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "expires_at": self.expires_at(),
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def fail(self, task_id: str, worker_id: str, message: str, retry: bool = False):
+        job = await self.get(task_id)
+        if job is None:
+            return
+        now = datetime.utcnow()
+        update = {"message": message, "lease_owner": None, "lease_expires_at": None, "updated_at": now}
+        if job.get("cancel_requested"):
+            update["status"] = CANCELLED
+            update["expires_at"] = self.expires_at()
+        elif retry and job["attempts"] < job["max_attempts"]:
+            update["status"] = QUEUED
+            update["available_at"] = now + timedelta(seconds=self.retry_delay(job["attempts"]))
+        else:
+            update["status"] = FAILED
+            update["expires_at"] = self.expires_at()
+        await self.jobs.update_one({"_id": task_id, "lease_owner": worker_id}, {"$set": update})
+
+    async def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        document = await self.jobs.find_one_and_update(
+            {"_id": task_id, "status": QUEUED},
+            {"$set": {"status": CANCELLED, "message": "Cancelled", "expires_at": self.expires_at(), "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None:
+            document = await self.jobs.find_one_and_update(
+                {"_id": task_id, "status": RUNNING},
+                {"$set": {"cancel_requested": True, "message": "Cancelling", "updated_at": now}},
+                return_document=ReturnDocument.AFTER
+            )
+        if document is None:
+            document = await self.jobs.find_one({"_id": task_id})
+        return self._to_job(document)
+
+    async def add_events(self, task_id: str, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        now = datetime.utcnow()
+        expires_at = self.expires_at()
+        # Both the worker and the API write events, so their order comes from a
+        # per-job counter rather than from ObjectIds generated on two clocks
+        job = await self.jobs.find_one_and_update(
+            {"_id": task_id},
+            {"$inc": {"event_seq": len(events)}},
+            projection={"event_seq": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            return
+        first_seq = job["event_seq"] - len(events) + 1
+        await self.events.insert_many([
+            {"task_id": task_id, "seq": first_seq + offset, "type": event["type"], "data": event.get("data"),
+             "created_at": now, "expires_at": expires_at}
+            for offset, event in enumerate(events)
+        ], ordered=True)
+
+    async def get_events(self, task_id: str, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        after_seq = int(after) if after and after.isdigit() else 0
+        cursor = self.events.find(
+            {"task_id": task_id, "seq": {"$gt": after_seq}}, {"expires_at": 0}
+        ).sort("seq", 1).limit(limit)
+        events = []
+        expected = after_seq + 1
+        gap_grace = timedelta(seconds=self.EVENT_GAP_GRACE)
+        async for event in cursor:
+            # A writer that reserved lower numbers may not have inserted them yet;
+            # wait for them briefly instead of skipping past them
+            if event["seq"] != expected and datetime.utcnow() - event["created_at"] < gap_grace:
+                break
+            events.append({
+                "id": str(event["seq"]), "type": event["type"], "data": event.get("data"),
+                "created_at": event["created_at"]
+            })
+            expected = event["seq"] + 1
+        return events
+
+    async def sweep(self) -> int:
+        # Expired records are deleted by the TTL index; only abandoned jobs need handling here
+        now = datetime.utcnow()
+        result = await self.jobs.update_many(
+            {
+                "status": RUNNING,
+                "lease_expires_at": {"$lt": now},
+                "cancel_requested": {"$ne": True},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {"$set": {
+                "status": FAILED,
+                "message": "Job abandoned by its worker and out of attempts",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "expires_at": self.expires_at(),
+                "updated_at": now
+            }}
+        )
+        # A job cancelled while running whose worker died is finished, not retried
+        cancelled = await self.jobs.update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lt": now}, "cancel_requested": True},
+            {"$set": {
+                "status": CANCELLED,
+                "message": "Cancelled",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "expires_at": self.expires_at(),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count + cancelled.modified_count
+
+class SQLiteJobStore(JobStore):
+    """Single-machine job store for local development without MongoDB"""
+
+    def __init__(self, path: str, lease_seconds: int, max_attempts: int):
+        super().__init__(lease_seconds, max_attempts)
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _to_job(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        for field in ("lease_expires_at", "available_at", "created_at", "updated_at", "expires_at"):
+            if job[field] is not None:
+                job[field] = datetime.utcfromtimestamp(job[field])
+        return job
+
+    async def _run(self, fn, *args):
+        def call():
+            connection = self._connect()
+            try:
+                return fn(connection, *args)
+            finally:
+                connection.close()
+        return await asyncio.to_thread(call)
+
+    async def setup(self):
+        def create(connection):
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_jobs (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    request TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    available_at REAL NOT NULL,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    expires_at REAL,
+                    dedupe_key TEXT,
+                    max_images INTEGER,
+                    client_id TEXT,
+                    client_seq INTEGER NOT NULL DEFAULT 0,
+                    priority INTEGER NOT NULL DEFAULT 1,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Columns added after the table was first created
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(scrape_jobs)")}
+            for column, column_type in (
+                ("expires_at", "REAL"),
+                ("dedupe_key", "TEXT"),
+                ("max_images", "INTEGER"),
+                ("client_id", "TEXT"),
+                ("client_seq", "INTEGER NOT NULL DEFAULT 0"),
+                ("priority", "INTEGER NOT NULL DEFAULT 1"),
+                ("cancel_requested", "INTEGER NOT NULL DEFAULT 0")
+            ):
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE scrape_jobs ADD COLUMN {column} {column_type}")
+            connection.execute("DROP INDEX IF EXISTS scrape_jobs_status")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_jobs_lease_order "
+                "ON scrape_jobs (status, priority DESC, client_seq, created_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_jobs_client ON scrape_jobs (client_id, status)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_jobs_expires_at ON scrape_jobs (expires_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_jobs_dedupe_key ON scrape_jobs (dedupe_key, created_at)"
+            )
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_job_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    data TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_job_events_task ON scrape_job_events (task_id, id)"
+            )
+        await self._run(create)
+
+    async def enqueue(
+        self,
+        request: Dict[str, Any],
+        message: str,
+        client_id: Optional[str] = None,
+        priority: int = 1
+    ) -> Dict[str, Any]:
+        task_id = str(uuid.uuid4())
+        now = _timestamp(datetime.utcnow())
+
+        def insert(connection):
+            client_seq = 0
+            if client_id:
+                client_seq = connection.execute(
+                    "SELECT COUNT(*) FROM scrape_jobs WHERE client_id = ? AND status IN (?, ?)",
+                    (client_id, QUEUED, RUNNING)
+                ).fetchone()[0]
+            connection.execute(
+                "INSERT INTO scrape_jobs (task_id, status, message, request, attempts, max_attempts, "
+                "available_at, created_at, updated_at, dedupe_key, max_images, client_id, client_seq, priority) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, QUEUED, message, json.dumps(request), self.max_attempts, now, now, now,
+                 scrape_dedupe_key(request), request.get("max_images", 0), client_id, client_seq, priority)
+            )
+            return connection.execute("SELECT * FROM scrape_jobs WHERE task_id = ?", (task_id,)).fetchone()
+        return self._to_job(await self._run(insert))
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        def select(connection):
+            return connection.execute("SELECT * FROM scrape_jobs WHERE task_id = ?", (task_id,)).fetchone()
+        return self._to_job(await self._run(select))
+
+    async def count(self, status: str, client_id: Optional[str] = None) -> int:
+        now = _timestamp(datetime.utcnow())
+        query, params = "SELECT COUNT(*) FROM scrape_jobs WHERE status = ?", [status]
+        if status == RUNNING:
+            query += " AND lease_expires_at >= ?"
+            params.append(now)
+        if client_id:
+            query += " AND client_id = ?"
+            params.append(client_id)
+
+        def select(connection):
+            return connection.execute(query, params).fetchone()[0]
+        return await self._run(select)
+
+    async def queue_position(self, job: Dict[str, Any]) -> Optional[int]:
+        if job["status"] != QUEUED:
+            return None
+        priority, client_seq = job.get("priority", 1), job.get("client_seq", 0)
+        created_at = _timestamp(job["created_at"])
+
+        def select(connection):
+            return connection.execute(
+                "SELECT COUNT(*) FROM scrape_jobs WHERE status = ? AND (priority > ? OR "
+                "(priority = ? AND client_seq < ?) OR (priority = ? AND client_seq = ? AND created_at < ?))",
+                (QUEUED, priority, priority, client_seq, priority, client_seq, created_at)
+            ).fetchone()[0]
+        return await self._run(select) + 1
+
+    async def find_reusable(self, dedupe_key: str, max_images: int, fresh_after: datetime) -> Optional[Dict[str, Any]]:
+        def select(connection):
+            return connection.execute(
+                "SELECT * FROM scrape_jobs WHERE dedupe_key = ? AND max_images >= ? AND "
+                "((status IN (?, ?) AND cancel_requested = 0) OR (status = ? AND updated_at >= ?)) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedupe_key, max_images, QUEUED, RUNNING, COMPLETED, _timestamp(fresh_after))
+            ).fetchone()
+        return self._to_job(await self._run(select))
+
+    async def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = _timestamp(datetime.utcnow())
+
+        def claim(connection):
+            # BEGIN IMMEDIATE takes the write lock so two workers cannot claim the same row
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if settings.SCRAPE_MAX_CONCURRENT:
+                    running = connection.execute(
+                        "SELECT COUNT(*) FROM scrape_jobs WHERE status = ? AND lease_expires_at >= ?",
+                        (RUNNING, now)
+                    ).fetchone()[0]
+                    if running >= settings.SCRAPE_MAX_CONCURRENT:
+                        connection.execute("COMMIT")
+                        return None
+                row = connection.execute(
+                    "SELECT task_id FROM scrape_jobs WHERE attempts < max_attempts AND ("
+                    "(status = ? AND available_at <= ?) OR "
+                    "(status = ? AND lease_expires_at < ? AND cancel_requested = 0)"
+                    ") ORDER BY priority DESC, client_seq, created_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    connection.execute("COMMIT")
+                    return None
+                connection.execute(
+                    "UPDATE scrape_jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE task_id = ?",
+                    (RUNNING, worker_id, now + self.lease_seconds, now, row["task_id"])
+                )
+                job = connection.execute("SELECT * FROM scrape_jobs WHERE task_id = ?", (row["task_id"],)).fetchone()
+                connection.execute("COMMIT")
+                return job
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return self._to_job(await self._run(claim))
+
+    async def heartbeat(self, task_id: str, worker_id: str, message: Optional[str] = None) -> bool:
+        now = _timestamp(datetime.utcnow())
+
+        def touch(connection):
+            cursor = connection.execute(
+                "UPDATE scrape_jobs SET lease_expires_at = ?, updated_at = ?, message = COALESCE(?, message) "
+                "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (now + self.lease_seconds, now, message, task_id, RUNNING, worker_id)
+            )
+            return cursor.rowcount == 1
+        return await self._run(touch)
+
+    async def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        message: str,
+        result: Optional[Dict[str, Any]] = None,
+        status: str = COMPLETED
+    ):
+        now = _timestamp(datetime.utcnow())
+
+        def update(connection):
+            connection.execute(
+                "UPDATE scrape_jobs SET status = ?, message = ?, result = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, expires_at = ?, updated_at = ? WHERE task_id = ? AND lease_owner = ?",
+                (status, message, json.dumps(result) if result else None, _timestamp(self.expires_at()),
+                 now, task_id, worker_id)
+            )
+        await self._run(update)
+
+    async def fail(self, task_id: str, worker_id: str, message: str, retry: bool = False):
+        job = await self.get(task_id)
+        if job is None:
+            return
+        now = _timestamp(datetime.utcnow())
+        if job["cancel_requested"]:
+            status, available_at, expires_at = CANCELLED, now, _timestamp(self.expires_at())
+        elif retry and job["attempts"] < job["max_attempts"]:
+            status, available_at, expires_at = QUEUED, now + self.retry_delay(job["attempts"]), None
+        else:
+            status, available_at, expires_at = FAILED, now, _timestamp(self.expires_at())
+
+        def update(connection):
+            connection.execute(
+                "UPDATE scrape_jobs SET status = ?, message = ?, available_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, expires_at = ?, updated_at = ? WHERE task_id = ? AND lease_owner = ?",
+                (status, message, available_at, expires_at, now, task_id, worker_id)
+            )
+        await self._run(update)
+
+    async def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        now = _timestamp(datetime.utcnow())
+        expires_at = _timestamp(self.expires_at())
+
+        def update(connection):
+            connection.execute(
+                "UPDATE scrape_jobs SET status = ?, message = ?, expires_at = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = ?",
+                (CANCELLED, "Cancelled", expires_at, now, task_id, QUEUED)
+            )
+            connection.execute(
+                "UPDATE scrape_jobs SET cancel_requested = 1, message = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = ?",
+                ("Cancelling", now, task_id, RUNNING)
+            )
+            return connection.execute("SELECT * FROM scrape_jobs WHERE task_id = ?", (task_id,)).fetchone()
+        return self._to_job(await self._run(update))
+
+    async def sweep(self) -> int:
+        now = _timestamp(datetime.utcnow())
+        expires_at = _timestamp(self.expires_at())
+
+        def clean(connection):
+            abandoned = connection.execute(
+                "UPDATE scrape_jobs SET status = ?, message = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "expires_at = ?, updated_at = ? WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts "
+                "AND cancel_requested = 0",
+                (FAILED, "Job abandoned by its worker and out of attempts", expires_at, now, RUNNING, now)
+            ).rowcount
+            abandoned += connection.execute(
+                "UPDATE scrape_jobs SET status = ?, message = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "expires_at = ?, updated_at = ? WHERE status = ? AND lease_expires_at < ? AND cancel_requested = 1",
+                (CANCELLED, "Cancelled", expires_at, now, RUNNING, now)
+            ).rowcount
+            purged = connection.execute(
+                "DELETE FROM scrape_jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            ).rowcount
+            connection.execute("DELETE FROM scrape_job_events WHERE expires_at < ?", (now,))
+            return abandoned + purged
+        return await self._run(clean)
+
+    async def add_events(self, task_id: str, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        now = _timestamp(datetime.utcnow())
+        expires_at = _timestamp(self.expires_at())
+
+        def insert(connection):
+            connection.executemany(
+                "INSERT INTO scrape_job_events (task_id, type, data, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                [(task_id, event["type"], json.dumps(event.get("data"), default=str), now, expires_at)
+                 for event in events]
+            )
+        await self._run(insert)
+
+    async def get_events(self, task_id: str, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        after_id = int(after) if after and after.isdigit() else 0
+
+        def select(connection):
+            return connection.execute(
+                "SELECT id, type, data, created_at FROM scrape_job_events WHERE task_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (task_id, after_id, limit)
+            ).fetchall()
+        return [
+            {"id": str(row["id"]), "type": row["type"], "data": json.loads(row["data"]) if row["data"] else None,
+             "created_at": datetime.utcfromtimestamp(row["created_at"])}
+            for row in await self._run(select)
+        ]
+
+def create_job_store(database=None) -> JobStore:
+    if settings.JOB_STORE == "sqlite":
+        return SQLiteJobStore(settings.JOB_SQLITE_PATH, settings.JOB_LEASE_SECONDS, settings.JOB_MAX_ATTEMPTS)
+    if database is None:
+        from .database import db as database
+    return MongoJobStore(
+        database.db.scrape_jobs,
+        database.db.scrape_job_events,
+        settings.JOB_LEASE_SECONDS,
+        settings.JOB_MAX_ATTEMPTS
+    )
+
+job_store = create_job_store()
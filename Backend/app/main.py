@@ -2,11 +2,14 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 from loguru import logger
 import sys
 from .config import settings
 from .database import db
+from .jobs import job_store
+from .suggest import suggestions
 from .api.routes import router as api_router
 
 # Configure logging
@@ -40,13 +43,47 @@ app.mount("/images", StaticFiles(directory=settings.IMAGE_STORAGE_PATH), name="i
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+background_jobs = []
+
+async def run_periodically(name: str, job, interval: float):
+    """Run a maintenance coroutine every ``interval`` seconds until cancelled"""
+    while True:
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"{name} failed: {str(e)}")
+        await asyncio.sleep(interval)
+
 @app.on_event("startup")
 async def startup_event():
     await db.connect_to_database()
+    await job_store.setup()
     logger.info("Connected to database")
+    # Rebuild the materialized stats document to repair counter drift
+    background_jobs.append(asyncio.create_task(
+        run_periodically("Stats reconciliation", db.reconcile_stats, settings.STATS_RECONCILE_INTERVAL)
+    ))
+    # One sweeper expires finished task records and fails abandoned jobs
+    background_jobs.append(asyncio.create_task(
+        run_periodically("Job sweep", job_store.sweep, settings.JOB_SWEEP_INTERVAL)
+    ))
+    # Built at startup and rebuilt periodically, since workers ingest in other processes
+    background_jobs.append(asyncio.create_task(
+        run_periodically("Suggestion index refresh", lambda: suggestions.refresh(db.images), settings.SUGGEST_REFRESH_INTERVAL)
+    ))
+    if settings.EMBEDDED_WORKER:
+        from .shards import shard_store
+        from .worker import Worker
+        await shard_store.setup()
+        worker = Worker("api-embedded", concurrency=settings.WORKER_CONCURRENCY)
+        background_jobs.extend(asyncio.create_task(worker.slot()) for _ in range(worker.concurrency))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    for job in background_jobs:
+        job.cancel()
+    background_jobs.clear()
+    await job_store.close()
     await db.close_database_connection()
     logger.info("Disconnected from database")
 
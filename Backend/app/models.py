@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, HttpUrl
 from bson import ObjectId
 
@@ -18,6 +18,15 @@ class PyObjectId(ObjectId):
     def __modify_schema__(cls, field_schema):
         field_schema.update(type="string")
 
+# Fields that can be requested through the /images ``fields`` parameter
+IMAGE_FIELDS = [
+    "_id", "title", "image_url", "source_url", "tags", "local_path",
+    "scraped_at", "category", "r2_url", "created_at", "updated_at"
+]
+
+# What the gallery grid needs to render a card
+COMPACT_IMAGE_FIELDS = ["_id", "title", "image_url", "r2_url", "category", "scraped_at"]
+
 class ImageBase(BaseModel):
     title: str
     image_url: HttpUrl
@@ -46,19 +55,52 @@ class ImageResponse(ImageBase):
         json_encoders = {ObjectId: str}
         populate_by_name = True
 
+class ImageBatchRequest(BaseModel):
+    ids: List[str]
+
+class ImageBatchResponse(BaseModel):
+    images: List[ImageResponse]
+    missing: List[str] = []  # Requested IDs that do not exist
+
+class ImageFacets(BaseModel):
+    categories: List[dict]  # [{"_id": value, "count": n}], most frequent first
+    sources: List[dict]
+    tags: List[dict]
+
+class ImageFacetsResponse(BaseModel):
+    images: List[ImageResponse]
+    total: int  # Images matching the filters
+    facets: ImageFacets
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # "category", "tag" or "title"
+    count: int  # Images the term appears in
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: List[Suggestion]
+
 class ScrapeRequest(BaseModel):
     category: str
     max_images: int = 100
     url: Optional[str] = None
     tags: Optional[List[str]] = None
+    priority: Literal["low", "normal", "high"] = "normal"
+    sharded: bool = False  # Split into (site, term, page) work units leased by all workers
+    deadline_seconds: Optional[int] = Field(None, gt=0)  # Stop with partial results after this long
+    max_pages: Optional[int] = Field(None, gt=0)  # Stop after this many result page loads
 
 class ScrapeResponse(BaseModel):
     task_id: str
     status: str
     message: str
+    coalesced: bool = False  # True when attached to an existing job
+    queue_position: Optional[int] = None  # Position in the wait queue while queued
 
 class StatsResponse(BaseModel):
     total_images: int
     top_tags: List[dict]
     source_breakdown: List[dict]
+    category_breakdown: List[dict] = []
     last_scraped: Optional[datetime] = None 
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""Network clients shared by the whole process.
+
+The API, the job stores and every scraper borrow the same MongoDB client and
+HTTP session from ``resources`` instead of opening their own, so concurrent
+jobs reuse pooled connections. Only application shutdown closes them.
+"""
+import logging
+from typing import Optional
+import aiohttp
+from motor.motor_asyncio import AsyncIOMotorClient
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+def accept_encoding() -> str:
+    """Response encodings aiohttp can decode here; brotli needs the optional Brotli package"""
+    if not settings.HTTP_COMPRESSION:
+        return "identity"
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        pass
+    return ", ".join(encodings)
+
+class Resources:
+    def __init__(self):
+        self._mongo: Optional[AsyncIOMotorClient] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def mongo(self) -> AsyncIOMotorClient:
+        """The MongoDB client; Motor connects lazily on first use"""
+        if self._mongo is None:
+            options = {
+                "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+                "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+                "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+                "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+                "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                "readPreference": settings.MONGODB_READ_PREFERENCE
+            }
+            if settings.MONGODB_SOCKET_TIMEOUT_MS:
+                options["socketTimeoutMS"] = settings.MONGODB_SOCKET_TIMEOUT_MS
+            if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+                options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+            self._mongo = AsyncIOMotorClient(settings.MONGODB_URL, **options)
+        return self._mongo
+
+    @property
+    def http(self) -> aiohttp.ClientSession:
+        """The HTTP session; must first be used inside the running event loop
+
+        Keep-alive connections are pooled per host (capped so one CDN cannot
+        take the whole pool) and DNS answers are cached, so repeated
+        downloads from the same hosts skip the TCP/TLS handshake and lookup.
+        """
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=settings.HTTP_TOTAL_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                sock_read=settings.HTTP_READ_TIMEOUT
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"Accept-Encoding": accept_encoding()}
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            try:
+                await self._http.close()
+            except Exception as e:
+                logger.error(f"Failed to close HTTP session: {str(e)}")
+            self._http = None
+        if self._mongo is not None:
+            self._mongo.close()
+            self._mongo = None
+            logger.info("Database connection closed successfully")
+
+resources = Resources()
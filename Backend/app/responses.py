@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import orjson
+from .config import settings
+
+def _default(obj: Any) -> Any:
+    """Handle the types orjson does not serialize natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.dict(by_alias=True)
+    # pydantic Url types, Decimal, ...
+    return str(obj)
+
+def dumps(content: Any) -> bytes:
+    """Serialize a response payload to JSON bytes
+
+    datetime and dataclasses are handled natively by orjson; ObjectId and
+    pydantic models go through ``_default``. With FAST_JSON_RESPONSES
+    disabled this falls back to FastAPI's jsonable_encoder.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(content, custom_encoder={ObjectId: str})).encode()
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag of a response body; hashing a serialized page is far cheaper than the query behind it"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def cached_json_response(
+    request: Request,
+    body: bytes,
+    cache_control: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """JSON response with an ETag and Cache-Control, or a 304 if the client already has this body"""
+    etag = etag_for(body)
+    headers = {**(headers or {}), "ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
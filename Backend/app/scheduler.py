@@ -0,0 +1,56 @@
+from typing import Optional
+import ipaddress
+import math
+from fastapi import Request
+from .config import settings
+from .jobs import QUEUED, JobStore
+
+# Priority levels accepted by ScrapeRequest.priority
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+class QueueFullError(Exception):
+    """Raised when a scrape job cannot be admitted to the queue"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+def is_trusted_proxy(host: Optional[str]) -> bool:
+    """Whether ``host`` is one of the TRUSTED_PROXIES addresses or networks"""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.TRUSTED_PROXIES)
+
+def client_id_for(request: Request) -> str:
+    """Identify the caller for per-client fairness and limits
+
+    The client address, unless a trusted proxy passes on the identity it
+    established in ``X-Client-Id``; callers cannot pick their own.
+    """
+    host = request.client.host if request.client else None
+    client_id = request.headers.get("x-client-id")
+    if client_id and is_trusted_proxy(host):
+        return client_id[:128]
+    return host or "unknown"
+
+def estimate_retry_after(queued: int) -> int:
+    """Rough time until a queue slot frees up, for the Retry-After header"""
+    slots = max(settings.SCRAPE_MAX_CONCURRENT, 1)
+    seconds = math.ceil((queued + 1) / slots) * settings.SCRAPE_AVG_JOB_SECONDS
+    return max(5, min(seconds, 600))
+
+async def admit(store: JobStore, client_id: Optional[str]):
+    """Check the global and per-client queue bounds before enqueueing a job"""
+    queued = await store.count(QUEUED)
+    if queued >= settings.SCRAPE_QUEUE_LIMIT:
+        raise QueueFullError("Scrape queue is full, try again later", estimate_retry_after(queued))
+    if client_id and settings.SCRAPE_MAX_QUEUED_PER_CLIENT:
+        client_queued = await store.count(QUEUED, client_id=client_id)
+        if client_queued >= settings.SCRAPE_MAX_QUEUED_PER_CLIENT:
+            raise QueueFullError(
+                "Too many queued scrape jobs for this client, try again later",
+                estimate_retry_after(client_queued)
+            )
@@ -0,0 +1,18 @@
+"""Site adapters, one module per site.
+
+Adapters register themselves with ``@register``; the scraper tries sites in
+registration order until it has yield history for them.
+"""
+from typing import Dict, List, Type
+from ..base_scraper import BaseScraper
+
+ADAPTERS: Dict[str, Type[BaseScraper]] = {}
+
+def register(adapter_class: Type[BaseScraper]) -> Type[BaseScraper]:
+    ADAPTERS[adapter_class.name] = adapter_class
+    return adapter_class
+
+def get_adapters() -> List[BaseScraper]:
+    return [adapter_class() for adapter_class in ADAPTERS.values()]
+
+from . import unsplash, pexels, pixabay, freepik, rawpixel  # noqa: E402,F401
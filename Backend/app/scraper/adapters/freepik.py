@@ -0,0 +1,10 @@
+from ..base_scraper import StaticHtmlScraper
+from . import register
+
+@register
+class FreepikScraper(StaticHtmlScraper):
+    name = "freepik"
+    search_url = "https://www.freepik.com/search?format=search&query={category}"
+    page_url = "https://www.freepik.com/search?format=search&query={category}&page={page}"
+    max_pages = 5
+    img_selector = "img[src*='freepik.com'], img[src*='image']"
@@ -0,0 +1,28 @@
+from typing import Any, Dict, List
+from ..base_scraper import EmbeddedStateScraper
+from . import register
+
+@register
+class PexelsScraper(EmbeddedStateScraper):
+    name = "pexels"
+    search_url = "https://www.pexels.com/search/{category}/"
+    page_url = "https://www.pexels.com/search/{category}/?page={page}"
+    max_pages = 5
+    img_selector = "img[src*='pexels.com'], img[src*='photo']"
+
+    def images_from_state(self, state: Any) -> List[Dict[str, Any]]:
+        images = []
+        for item in state["props"]["pageProps"]["initialData"]["data"]:
+            attributes = item.get("attributes") or {}
+            image = attributes.get("image") or {}
+            image_url = image.get("large") or image.get("medium")
+            if not image_url:
+                continue
+            images.append({
+                "image_url": image_url,
+                "title": attributes.get("alt") or attributes.get("title") or "",
+                "tags": [tag if isinstance(tag, str) else tag.get("name", "") for tag in attributes.get("tags") or []],
+                "width": attributes.get("width"),
+                "height": attributes.get("height")
+            })
+        return images
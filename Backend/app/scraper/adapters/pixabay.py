@@ -0,0 +1,10 @@
+from ..base_scraper import StaticHtmlScraper
+from . import register
+
+@register
+class PixabayScraper(StaticHtmlScraper):
+    name = "pixabay"
+    search_url = "https://pixabay.com/images/search/{category}/"
+    page_url = "https://pixabay.com/images/search/{category}/?pagi={page}"
+    max_pages = 5
+    img_selector = "img[src*='pixabay.com'], img[data-lazy-src*='pixabay.com'], img[src*='photo']"
@@ -0,0 +1,10 @@
+from ..base_scraper import BrowserScraper
+from . import register
+
+@register
+class RawpixelScraper(BrowserScraper):
+    name = "rawpixel"
+    search_url = "https://www.rawpixel.com/search/{category}"
+    img_selector = "img[src*='rawpixel.com'], img[src*='image']"
+    page_rate = 0.2
+    page_burst = 1
@@ -0,0 +1,30 @@
+from typing import Any, Dict, List
+from urllib.parse import quote_plus
+from ..base_scraper import JsonApiScraper
+from . import register
+
+@register
+class UnsplashScraper(JsonApiScraper):
+    name = "unsplash"
+    search_url = "https://unsplash.com/s/photos/{category}"
+    page_url = "https://unsplash.com/napi/search/photos?query={category}&page={page}&per_page=30"
+    max_pages = 5
+    img_selector = "img[src*='images.unsplash.com'], img[src*='photo']"
+    page_rate = 1.0
+    page_burst = 3
+
+    def result_page(self, query: str, page: int) -> str:
+        return self.page_url.format(category=quote_plus(query), page=page)
+
+    def images_from_json(self, data: Any) -> List[Dict[str, Any]]:
+        return [
+            {
+                "image_url": photo["urls"]["regular"],
+                "title": photo.get("alt_description") or photo.get("description") or "",
+                "tags": [tag["title"] for tag in photo.get("tags") or [] if tag.get("title")],
+                "width": photo.get("width"),
+                "height": photo.get("height")
+            }
+            for photo in data["results"]
+            if photo.get("urls", {}).get("regular")
+        ]
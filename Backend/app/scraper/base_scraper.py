@@ -1,35 +1,105 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from ..models import ImageResponse
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from .static_html import image_candidate, script_content, select
+
+logger = logging.getLogger(__name__)
+
+# Extraction strategies, fastest first
+JSON_API = "json_api"  # A JSON search endpoint
+EMBEDDED_STATE = "embedded_state"  # JSON state embedded in the server-rendered page
+STATIC_HTML = "static_html"  # <img> tags in the server-rendered page
+BROWSER = "browser"  # Only rendered by JavaScript: Selenium with infinite scroll
 
 class BaseScraper(ABC):
-    """Base class for all image scrapers"""
-    
-    def __init__(self):
-        """Initialize the base scraper"""
+    """Base class for all image scrapers
+
+    Each site adapter declares how its search results are best extracted and
+    parses a fetched results page into image candidates: dicts with
+    ``image_url``, ``title``, ``tags``, ``width`` and ``height`` (sizes may be
+    None when unknown). Parsing is pure, so adapters are tested against saved
+    fixtures without network access.
+    """
+
+    name: str = ""
+    strategy: str = BROWSER
+    search_url: str = ""  # Browser search page, formatted with {category}
+    page_url: Optional[str] = None  # Page-numbered results fetched over HTTP, with {category} and {page}
+    max_pages: int = 1
+    img_selector: str = "img"  # Images in the rendered page, for the browser path
+    page_rate: Optional[float] = None  # Page loads per second, overriding SCRAPER_PAGE_RATE
+    page_burst: Optional[int] = None
+
+    def format_query(self, query: str) -> str:
+        return query.replace(" ", "-")
+
+    def search_page(self, query: str) -> str:
+        return self.search_url.format(category=self.format_query(query))
+
+    def result_page(self, query: str, page: int) -> str:
+        return self.page_url.format(category=self.format_query(query), page=page)
+
+    @property
+    def uses_http(self) -> bool:
+        """Whether results can be fetched without the browser"""
+        return self.strategy != BROWSER and bool(self.page_url)
+
+    @abstractmethod
+    def parse(self, body: str, page_url: str) -> List[Dict[str, Any]]:
+        """Image candidates in a results page fetched over HTTP"""
         pass
 
+    def parse_rendered(self, html: str, page_url: str) -> List[Dict[str, Any]]:
+        """Image candidates in the page as rendered by the browser"""
+        candidates = (image_candidate(attrs, page_url) for attrs in select(html, self.img_selector))
+        return [candidate for candidate in candidates if candidate]
+
+class StaticHtmlScraper(BaseScraper):
+    """Sites whose result pages list their images as <img> tags"""
+
+    strategy = STATIC_HTML
+
+    def parse(self, body: str, page_url: str) -> List[Dict[str, Any]]:
+        return self.parse_rendered(body, page_url)
+
+class BrowserScraper(StaticHtmlScraper):
+    """Sites that only render results with JavaScript"""
+
+    strategy = BROWSER
+
+class JsonApiScraper(BaseScraper):
+    """Sites with a JSON search endpoint"""
+
+    strategy = JSON_API
+
+    def parse(self, body: str, page_url: str) -> List[Dict[str, Any]]:
+        try:
+            return self.images_from_json(json.loads(body))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Unexpected JSON from {page_url}: {str(e)}")
+            return []
+
     @abstractmethod
-    def get_images(self, query: str, per_page: int = 30) -> List[ImageResponse]:
-        """Get images from the source
-        
-        Args:
-            query (str): Search query
-            per_page (int, optional): Number of images per page. Defaults to 30.
-            
-        Returns:
-            List[ImageResponse]: List of images
-        """
+    def images_from_json(self, data: Any) -> List[Dict[str, Any]]:
         pass
 
+class EmbeddedStateScraper(BaseScraper):
+    """Sites that embed their search results as JSON in a <script> tag"""
+
+    strategy = EMBEDDED_STATE
+    state_script_id = "__NEXT_DATA__"
+
+    def parse(self, body: str, page_url: str) -> List[Dict[str, Any]]:
+        state = script_content(body, self.state_script_id)
+        if not state:
+            return []
+        try:
+            return self.images_from_state(json.loads(state))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Unexpected embedded state on {page_url}: {str(e)}")
+            return []
+
     @abstractmethod
-    def _determine_category(self, data: Dict) -> str:
-        """Determine the category of an image based on its metadata
-        
-        Args:
-            data (Dict): Image metadata
-            
-        Returns:
-            str: Category name
-        """
-        pass 
\ No newline at end of file
+    def images_from_state(self, state: Any) -> List[Dict[str, Any]]:
+        pass
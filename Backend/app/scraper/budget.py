@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..config import settings
+
+# Reasons a scrape stopped early
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+PAGE_BUDGET = "max_pages"
+
+class BudgetExceeded(Exception):
+    """Raised inside the scraper once its job is cancelled or out of time or pages"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Scrape stopped: {reason}")
+        self.reason = reason
+
+class ScrapeBudget:
+    """Deadline, page budget and cancellation flag of one scrape job
+
+    The scraper checks it before each page and image, and races slow awaits
+    (page fetches, downloads, uploads, sleeps) against it, so a stopped job
+    returns promptly with the images saved so far. Running out of pages only
+    stops new page loads; cancellation and the deadline also interrupt work
+    in flight.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: Optional[float] = None,
+        max_pages: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.deadline = clock() + deadline_seconds if deadline_seconds else None
+        self.max_pages = max_pages
+        self.pages = 0
+        self.cancelled = asyncio.Event()
+
+    @classmethod
+    def for_request(cls, request: Dict[str, Any]) -> "ScrapeBudget":
+        """Budget of a scrape request, capped by the operator limits"""
+        # A limit of 0 in the settings means unlimited
+        deadline_seconds = request.get("deadline_seconds") or settings.SCRAPE_MAX_DEADLINE or None
+        max_pages = request.get("max_pages") or settings.SCRAPE_MAX_PAGES or None
+        if deadline_seconds and settings.SCRAPE_MAX_DEADLINE:
+            deadline_seconds = min(deadline_seconds, settings.SCRAPE_MAX_DEADLINE)
+        if max_pages and settings.SCRAPE_MAX_PAGES:
+            max_pages = min(max_pages, settings.SCRAPE_MAX_PAGES)
+        return cls(deadline_seconds, max_pages)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline; None without one"""
+        return None if self.deadline is None else max(self.deadline - self.clock(), 0.0)
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        """Why work in flight must stop now, if it must"""
+        if self.cancelled.is_set():
+            return CANCELLED
+        if self.deadline is not None and self.clock() >= self.deadline:
+            return DEADLINE
+        return None
+
+    @property
+    def exhausted(self) -> Optional[str]:
+        """Why no further page may be loaded, if none may"""
+        if self.stop_reason:
+            return self.stop_reason
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return PAGE_BUDGET
+        return None
+
+    def charge_page(self) -> bool:
+        """Spend one page load; False if the budget has none left"""
+        if self.exhausted:
+            return False
+        self.pages += 1
+        return True
+
+    async def run(self, awaitable: Awaitable):
+        """Await ``awaitable``, abandoning it if the job is stopped first"""
+        reason = self.stop_reason
+        if reason:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise BudgetExceeded(reason)
+        task = asyncio.ensure_future(awaitable)
+        stopped = asyncio.ensure_future(self.cancelled.wait())
+        try:
+            done, _ = await asyncio.wait({task, stopped}, timeout=self.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            stopped.cancel()
+        if task in done:
+            return task.result()
+        task.cancel()
+        raise BudgetExceeded(self.stop_reason or DEADLINE)
+
+    async def sleep(self, seconds: float):
+        """asyncio.sleep that wakes up as soon as the job is stopped"""
+        try:
+            await self.run(asyncio.sleep(seconds))
+        except BudgetExceeded:
+            pass
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class CachedResponse:
+    """Status, headers and body of a GET, fetched or served from the cache"""
+
+    def __init__(self, status: int, headers, body: Optional[bytes] = None, encoding: Optional[str] = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+class HttpCache:
+    """On-disk HTTP cache for the scraper's page fetches and image downloads
+
+    Responses carrying an ETag or Last-Modified are stored and revalidated
+    with conditional GETs, so an unchanged page or image costs a 304 instead
+    of a full transfer. Bodies are content-addressed (``bodies/<sha256>``),
+    so identical images behind different URLs are kept once, and the least
+    recently used entries are evicted once the bodies exceed ``max_bytes``.
+    In ``offline`` mode every response is stored and cached URLs are served
+    without touching the network, which makes development and benchmark
+    runs repeatable.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, offline: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # URL key -> metadata, oldest first
+        self.bodies: Dict[str, list] = {}  # digest -> [size, number of entries using it]
+        self.total_bytes = 0
+        self.loaded = False
+        self.hits = 0  # Revalidated with a 304
+        self.offline_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, "entries", f"{key}.json")
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+    def _load(self):
+        """Rebuild the index from the entry files, least recently used first"""
+        entries = []
+        entries_dir = os.path.join(self.directory, "entries")
+        os.makedirs(entries_dir, exist_ok=True)
+        for name in os.listdir(entries_dir):
+            path = os.path.join(entries_dir, name)
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+                if os.path.exists(self._body_path(entry["digest"])):
+                    entries.append((os.path.getmtime(path), name[:-len(".json")], entry))
+            except (OSError, ValueError, KeyError):
+                continue
+        for _, key, entry in sorted(entries, key=lambda item: item[0]):
+            self._add(key, entry)
+
+    async def setup(self):
+        if not self.loaded:
+            await asyncio.to_thread(self._load)
+            self.loaded = True
+            self.evict()
+
+    def _add(self, key: str, entry: Dict[str, Any]):
+        self.entries[key] = entry
+        body = self.bodies.setdefault(entry["digest"], [entry["size"], 0])
+        if body[1] == 0:
+            self.total_bytes += entry["size"]
+        body[1] += 1
+
+    def _release(self, entry: Dict[str, Any]):
+        """Drop one reference to an entry's body, deleting the body with the last one"""
+        body = self.bodies[entry["digest"]]
+        body[1] -= 1
+        if body[1] == 0:
+            del self.bodies[entry["digest"]]
+            self.total_bytes -= entry["size"]
+            try:
+                os.remove(self._body_path(entry["digest"]))
+            except OSError:
+                pass
+
+    def _remove(self, key: str):
+        self._release(self.entries.pop(key))
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _write(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # A unique temporary file per write: concurrent stores of the same body must not share one
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            f.write(data)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def _read(self, digest: str) -> bytes:
+        with open(self._body_path(digest), "rb") as f:
+            return f.read()
+
+    async def _cached(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            body = await asyncio.to_thread(self._read, entry["digest"])
+            # Entry file mtimes record recency across restarts
+            await asyncio.to_thread(os.utime, self._entry_path(key))
+        except OSError as e:
+            self.errors += 1
+            logger.warning(f"HTTP cache read failed: {str(e)}")
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return CachedResponse(200, entry["headers"], body, entry.get("encoding"))
+
+    async def _store(self, key: str, url: str, response, body: bytes, encoding: Optional[str]):
+        headers = response.headers
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+        validators = {name: headers[name] for name in ("ETag", "Last-Modified") if name in headers}
+        if not validators and not self.offline:
+            return  # Nothing to revalidate with
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "digest": digest,
+            "size": len(body),
+            "encoding": encoding,
+            "headers": {**validators, "Content-Type": headers.get("Content-Type", "")}
+        }
+        try:
+            if digest not in self.bodies:
+                await asyncio.to_thread(self._write, self._body_path(digest), body)
+            await asyncio.to_thread(self._write, self._entry_path(key), json.dumps(entry).encode())
+        except OSError as e:
+            self.errors += 1
+            logger.warning(f"HTTP cache store failed: {str(e)}")
+            return
+        # Add before releasing the replaced entry, which may share the body
+        replaced = self.entries.pop(key, None)
+        self._add(key, entry)
+        if replaced:
+            self._release(replaced)
+        self.evict()
+
+    async def get(self, session, url: str, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """GET ``url`` through the cache; revalidated and offline hits come back as 200"""
+        await self.setup()
+        key = self.key(url)
+        entry = self.entries.get(key)
+        if entry is not None and self.offline:
+            cached = await self._cached(key)
+            if cached:
+                self.offline_hits += 1
+                return cached
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if "ETag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        async with session.get(url, headers=request_headers) as response:
+            if response.status == 304 and entry is not None:
+                cached = await self._cached(key)
+                if cached:
+                    self.hits += 1
+                    return cached
+                # The body vanished from disk: fetch it again without validators
+                return await self.get(session, url, headers)
+            self.misses += 1
+            if response.status != 200:
+                return CachedResponse(response.status, response.headers)
+            body = await response.read()
+            await self._store(key, url, response, body, response.charset)
+            return CachedResponse(200, response.headers, body, response.charset)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.offline_hits + self.misses
+        return {
+            "hits": self.hits,
+            "offline_hits": self.offline_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.offline_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes
+        }
+
+class PassThroughCache(HttpCache):
+    """Used when SCRAPER_HTTP_CACHE_ENABLED is off: plain GETs, nothing stored"""
+
+    def __init__(self):
+        super().__init__(directory="", max_bytes=0)
+
+    async def get(self, session, url: str, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        async with session.get(url, headers=headers) as response:
+            self.misses += 1
+            if response.status != 200:
+                return CachedResponse(response.status, response.headers)
+            return CachedResponse(200, response.headers, await response.read(), response.charset)
+
+def create_http_cache() -> HttpCache:
+    if not settings.SCRAPER_HTTP_CACHE_ENABLED:
+        return PassThroughCache()
+    return HttpCache(
+        settings.SCRAPER_HTTP_CACHE_DIR,
+        settings.SCRAPER_HTTP_CACHE_MAX_BYTES,
+        offline=settings.SCRAPER_HTTP_CACHE_OFFLINE
+    )
+
+http_cache = create_http_cache()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``capacity``"""
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated_at = clock()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                wait = self.try_acquire()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+class CircuitBreaker:
+    """Takes a host out of rotation for ``cooldown`` seconds after repeated failures
+
+    After the cooldown a single trial request is let through (half-open); its
+    outcome closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        # Open (or a half-open trial that never reported back): wait out the cooldown
+        if self.clock() - self.opened_at < self.cooldown:
+            return False
+        self.state = self.HALF_OPEN
+        self.opened_at = self.clock()
+        return True
+
+    def available(self) -> bool:
+        """Whether a request would be allowed, without claiming the trial slot"""
+        return self.state == self.CLOSED or self.clock() - self.opened_at >= self.cooldown
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+class HostPolicy:
+    """Rate limit, backoff and circuit state for one (host, kind) pair"""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.breaker = CircuitBreaker(settings.SCRAPER_BREAKER_THRESHOLD, settings.SCRAPER_BREAKER_COOLDOWN, clock)
+        self.clock = clock
+        self.backoff = 0.0
+        self.backoff_until = 0.0
+
+class PolitenessScheduler:
+    """Per-host politeness shared by every scraper in the process
+
+    Page loads and image downloads are limited separately since they usually
+    hit different hosts (site vs. CDN) with very different tolerances.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.hosts: Dict[Tuple[str, str], HostPolicy] = {}
+        self.limits = {
+            "page": (settings.SCRAPER_PAGE_RATE, settings.SCRAPER_PAGE_BURST),
+            "download": (settings.SCRAPER_DOWNLOAD_RATE, settings.SCRAPER_DOWNLOAD_BURST)
+        }
+        self.overrides: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+    def set_limits(self, url: str, kind: str, rate: Optional[float] = None, burst: Optional[int] = None):
+        """Override the default rate limit for one host, e.g. from a site adapter"""
+        key = ((urlparse(url).hostname or "").lower(), kind)
+        default_rate, default_burst = self.limits[kind]
+        limits = (rate or default_rate, burst or default_burst)
+        if self.overrides.get(key, (default_rate, default_burst)) != limits:
+            self.overrides[key] = limits
+            self.hosts.pop(key, None)
+
+    def policy(self, url: str, kind: str = "page") -> HostPolicy:
+        key = ((urlparse(url).hostname or "").lower(), kind)
+        policy = self.hosts.get(key)
+        if policy is None:
+            rate, burst = self.overrides.get(key) or self.limits[kind]
+            policy = self.hosts[key] = HostPolicy(rate, burst, self.clock)
+        return policy
+
+    def is_available(self, url: str, kind: str = "page") -> bool:
+        """False while the host's circuit is open"""
+        return self.policy(url, kind).breaker.available()
+
+    async def acquire(self, url: str, kind: str = "page") -> bool:
+        """Wait for the host's backoff and rate limit; False if its circuit is open"""
+        policy = self.policy(url, kind)
+        if not policy.breaker.allow():
+            return False
+        delay = policy.backoff_until - self.clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await policy.bucket.acquire()
+        return True
+
+    def record_success(self, url: str, kind: str = "page"):
+        policy = self.policy(url, kind)
+        policy.breaker.record_success()
+        if policy.backoff:
+            # Recover gradually towards the configured rate
+            policy.backoff = policy.backoff / 2 if policy.backoff > 1 else 0.0
+            policy.bucket.rate = min(policy.base_rate, policy.bucket.rate * 2)
+
+    def record_failure(self, url: str, kind: str = "page"):
+        policy = self.policy(url, kind)
+        policy.breaker.record_failure()
+        if policy.breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Circuit opened for {urlparse(url).hostname} ({kind}) "
+                           f"for {settings.SCRAPER_BREAKER_COOLDOWN}s")
+
+    def record_throttled(self, url: str, kind: str = "page", retry_after: Optional[float] = None):
+        """Adaptive backoff after a 429/403: pause the host and halve its rate"""
+        policy = self.policy(url, kind)
+        policy.backoff = min(max(policy.backoff * 2, 1.0), settings.SCRAPER_BACKOFF_MAX)
+        delay = retry_after if retry_after is not None else policy.backoff
+        policy.backoff_until = self.clock() + min(delay, settings.SCRAPER_BACKOFF_MAX)
+        policy.bucket.rate = max(policy.base_rate / 16, policy.bucket.rate / 2)
+        self.record_failure(url, kind)
+        logger.info(f"Throttled by {urlparse(url).hostname} ({kind}), backing off {delay:.1f}s")
+
+politeness = PolitenessScheduler()
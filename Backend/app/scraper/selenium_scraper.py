@@ -1,13 +1,13 @@
 import asyncio
-import random
 import logging
-from typing import List, Dict, Optional, Set
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set
 from urllib.parse import urljoin, urlparse
-import aiohttp
 import aiofiles
 import os
 from datetime import datetime
 import hashlib
+import uuid
+import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -16,50 +16,46 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from ..config import settings
 from ..models import ImageCreate, ImageResponse
-from ..database import Database
+from ..database import db
+from ..resources import resources
 from ..cloudflare_r2 import upload_image_bytes_to_r2
+from .politeness import politeness
+from .adapters import get_adapters
+from .base_scraper import BaseScraper
+from .budget import BudgetExceeded, ScrapeBudget
+from .http_cache import http_cache
+from .yield_planner import YieldPlanner, search_terms_for
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, if it holds a number"""
+    retry_after = headers.get("Retry-After")
+    return float(retry_after) if retry_after and retry_after.isdigit() else None
+
 class SeleniumScraper:
     def __init__(self):
-        self.db = Database()
-        self.session = aiohttp.ClientSession()
+        # Shared pooled clients; closed at application shutdown, not per scrape
+        self.db = db
+        self.session = resources.http
         self.driver = None
+        self.progress = None  # Optional async callback receiving (event_type, data)
+        self.budget = ScrapeBudget()  # Unlimited unless a job passes its own
+        self.counters = {
+            "pages_visited": 0,
+            "candidates_found": 0,
+            "downloaded": 0,
+            "deduped": 0,
+            "saved": 0
+        }
         
-        # List of popular image websites with their selectors
-        self.image_websites = [
-            {
-                "url": "https://unsplash.com/s/photos/{category}",
-                "img_selector": "img[src*='images.unsplash.com'], img[src*='photo']",
-                "title_selector": "img[src*='images.unsplash.com'], img[src*='photo']",
-                "tag_selector": "a[href*='/s/photos/'], a[href*='/tags/']"
-            },
-            {
-                "url": "https://www.pexels.com/search/{category}/",
-                "img_selector": "img[src*='pexels.com'], img[src*='photo']",
-                "title_selector": "img[src*='pexels.com'], img[src*='photo']",
-                "tag_selector": "a[href*='/search/'], a[href*='/tag/']"
-            },
-            {
-                "url": "https://pixabay.com/images/search/{category}/",
-                "img_selector": "img[src*='pixabay.com'], img[src*='photo']",
-                "title_selector": "img[src*='pixabay.com'], img[src*='photo']",
-                "tag_selector": "a[href*='/images/search/'], a[href*='/tags/']"
-            },
-            {
-                "url": "https://www.freepik.com/search?format=search&query={category}",
-                "img_selector": "img[src*='freepik.com'], img[src*='image']",
-                "title_selector": "img[src*='freepik.com'], img[src*='image']",
-                "tag_selector": "a[href*='/search/'], a[href*='/tag/']"
-            },
-            {
-                "url": "https://www.rawpixel.com/search/{category}",
-                "img_selector": "img[src*='rawpixel.com'], img[src*='image']",
-                "title_selector": "img[src*='rawpixel.com'], img[src*='image']",
-                "tag_selector": "a[href*='/search/'], a[href*='/tag/']"
-            }
-        ]
+        # Per-site adapters, each declaring its extraction strategy and limits
+        self.adapters = get_adapters()
+        for adapter in self.adapters:
+            if adapter.page_rate or adapter.page_burst:
+                politeness.set_limits(adapter.search_url, "page", adapter.page_rate, adapter.page_burst)
 
     def setup_driver(self):
         """Set up the Chrome WebDriver with headless options."""
@@ -78,7 +74,7 @@ class SeleniumScraper:
             chrome_options.add_argument("--disable-web-security")
             chrome_options.add_argument("--allow-running-insecure-content")
             chrome_options.add_argument("--ignore-certificate-errors")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+            chrome_options.add_argument(f"--user-agent={USER_AGENT}")
             
             # Add experimental options
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
@@ -167,23 +163,16 @@ class SeleniumScraper:
             )
             
             # Additional wait for images to load
-            await asyncio.sleep(2)
+            await self.budget.sleep(2)
             
             return True
         except Exception as e:
             logger.warning(f"Timeout waiting for element {selector}: {str(e)}")
             return False
 
-    async def get_random_website(self, category: str) -> Dict:
-        """Get a random website configuration for the given category."""
-        website_config = random.choice(self.image_websites)
-        website_config["url"] = website_config["url"].format(category=category.replace(" ", "-"))
-        return website_config
-
-    async def extract_image_data(self, img_element, website_config: Dict, category: str, source_url: str) -> Optional[Dict]:
+    async def extract_image_data(self, candidate: Dict[str, Any], category: str, source_url: str) -> Optional[Dict]:
         try:
-            # Extract image URL
-            image_url = img_element.get_attribute("src") or img_element.get_attribute("data-src")
+            image_url = candidate.get("image_url")
             if not image_url:
                 return None
 
@@ -194,44 +183,23 @@ class SeleniumScraper:
             # Generate a unique ID for the image based on its URL
             image_id = hashlib.md5(image_url.encode()).hexdigest()
 
-            # Extract title/alt text
-            title = img_element.get_attribute("alt") or img_element.get_attribute("title") or "Untitled"
+            title = candidate.get("title") or "Untitled"
             
             # Add category to title if not present
             if category.lower() not in title.lower():
                 title = f"{category} - {title}"
 
-            # Get image dimensions
-            width = img_element.get_attribute("width")
-            height = img_element.get_attribute("height")
-
-            # Parse dimensions
-            def parse_dimension(dim):
-                if not dim:
-                    return 0
-                try:
-                    return int(str(dim).replace('px', ''))
-                except (ValueError, AttributeError):
-                    return 0
-
-            width = parse_dimension(width)
-            height = parse_dimension(height)
-
-            # Skip small images (likely icons or UI elements)
-            if width < 100 or height < 100:
+            # Skip small images (likely icons or UI elements); some sites don't declare a size
+            width = candidate.get("width")
+            height = candidate.get("height")
+            if (width is not None and width < 100) or (height is not None and height < 100):
                 return None
 
-            # Extract tags
-            tags = [category]  # Add main category as first tag
-            
-            # Try to find parent elements with tags
-            try:
-                parent = img_element.find_element(By.XPATH, ".//ancestor::*[contains(@class, 'tag') or contains(@class, 'category') or contains(@class, 'label')]")
-                tag_text = parent.text.strip()
-                if tag_text and tag_text.lower() not in [t.lower() for t in tags]:
-                    tags.append(tag_text)
-            except:
-                pass
+            # Main category first, then the site's own tags
+            tags = [category]
+            for tag in candidate.get("tags") or []:
+                if tag and tag.lower() not in [t.lower() for t in tags]:
+                    tags.append(tag)
 
             return {
                 "id": image_id,
@@ -239,8 +207,8 @@ class SeleniumScraper:
                 "image_url": image_url,
                 "source_url": source_url,
                 "tags": tags,
-                "width": width,
-                "height": height,
+                "width": width or 0,
+                "height": height or 0,
                 "scraped_at": datetime.utcnow().isoformat(),
                 "category": category
             }
@@ -249,279 +217,400 @@ class SeleniumScraper:
             return None
 
     async def download_image(self, image_url: str, title: str) -> Optional[bytes]:
+        if not await politeness.acquire(image_url, "download"):
+            logger.info(f"Skipping download from {urlparse(image_url).hostname}: circuit open")
+            return None
         try:
-            async with self.session.get(image_url) as response:
-                if response.status == 200:
-                    return await response.read()
+            # Unchanged images seen on an earlier crawl are revalidated, not downloaded again
+            response = await http_cache.get(self.session, image_url)
+            if response.status == 200:
+                politeness.record_success(image_url, "download")
+                return response.body
+            if response.status in (403, 429):
+                politeness.record_throttled(image_url, "download", retry_after_seconds(response.headers))
+            elif response.status >= 500:
+                politeness.record_failure(image_url, "download")
         except Exception as e:
             logger.error(f"Error downloading image {image_url}: {str(e)}")
+            politeness.record_failure(image_url, "download")
         return None
 
-    async def scrape_images(self, category: str, max_images: int = 100, url: Optional[str] = None) -> List[ImageResponse]:
+    async def fetch_page(self, url: str) -> Optional[str]:
+        """Fetch a search result page over plain HTTP."""
+        if not self.budget.charge_page():
+            return None
+        if not await politeness.acquire(url):
+            return None
         try:
+            response = await http_cache.get(self.session, url, headers={"User-Agent": USER_AGENT})
+            if response.status == 200:
+                politeness.record_success(url)
+                return response.text()
+            if response.status in (403, 429):
+                politeness.record_throttled(url, "page", retry_after_seconds(response.headers))
+            else:
+                politeness.record_failure(url)
+        except Exception as e:
+            logger.error(f"Error fetching page {url}: {str(e)}")
+            politeness.record_failure(url)
+        return None
+
+    async def fetch_candidates(self, adapter: BaseScraper, search_term: str, pages) -> List[Dict[str, Any]]:
+        """Fetch the given result pages concurrently and parse their image candidates in page order."""
+        urls = [adapter.result_page(search_term, page) for page in pages]
+        candidates = []
+        bodies = await self.budget.run(asyncio.gather(*(self.fetch_page(url) for url in urls)))
+        for url, body in zip(urls, bodies):
+            if body:
+                self.counters["pages_visited"] += 1
+                candidates.extend(adapter.parse(body, url))
+        return candidates
+
+    async def load_rendered(self, adapter: BaseScraper, search_url: str) -> List[Dict[str, Any]]:
+        """Load a search page in the browser, with retry, and parse its first screen of images."""
+        if not self.driver:
             self.setup_driver()
-            saved_images = []
-            processed_ids = set()  # Keep track of processed image IDs
+        max_retries = 3
+        for retry in range(max_retries):
+            if not self.budget.charge_page():
+                raise BudgetExceeded(self.budget.exhausted)
+            if not await self.budget.run(politeness.acquire(search_url)):
+                raise Exception("Site circuit open, skipping")
+            try:
+                await self.ensure_driver_connection()
+                # Page loads block until the page is loaded; keep them off the event loop
+                await self.budget.run(asyncio.to_thread(self.driver.get, search_url))
+                
+                # Wait for page to load
+                if not await self.wait_for_element(adapter.img_selector):
+                    politeness.record_failure(search_url)
+                    if retry == max_retries - 1:
+                        raise Exception("Failed to find image elements")
+                    continue
+                
+                # Parse the first screen of images; more are loaded by scrolling
+                candidates = adapter.parse_rendered(self.driver.page_source, search_url)
+                logger.info(f"Found {len(candidates)} images on {search_url}")
+                
+                if not candidates:
+                    politeness.record_failure(search_url)
+                    if retry == max_retries - 1:
+                        raise Exception("No images found")
+                    continue
+                
+                politeness.record_success(search_url)
+                self.counters["pages_visited"] += 1
+                self.counters["candidates_found"] += len(candidates)
+                return candidates
+                
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                politeness.record_failure(search_url)
+                if retry == max_retries - 1:
+                    raise
+                logger.warning(f"Retry {retry + 1} for {search_url}: {str(e)}")
+        return []
+
+    async def store_image(self, image_data: Dict[str, Any], category: str) -> Optional[ImageCreate]:
+        """Download an image and upload it to R2; returns the record to save, or None if the download failed."""
+        image_bytes = await self.budget.run(self.download_image(image_data["image_url"], image_data["title"]))
+        if not image_bytes:
+            return None
+        self.counters["downloaded"] += 1
+        # Generate a unique object name for R2
+        object_name = f"{uuid.uuid4().hex}_{image_data['title'].replace(' ', '_')[:50]}.jpg"
+        r2_url = await self.budget.run(upload_image_bytes_to_r2(image_bytes, object_name))
+        # Create ImageCreate object with R2 URL as image_url
+        return ImageCreate(
+            title=image_data["title"],
+            image_url=r2_url,  # Store only R2 URL as image_url
+            source_url=image_data["image_url"],  # Store original as source_url
+            tags=image_data["tags"],
+            scraped_at=image_data["scraped_at"],
+            category=category,
+            r2_url=r2_url
+        )
+
+    async def close(self):
+        """Quit the browser, if one was started."""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
+            self.driver = None
+
+    async def report(self, event_type: str, data: Dict[str, Any]):
+        """Send a progress event to the registered callback, if any."""
+        if not self.progress:
+            return
+        try:
+            await self.progress(event_type, data)
+        except Exception as e:
+            logger.warning(f"Error reporting scrape progress: {str(e)}")
+
+    async def flush_images(self, pending_images: List[ImageCreate]) -> List[ImageResponse]:
+        """Write queued images to the database in one bulk write and clear the queue."""
+        if not pending_images:
+            return []
+        try:
+            result = await self.db.create_images_bulk(pending_images)
+            logger.info(f"Saved {result['inserted']} new images to database ({result['existing']} already existed)")
+            self.counters["saved"] += result["inserted"]
+            self.counters["deduped"] += result["existing"]
+            return result["images"]
+        except Exception as db_error:
+            logger.error(f"Database error while saving images: {str(db_error)}")
+            return []
+        finally:
+            pending_images.clear()
+
+    async def scrape_unit(self, unit: Dict[str, Any]) -> Dict[str, int]:
+        """Scrape one (site, term, page) work unit of a sharded job; returns its counters."""
+        adapter = next((adapter for adapter in self.adapters if adapter.name == unit["site"]), None)
+        if adapter is None:
+            raise ValueError(f"Unknown site adapter '{unit['site']}'")
+        category, term = unit["category"], unit["term"]
+        search_url = adapter.search_page(term)
+        pending_images = []
+        try:
+            if adapter.uses_http:
+                candidates = await self.fetch_candidates(adapter, term, [unit["page"]])
+                self.counters["candidates_found"] += len(candidates)
+            else:
+                candidates = await self.load_rendered(adapter, search_url)
             
-            # Complete category mapping with all categories
-            category_mapping = {
-                "sports": {
-                    "subcategories": [
-                        "football", "soccer", "basketball", "tennis", "golf", "baseball",
-                        "cricket", "rugby", "hockey", "volleyball", "swimming", "athletics",
-                        "boxing", "martial arts", "wrestling", "gymnastics", "cycling",
-                        "racing", "surfing", "skiing", "snowboarding", "skateboarding"
-                    ],
-                    "related": ["fitness", "exercise", "athletic", "game", "competition", "sport"]
-                },
-                "nature": {
-                    "subcategories": [
-                        "landscape", "mountains", "forest", "ocean", "beach", "sunset",
-                        "wildlife", "flowers", "garden", "plants", "trees", "waterfall"
-                    ],
-                    "related": ["outdoors", "environment", "natural", "scenic"]
-                },
-                "technology": {
-                    "subcategories": [
-                        "computer", "smartphone", "robot", "ai", "gadget", "electronics",
-                        "software", "hardware", "internet", "data", "cybersecurity"
-                    ],
-                    "related": ["digital", "innovation", "tech", "modern"]
-                },
-                "business": {
-                    "subcategories": [
-                        "office", "meeting", "presentation", "startup", "entrepreneur",
-                        "corporate", "finance", "marketing", "team", "workplace"
-                    ],
-                    "related": ["professional", "work", "career", "industry"]
-                },
-                "art": {
-                    "subcategories": [
-                        "painting", "sculpture", "drawing", "illustration", "digital art",
-                        "gallery", "museum", "exhibition", "artist", "creative"
-                    ],
-                    "related": ["creative", "design", "artistic", "visual"]
-                },
-                "fashion": {
-                    "subcategories": [
-                        "clothing", "accessories", "runway", "model", "style", "designer",
-                        "fashion show", "outfit", "trend", "luxury"
-                    ],
-                    "related": ["style", "apparel", "wear", "trendy"]
-                },
-                "music": {
-                    "subcategories": [
-                        "concert", "band", "musician", "instrument", "performance",
-                        "studio", "recording", "sound", "dj", "festival"
-                    ],
-                    "related": ["audio", "melody", "rhythm", "song"]
-                },
-                "education": {
-                    "subcategories": [
-                        "school", "university", "classroom", "student", "teacher",
-                        "learning", "study", "campus", "library", "research"
-                    ],
-                    "related": ["academic", "teaching", "knowledge", "training"]
-                },
-                "health": {
-                    "subcategories": [
-                        "fitness", "wellness", "medical", "doctor", "hospital",
-                        "healthcare", "exercise", "yoga", "meditation", "nutrition"
-                    ],
-                    "related": ["medical", "wellness", "fitness", "healthcare"]
-                },
-                "automotive": {
-                    "subcategories": [
-                        "car", "vehicle", "automobile", "transportation", "driving",
-                        "road", "highway", "racing", "motorcycle", "luxury car"
-                    ],
-                    "related": ["transport", "vehicle", "automobile", "driving"]
-                },
-                "abstract": {
-                    "subcategories": [
-                        "pattern", "texture", "background", "minimal", "geometric",
-                        "shape", "form", "color", "design", "artistic"
-                    ],
-                    "related": ["artistic", "design", "pattern", "texture"]
-                },
-                "editorial": {
-                    "subcategories": [
-                        "magazine", "cover", "story", "feature", "journalism",
-                        "press", "media", "publication", "article", "news"
-                    ],
-                    "related": ["media", "press", "publication", "story"]
-                },
-                "film": {
-                    "subcategories": [
-                        "movie", "cinema", "theater", "actor", "actress", "director",
-                        "scene", "set", "production", "hollywood"
-                    ],
-                    "related": ["cinema", "movie", "theater", "production"]
-                },
-                "3d": {
-                    "subcategories": [
-                        "3d-rendering", "3d-model", "3d-art", "digital-art", "animation",
-                        "cg", "computer-graphics", "virtual", "simulation", "3d-design"
-                    ],
-                    "related": ["digital", "virtual", "computer", "simulation"]
-                },
-                "architecture": {
-                    "subcategories": [
-                        "building", "city", "urban", "interior", "design", "modern",
-                        "house", "apartment", "structure", "construction"
-                    ],
-                    "related": ["building", "design", "structure", "construction"]
-                },
-                "people": {
-                    "subcategories": [
-                        "portrait", "person", "human", "face", "lifestyle", "fashion",
-                        "beauty", "model", "family", "friends"
-                    ],
-                    "related": ["human", "person", "portrait", "people"]
-                },
-                "animals": {
-                    "subcategories": [
-                        "pet", "dog", "cat", "wildlife", "bird", "mammal", "reptile",
-                        "fish", "insect", "zoo"
-                    ],
-                    "related": ["wildlife", "pet", "animal", "creature"]
-                },
-                "food": {
-                    "subcategories": [
-                        "meal", "restaurant", "cooking", "recipe", "cuisine", "dessert",
-                        "breakfast", "lunch", "dinner", "snack"
-                    ],
-                    "related": ["cuisine", "meal", "cooking", "dining"]
-                },
-                "travel": {
-                    "subcategories": [
-                        "vacation", "tourism", "destination", "journey", "adventure",
-                        "explore", "trip", "holiday", "backpacking", "roadtrip"
-                    ],
-                    "related": ["tourism", "journey", "adventure", "exploration"]
-                }
-            }
+            records = []
+            for candidate in candidates:
+                image_data = await self.extract_image_data(candidate, category, search_url)
+                if image_data:
+                    records.append(image_data)
             
-            # Get search terms for the category
-            category_info = category_mapping.get(category.lower(), {
-                "subcategories": [category.lower()],
-                "related": []
-            })
+            # Shared dedupe: claim the images across every shard on every node; only winners download
+            claimed = await self.db.claim_images([record["id"] for record in records], unit_id=unit["_id"])
+            stored_ids = []
+            failed_ids = []
+            for image_data in records:
+                if image_data["id"] not in claimed:
+                    self.counters["deduped"] += 1
+                    continue
+                try:
+                    image_create = await self.store_image(image_data, category)
+                except Exception as e:
+                    logger.error(f"Error processing image: {str(e)}")
+                    image_create = None
+                if not image_create:
+                    failed_ids.append(image_data["id"])
+                    continue
+                pending_images.append(image_create)
+                stored_ids.append(image_data["id"])
+                if len(pending_images) >= settings.BULK_WRITE_BATCH_SIZE:
+                    await self.flush_images(pending_images)
+            await self.flush_images(pending_images)
+            await self.db.mark_claims_stored(stored_ids)
+            # Let another shard retry images we could not download
+            await self.db.release_image_claims(failed_ids)
+            return dict(self.counters)
+        finally:
+            await self.close()
+
+    async def scrape_images(
+        self,
+        category: str,
+        max_images: int = 100,
+        url: Optional[str] = None,
+        progress: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        budget: Optional[ScrapeBudget] = None
+    ) -> List[ImageResponse]:
+        """Scrape and collect every saved image; prefer ``scrape_images_iter`` for large jobs."""
+        return [image async for image in self.scrape_images_iter(category, max_images, url, progress, budget)]
+
+    async def scrape_images_iter(
+        self,
+        category: str,
+        max_images: int = 100,
+        url: Optional[str] = None,
+        progress: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        budget: Optional[ScrapeBudget] = None
+    ) -> AsyncIterator[ImageResponse]:
+        """Scrape images, yielding each one as soon as it is saved.
+
+        The bulk writes here are the only place scraped images are persisted,
+        so consumers only stream the results onwards. When ``budget`` runs out
+        or is cancelled, scraping stops and the images collected so far are
+        still saved.
+        """
+        self.progress = progress
+        if budget:
+            self.budget = budget
+        try:
+            saved_count = 0
+            pending_images = []  # Images waiting for the next bulk write
+            processed_ids = set()  # Keep track of processed image IDs
             
-            # Combine main category, subcategories, and related terms
-            search_terms = [category.lower()] + category_info["subcategories"] + category_info["related"]
-            search_terms = list(set(search_terms))  # Remove duplicates
+            # Try the most productive (site, term) pairs first
+            search_terms = search_terms_for(category)
+            sites = [adapter.name for adapter in self.adapters]
+            planner = YieldPlanner(
+                self.adapters,
+                search_terms,
+                await self.db.get_scrape_yield(sites, search_terms)
+            )
+            checkpoints = await self.db.get_crawl_checkpoints(sites, search_terms)
             
-            # Try each search term
-            for search_term in search_terms:
-                if len(saved_images) >= max_images:
+            while saved_count + len(pending_images) < max_images and not self.budget.exhausted:
+                pair = planner.next()
+                if pair is None:
                     break
+                adapter, search_term = pair
+                search_url = adapter.search_page(search_term)
+                if not politeness.is_available(search_url):
+                    # Site is out of rotation after repeated failures
+                    continue
+                
+                page_new = 0
+                page_duplicates = 0
+                page_failed = False
+                pages_before = self.counters["pages_visited"]
+                started = time.monotonic()
+                try:
+                    logger.info(f"Scraping from {search_url} for term '{search_term}'")
                     
-                # Try each website for this search term
-                for website_config in self.image_websites:
-                    if len(saved_images) >= max_images:
-                        break
-                        
-                    try:
-                        # Format URL with search term
-                        search_url = website_config["url"].format(category=search_term.replace(" ", "-"))
-                        logger.info(f"Scraping from {search_url} for term '{search_term}'")
+                    max_scrolls = 3
+                    
+                    # HTTP fast path: adapters with page-numbered results are fetched
+                    # without the browser, remaining pages in parallel
+                    candidates = []
+                    max_pages = adapter.max_pages if adapter.uses_http else 0
+                    if max_pages:
+                        candidates = await self.fetch_candidates(adapter, search_term, [1])
+                    static = bool(candidates)
+                    if static:
+                        logger.info(f"Found {len(candidates)} images on page 1 of {search_url} ({adapter.strategy})")
+                        self.counters["candidates_found"] += len(candidates)
+                        max_scrolls = 1 if max_pages > 1 else 0
+                    else:
+                        candidates = await self.load_rendered(adapter, search_url)
+                    
+                    # Results are newest-first: walk them, scrolling for more, until a run of
+                    # images already seen on an earlier crawl shows the rest is known
+                    known_ids = checkpoints.get((adapter.name, search_term), [])
+                    checkpoint = set(known_ids)
+                    seen_ids = []  # Image IDs now stored, in page order, for the next checkpoint
+                    known_run = 0
+                    caught_up = False
+                    processed = 0
+                    for scroll in range(max_scrolls + 1):
+                        if scroll:
+                            if self.budget.exhausted:
+                                break
+                            if static:
+                                candidates = candidates + await self.fetch_candidates(
+                                    adapter, search_term, range(2, max_pages + 1)
+                                )
+                            else:
+                                if not self.budget.charge_page():
+                                    break
+                                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                                await self.budget.sleep(2)
+                                candidates = adapter.parse_rendered(self.driver.page_source, search_url)
+                            if len(candidates) <= processed:
+                                break  # Nothing more loaded
+                            self.counters["candidates_found"] += len(candidates) - processed
                         
-                        # Load page with retry
-                        max_retries = 3
-                        for retry in range(max_retries):
-                            try:
-                                await self.ensure_driver_connection()
-                                self.driver.get(search_url)
+                        for candidate in candidates[processed:]:
+                            if caught_up or saved_count + len(pending_images) >= max_images or self.budget.stop_reason:
+                                break
                                 
-                                # Wait for page to load
-                                if not await self.wait_for_element(website_config['img_selector']):
-                                    if retry == max_retries - 1:
-                                        raise Exception("Failed to find image elements")
+                            try:
+                                image_data = await self.extract_image_data(candidate, category, search_url)
+                                if not image_data:
                                     continue
-                                
-                                # Scroll to load more images
-                                for _ in range(3):
-                                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                    await asyncio.sleep(2)
-                                
-                                # Find all image elements
-                                img_elements = self.driver.find_elements(By.CSS_SELECTOR, website_config['img_selector'])
-                                logger.info(f"Found {len(img_elements)} images on {search_url}")
-                                
-                                if not img_elements:
-                                    if retry == max_retries - 1:
-                                        raise Exception("No images found")
+                                if image_data["id"] in processed_ids:
+                                    self.counters["deduped"] += 1
+                                    page_duplicates += 1
                                     continue
+                                processed_ids.add(image_data["id"])
                                 
-                                break  # Successfully found images
+                                # Check if the image was stored by an earlier crawl
+                                known = image_data["id"] in checkpoint
+                                if not known and await self.db.get_image_by_source_url(image_data["image_url"]):
+                                    logger.info(f"Image already exists: {image_data['title']}")
+                                    known = True
+                                if known:
+                                    self.counters["deduped"] += 1
+                                    page_duplicates += 1
+                                    seen_ids.append(image_data["id"])
+                                    known_run += 1
+                                    if known_run >= settings.SCRAPER_CHECKPOINT_STOP_RUN:
+                                        logger.info(f"Caught up with the previous crawl of {search_url}")
+                                        caught_up = True
+                                    continue
+                                known_run = 0
                                 
-                            except Exception as e:
-                                if retry == max_retries - 1:
-                                    raise
-                                logger.warning(f"Retry {retry + 1} for {search_url}: {str(e)}")
-                                await asyncio.sleep(2)
-                        
-                        for img_element in img_elements:
-                            if len(saved_images) >= max_images:
+                                image_create = await self.store_image(image_data, category)
+                                if image_create:
+                                    # Queue for the next bulk write
+                                    pending_images.append(image_create)
+                                    page_new += 1
+                                    seen_ids.append(image_data["id"])
+                                    if len(pending_images) >= settings.BULK_WRITE_BATCH_SIZE:
+                                        for image in await self.flush_images(pending_images):
+                                            saved_count += 1
+                                            yield image
+                            except BudgetExceeded:
                                 break
-                                
-                            try:
-                                image_data = await self.extract_image_data(img_element, website_config, category, search_url)
-                                if image_data and image_data["id"] not in processed_ids:
-                                    processed_ids.add(image_data["id"])
-                                    
-                                    # Check if image already exists in database
-                                    existing_image = await self.db.get_image_by_url(image_data["image_url"])
-                                    if existing_image:
-                                        logger.info(f"Image already exists: {image_data['title']}")
-                                        continue
-                                    
-                                    # Download image
-                                    image_bytes = await self.download_image(image_data["image_url"], image_data["title"])
-                                    if image_bytes:
-                                        # Generate a unique object name for R2
-                                        import uuid
-                                        object_name = f"{uuid.uuid4().hex}_{image_data['title'].replace(' ', '_')[:50]}.jpg"
-                                        r2_url = await upload_image_bytes_to_r2(image_bytes, object_name)
-                                        # Create ImageCreate object with R2 URL as image_url
-                                        image_create = ImageCreate(
-                                            title=image_data["title"],
-                                            image_url=r2_url,  # Store only R2 URL as image_url
-                                            source_url=image_data["image_url"],  # Store original as source_url
-                                            tags=image_data["tags"],
-                                            scraped_at=image_data["scraped_at"],
-                                            category=category,
-                                            r2_url=r2_url
-                                        )
-                                        # Save to database
-                                        try:
-                                            saved_image = await self.db.create_image(image_create)
-                                            if saved_image:
-                                                logger.info(f"Successfully saved image to database: {saved_image.title}")
-                                                saved_images.append(saved_image)
-                                            else:
-                                                logger.warning(f"Failed to save image to database: {image_data['title']}")
-                                        except Exception as db_error:
-                                            logger.error(f"Database error while saving image: {str(db_error)}")
                             except Exception as e:
                                 logger.error(f"Error processing image: {str(e)}")
                                 continue
-                                
-                    except Exception as e:
-                        logger.error(f"Error scraping from {website_config['url']}: {str(e)}")
-                        continue
+                        
+                        processed = len(candidates)
+                        if caught_up or saved_count + len(pending_images) >= max_images or self.budget.stop_reason:
+                            break
+                    
+                    # Flush what this page produced so it lands (and streams) promptly
+                    for image in await self.flush_images(pending_images):
+                        saved_count += 1
+                        yield image
+                    if seen_ids:
+                        await self.db.save_crawl_checkpoint(
+                            adapter.name, search_term,
+                            list(dict.fromkeys(seen_ids + known_ids))[:settings.SCRAPER_CHECKPOINT_SIZE]
+                        )
+                    await self.report("progress", {
+                        **self.counters,
+                        "search_term": search_term,
+                        "source": search_url
+                    })
+                            
+                except BudgetExceeded as e:
+                    logger.info(f"Stopped scraping {adapter.name}: {e.reason}")
+                    for image in await self.flush_images(pending_images):
+                        saved_count += 1
+                        yield image
+                except Exception as e:
+                    logger.error(f"Error scraping from {adapter.name}: {str(e)}")
+                    page_failed = True
+                finally:
+                    latency = time.monotonic() - started
+                    # Static adapters fetch several result pages per pair; a failed pair counts as one
+                    pages = max(self.counters["pages_visited"] - pages_before, 1)
+                    planner.record(adapter, search_term, page_new, page_duplicates, latency, page_failed, pages)
+                    await self.db.record_scrape_yield(
+                        adapter.name, search_term, page_new, page_duplicates, latency, page_failed, pages
+                    )
 
-            logger.info(f"Successfully downloaded {len(saved_images)} images for category '{category}'")
-            return saved_images
+            for image in await self.flush_images(pending_images):
+                saved_count += 1
+                yield image
+            await self.report("progress", dict(self.counters))
+            logger.info(f"HTTP cache: {http_cache.stats()}")
+            if self.budget.exhausted:
+                logger.info(f"Scrape of '{category}' stopped early ({self.budget.exhausted}) with {saved_count} images")
+            logger.info(f"Successfully downloaded {saved_count} images for category '{category}'")
 
         except Exception as e:
             logger.error(f"Error during scraping: {str(e)}")
-            return []
         finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
-            await self.session.close() 
\ No newline at end of file
+            await self.close()
@@ -0,0 +1,120 @@
+import re
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+# tag[attr op 'value'][...], the subset of CSS used by the site selectors
+SELECTOR_PATTERN = re.compile(r"^(?P<tag>[\w-]+|\*)?(?P<attrs>(?:\[[^\]]+\])*)$")
+ATTRIBUTE_PATTERN = re.compile(r"\[\s*([\w:-]+)\s*(?:([*^$~]?=)\s*(?:'([^']*)'|\"([^\"]*)\"|([^\]\s]+))\s*)?\]")
+
+OPERATORS: Dict[str, Callable[[str, str], bool]] = {
+    "=": lambda actual, expected: actual == expected,
+    "*=": lambda actual, expected: expected in actual,
+    "^=": lambda actual, expected: actual.startswith(expected),
+    "$=": lambda actual, expected: actual.endswith(expected),
+    "~=": lambda actual, expected: expected in actual.split()
+}
+
+Condition = Tuple[str, Optional[str], Optional[str]]
+
+def parse_selector(selector: str) -> List[Tuple[Optional[str], List[Condition]]]:
+    """Parse a comma separated selector list into (tag, attribute conditions) pairs"""
+    parsed = []
+    for part in selector.split(","):
+        part = part.strip()
+        match = SELECTOR_PATTERN.match(part)
+        if not part or not match:
+            raise ValueError(f"Unsupported selector: {part!r}")
+        tag = match.group("tag")
+        conditions = []
+        for name, operator, single, double, bare in ATTRIBUTE_PATTERN.findall(match.group("attrs")):
+            value = single or double or bare if operator else None
+            conditions.append((name.lower(), operator or None, value))
+        parsed.append((None if tag in (None, "*") else tag.lower(), conditions))
+    return parsed
+
+def matches(tag: str, attrs: Dict[str, str], selectors: List[Tuple[Optional[str], List[Condition]]]) -> bool:
+    for selector_tag, conditions in selectors:
+        if selector_tag and selector_tag != tag:
+            continue
+        if all(
+            name in attrs and (operator is None or OPERATORS[operator](attrs[name], value))
+            for name, operator, value in conditions
+        ):
+            return True
+    return False
+
+class _ElementCollector(HTMLParser):
+    def __init__(self, selectors):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.elements: List[Dict[str, str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name.lower(): value or "" for name, value in attrs}
+        if matches(tag, attributes, self.selectors):
+            self.elements.append(attributes)
+
+    handle_startendtag = handle_starttag
+
+def select(html: str, selector: str) -> List[Dict[str, str]]:
+    """Attributes of every element in ``html`` matching ``selector``, in document order"""
+    collector = _ElementCollector(parse_selector(selector))
+    collector.feed(html)
+    collector.close()
+    return collector.elements
+
+class _ScriptCollector(HTMLParser):
+    def __init__(self, script_id: str):
+        super().__init__(convert_charrefs=False)
+        self.script_id = script_id
+        self.capturing = False
+        self.parts: List[str] = []
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and not self.found and dict(attrs).get("id") == self.script_id:
+            self.capturing = True
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self.capturing:
+            self.capturing = False
+            self.found = True
+
+    def handle_data(self, data):
+        if self.capturing:
+            self.parts.append(data)
+
+def script_content(html: str, script_id: str) -> Optional[str]:
+    """Text of the <script> with the given id, e.g. an embedded __NEXT_DATA__ state blob"""
+    collector = _ScriptCollector(script_id)
+    collector.feed(html)
+    collector.close()
+    return "".join(collector.parts) if collector.found else None
+
+def _dimension(attrs: Dict[str, str], name: str, image_url: str) -> Optional[int]:
+    value = attrs.get(name)
+    if not value:
+        # Image CDNs carry the rendered size in the query string (?w=640&h=427)
+        query = parse_qs(urlparse(image_url).query)
+        value = (query.get(name[0]) or query.get(name) or [None])[0]
+    try:
+        return int(float(str(value).replace("px", ""))) if value else None
+    except ValueError:
+        return None
+
+def image_candidate(attrs: Dict[str, str], page_url: str) -> Optional[Dict[str, Any]]:
+    """Turn the attributes of a matched <img> into an image candidate"""
+    # Lazy-loaded images keep a placeholder in src until scrolled into view
+    image_url = attrs.get("data-lazy-src") or attrs.get("data-src") or attrs.get("src")
+    if not image_url or image_url.startswith("data:"):
+        return None
+    # Make URL absolute if it's relative
+    image_url = urljoin(page_url, image_url)
+    return {
+        "image_url": image_url,
+        "title": attrs.get("alt") or attrs.get("title") or "",
+        "tags": [],
+        "width": _dimension(attrs, "width", image_url),
+        "height": _dimension(attrs, "height", image_url)
+    }
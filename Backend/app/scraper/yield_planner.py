@@ -0,0 +1,107 @@
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+from ..database import CATEGORY_MAPPING
+from .base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+def search_terms_for(category: str) -> List[str]:
+    """Category, subcategories and related terms, deduplicated in that order"""
+    category = category.lower()
+    category_info = CATEGORY_MAPPING.get(category, {
+        "subcategories": [category],
+        "related": []
+    })
+    return list(dict.fromkeys([category] + category_info["subcategories"] + category_info["related"]))
+
+class YieldPlanner:
+    """Orders (site, term) pairs so the most productive ones are tried first
+
+    Each pair is an arm of a UCB1 bandit whose reward is new images per page
+    load, discounted by the share of its runs that failed so a flaky site
+    comes after an equally productive reliable one. Pairs never tried before
+    go first (in term order), then the pair with the best mean yield plus an
+    exploration bonus that shrinks the more it has been tried. Pairs that
+    keep returning only duplicates are skipped until
+    SCRAPER_YIELD_RETRY_AFTER has passed since their last run.
+    """
+
+    def __init__(
+        self,
+        adapters: List[BaseScraper],
+        terms: List[str],
+        stats: Dict[Tuple[str, str], Dict[str, Any]],
+        now: Optional[datetime] = None
+    ):
+        self.adapters = {adapter.name: adapter for adapter in adapters}
+        self.stats = {key: dict(value) for key, value in stats.items()}
+        self.now = now or datetime.utcnow()
+        self.remaining: List[Tuple[str, str]] = []
+        skipped = 0
+        for term in terms:
+            for site in self.adapters:
+                if self.is_exhausted(self.stats.get((site, term))):
+                    skipped += 1
+                else:
+                    self.remaining.append((site, term))
+        if skipped:
+            logger.info(f"Skipping {skipped} site/term pairs that only returned duplicates recently")
+
+    def is_exhausted(self, stats: Optional[Dict[str, Any]]) -> bool:
+        if not stats or stats.get("pages", 0) < settings.SCRAPER_YIELD_MIN_PAGES:
+            return False
+        seen = stats.get("new_images", 0) + stats.get("duplicates", 0)
+        if not seen or stats["duplicates"] / seen < settings.SCRAPER_YIELD_SKIP_DUPLICATE_RATE:
+            return False
+        last_run = stats.get("last_run")
+        return bool(last_run) and self.now - last_run < timedelta(seconds=settings.SCRAPER_YIELD_RETRY_AFTER)
+
+    def score(self, key: Tuple[str, str], total_pages: int, scale: float) -> Tuple[float, float]:
+        """UCB1 score, with lower mean latency breaking ties"""
+        stats = self.stats.get(key)
+        if not stats or not stats.get("pages"):
+            return math.inf, 0.0
+        pages = stats["pages"]
+        # Stats recorded before runs were counted had one run per page
+        runs = stats.get("runs") or pages
+        reliability = 1.0 - min(stats.get("failures", 0) / runs, 1.0)
+        mean_yield = stats.get("new_images", 0) / pages * reliability
+        bonus = settings.SCRAPER_YIELD_EXPLORATION * scale * math.sqrt(math.log(max(total_pages, 1)) / pages)
+        return mean_yield + bonus, -stats.get("latency_total", 0.0) / pages
+
+    def next(self) -> Optional[Tuple[BaseScraper, str]]:
+        """Pop the next (adapter, term) pair to scrape, or None when all are done"""
+        if not self.remaining:
+            return None
+        visited = [self.stats[key] for key in self.remaining if self.stats.get(key, {}).get("pages")]
+        total_pages = sum(stats["pages"] for stats in visited)
+        # Yields are unbounded counts, so scale the exploration bonus to the best mean seen
+        scale = max((stats.get("new_images", 0) / stats["pages"] for stats in visited), default=0.0) or 1.0
+        # max() keeps the first of equal scores, so ties fall back to term order
+        best = max(self.remaining, key=lambda key: self.score(key, total_pages, scale))
+        self.remaining.remove(best)
+        site, term = best
+        return self.adapters[site], term
+
+    def record(
+        self,
+        adapter: BaseScraper,
+        term: str,
+        new_images: int,
+        duplicates: int,
+        latency: float,
+        failed: bool,
+        pages: int = 1
+    ):
+        """Fold one run's outcome (over ``pages`` page loads) into the in-memory stats"""
+        stats = self.stats.setdefault((adapter.name, term), {})
+        stats["pages"] = stats.get("pages", 0) + pages
+        stats["runs"] = stats.get("runs", 0) + 1
+        stats["new_images"] = stats.get("new_images", 0) + new_images
+        stats["duplicates"] = stats.get("duplicates", 0) + duplicates
+        stats["failures"] = stats.get("failures", 0) + int(failed)
+        stats["latency_total"] = stats.get("latency_total", 0.0) + latency
+        stats["last_run"] = datetime.utcnow()
@@ -0,0 +1,212 @@
+"""Sharded scrape jobs.
+
+A sharded job is split into (site, term, page) work units stored in MongoDB.
+Workers on any node lease units with the same expiry and heartbeat scheme as
+whole jobs, so a large backfill scales with the number of workers.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+import uuid
+from pymongo import ReturnDocument, UpdateOne
+from .config import settings
+from .database import CATEGORY_MAPPING
+from .jobs import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING
+from .scraper.adapters import get_adapters
+from .scraper.yield_planner import search_terms_for
+
+logger = logging.getLogger(__name__)
+
+ALL_CATEGORIES = "all"
+
+def plan_units(request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Work units for a sharded scrape request, most relevant terms first
+
+    The category "all" backfills every known category.
+    """
+    category = request["category"].lower()
+    categories = list(CATEGORY_MAPPING) if category == ALL_CATEGORIES else [category]
+    units = []
+    for category in categories:
+        for term in search_terms_for(category):
+            for adapter in get_adapters():
+                # Browser-only sites have no page-numbered results: one unit scrolls page one
+                pages = range(1, adapter.max_pages + 1) if adapter.uses_http else [1]
+                for page in pages:
+                    units.append({"category": category, "site": adapter.name, "term": term, "page": page})
+    return units
+
+class ShardStore:
+    """Work units of sharded scrape jobs"""
+
+    def __init__(self, collection, lease_seconds: int, max_attempts: int, claims=None):
+        self.units = collection
+        self.claims = claims  # image_claims, renewed with the unit that took them
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    async def setup(self):
+        await self.units.create_index([("task_id", 1), ("site", 1), ("term", 1), ("page", 1)], unique=True)
+        await self.units.create_index([("status", 1), ("seq", 1)])
+        await self.units.create_index([("task_id", 1), ("status", 1)])
+        await self.units.create_index("expires_at", expireAfterSeconds=0)
+
+    async def create_units(self, task_id: str, units: List[Dict[str, Any]]) -> int:
+        """Add a job's units; idempotent, so a re-leased job can plan again safely
+
+        A retried job takes back units its previous attempt left to expire.
+        """
+        now = datetime.utcnow()
+        inserted = 0
+        batch_size = settings.BULK_WRITE_BATCH_SIZE
+        for start in range(0, len(units), batch_size):
+            operations = [
+                UpdateOne(
+                    {"task_id": task_id, "site": unit["site"], "term": unit["term"], "page": unit["page"]},
+                    {"$setOnInsert": {
+                        "_id": str(uuid.uuid4()),
+                        "category": unit["category"],
+                        "seq": start + offset,
+                        "status": QUEUED,
+                        "attempts": 0,
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                        "result": None,
+                        "created_at": now,
+                        "updated_at": now
+                    }, "$unset": {"expires_at": ""}},
+                    upsert=True
+                )
+                for offset, unit in enumerate(units[start:start + batch_size])
+            ]
+            result = await self.units.bulk_write(operations, ordered=False)
+            inserted += result.upserted_count
+        return inserted
+
+    async def lease(self, worker_id: str, task_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Atomically claim the next queued (or abandoned) unit, optionally of one job"""
+        now = datetime.utcnow()
+        query = {
+            "$or": [
+                {"status": QUEUED},
+                {"status": RUNNING, "lease_expires_at": {"$lt": now}}
+            ],
+            "attempts": {"$lt": self.max_attempts},
+            # Units of a job that has ended are never picked up again
+            "expires_at": None
+        }
+        if task_id:
+            query["task_id"] = task_id
+        return await self.units.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("seq", 1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, unit_id: str, worker_id: str) -> bool:
+        now = datetime.utcnow()
+        result = await self.units.update_one(
+            {"_id": unit_id, "status": RUNNING, "lease_owner": worker_id},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.lease_seconds), "updated_at": now}}
+        )
+        if result.matched_count != 1:
+            return False
+        if self.claims is not None:
+            # Claims of images still downloading expire one lease after claimed_at
+            await self.claims.update_many({"unit_id": unit_id, "stored": False}, {"$set": {"claimed_at": now}})
+        return True
+
+    async def complete(self, unit_id: str, worker_id: str, result: Dict[str, int]):
+        await self.units.update_one(
+            {"_id": unit_id, "lease_owner": worker_id},
+            {"$set": {"status": COMPLETED, "result": result, "lease_owner": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def fail(self, unit_id: str, worker_id: str, message: str):
+        """Put the unit back in the queue, or fail it once it has used its attempts"""
+        unit = await self.units.find_one({"_id": unit_id, "lease_owner": worker_id})
+        if unit is None:
+            return
+        if unit.get("expires_at"):
+            status = CANCELLED  # The job ended while this unit ran
+        else:
+            status = FAILED if unit["attempts"] >= self.max_attempts else QUEUED
+        await self.units.update_one(
+            {"_id": unit_id, "lease_owner": worker_id},
+            {"$set": {"status": status, "message": message, "lease_owner": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def cancel(self, task_id: str) -> int:
+        """Drop a job's queued units, e.g. once it has collected enough images or was cancelled"""
+        result = await self.units.update_many(
+            {"task_id": task_id, "status": QUEUED},
+            {"$set": {"status": CANCELLED, "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    async def progress(self, task_id: str) -> Dict[str, Any]:
+        """Unit counts by status and counters summed across a job's shards"""
+        progress = {
+            "units": {},
+            "pages_visited": 0,
+            "candidates_found": 0,
+            "downloaded": 0,
+            "deduped": 0,
+            "saved": 0
+        }
+        # Units abandoned on their last attempt will never be leased again
+        await self.units.update_many(
+            {
+                "task_id": task_id,
+                "status": RUNNING,
+                "lease_expires_at": {"$lt": datetime.utcnow()},
+                "attempts": {"$gte": self.max_attempts}
+            },
+            {"$set": {"status": FAILED, "message": "Lease expired on the last attempt"}}
+        )
+        pipeline = [
+            {"$match": {"task_id": task_id}},
+            {"$group": {
+                "_id": "$status",
+                "count": {"$sum": 1},
+                **{key: {"$sum": {"$ifNull": [f"$result.{key}", 0]}} for key in list(progress)[1:]}
+            }}
+        ]
+        async for group in self.units.aggregate(pipeline):
+            progress["units"][group["_id"]] = group["count"]
+            for key in list(progress)[1:]:
+                progress[key] += group[key]
+        progress["pending"] = progress["units"].get(QUEUED, 0) + progress["units"].get(RUNNING, 0)
+        return progress
+
+    async def expire(self, task_id: str):
+        """Let MongoDB remove an ended job's units along with the job
+
+        Units still running elsewhere keep the expiry when they complete, and
+        are cancelled rather than requeued if they fail.
+        """
+        await self.units.update_many(
+            {"task_id": task_id},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=settings.JOB_RESULT_TTL)}}
+        )
+
+def create_shard_store(database=None) -> ShardStore:
+    if database is None:
+        from .database import db as database
+    return ShardStore(
+        database.db.scrape_units,
+        settings.JOB_LEASE_SECONDS,
+        settings.JOB_MAX_ATTEMPTS,
+        claims=database.db.image_claims
+    )
+
+shard_store = create_shard_store()
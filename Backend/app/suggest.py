@@ -0,0 +1,185 @@
+"""Search-as-you-type suggestions.
+
+Titles, tags and categories of the stored images are kept in memory as a
+sorted array of normalized terms, so a prefix lookup is a bisect instead of
+regex scans over the images collection.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+import heapq
+import logging
+import time
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# When the same text is several kinds of term, the first of these wins
+KINDS = ("category", "tag", "title")
+
+def normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+class SuggestionIndex:
+    """Frequency-weighted prefix index with a bounded number of terms
+
+    ``terms`` is kept sorted, so the terms starting with a prefix form one
+    contiguous slice found by bisection. Prefixes of up to ``short_prefix``
+    characters match slices too large to rank per keystroke, so their
+    ``top_k`` terms are kept up to date as terms are counted. Results are
+    memoized until the index changes. Past ``max_terms`` the least frequent
+    terms are dropped.
+    """
+
+    def __init__(self, max_terms: int, max_length: int = 80, top_k: int = 20, short_prefix: int = 2):
+        self.max_terms = max_terms
+        self.max_length = max_length
+        self.top_k = top_k
+        self.short_prefix = short_prefix
+        self.terms: List[str] = []
+        self.entries: Dict[str, list] = {}  # term -> [weight, display text, kind]
+        self.top: Dict[str, List[str]] = {}  # short prefix -> its top_k terms, best first
+        self.memo: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def rank(self, term: str) -> tuple:
+        """Sort key: most frequent first, then alphabetical"""
+        return (-self.entries[term][0], term)
+
+    def add(self, text: Optional[str], kind: str, weight: int = 1, sort: bool = True):
+        """Count ``text``; with ``sort=False`` the caller calls ``reindex`` afterwards"""
+        if not text:
+            return
+        term = normalize(text)[:self.max_length]
+        if not term:
+            return
+        entry = self.entries.get(term)
+        if entry is None:
+            self.entries[term] = [weight, " ".join(str(text).split())[:self.max_length], kind]
+            if sort:
+                insort(self.terms, term)
+        else:
+            entry[0] += weight
+            if KINDS.index(kind) < KINDS.index(entry[2]):
+                entry[2] = kind
+        if sort:
+            self.update_top(term)
+        self.memo.clear()
+
+    def update_top(self, term: str):
+        # Weights only grow, so a term can only enter or move up its prefixes' lists
+        for length in range(1, min(len(term), self.short_prefix) + 1):
+            best = self.top.setdefault(term[:length], [])
+            if term not in best:
+                if len(best) >= self.top_k and self.rank(term) > self.rank(best[-1]):
+                    continue
+                best.append(term)
+            best.sort(key=self.rank)
+            del best[self.top_k:]
+
+    def reindex(self):
+        """Sort ``terms`` and rebuild the short-prefix lists from scratch"""
+        self.terms = sorted(self.entries)
+        groups = defaultdict(list)
+        for term in self.terms:
+            for length in range(1, min(len(term), self.short_prefix) + 1):
+                groups[term[:length]].append(term)
+        self.top = {prefix: heapq.nsmallest(self.top_k, terms, key=self.rank) for prefix, terms in groups.items()}
+        self.memo.clear()
+
+    def add_image(self, image: Dict[str, Any]):
+        category = image.get("category")
+        self.add(category, "category")
+        for tag in image.get("tags") or []:
+            self.add(tag, "tag")
+        self.add(display_title(image.get("title"), category), "title")
+
+    def add_images(self, images: Iterable[Dict[str, Any]]):
+        for image in images:
+            self.add_image(image)
+        self.prune()
+
+    def prune(self):
+        """Drop the least frequent terms once the index is over its size limit"""
+        if len(self.terms) <= self.max_terms:
+            return
+        # Prune to 90% so inserts do not trigger a prune each time
+        keep = set(heapq.nlargest(int(self.max_terms * 0.9), self.entries, key=lambda term: self.entries[term][0]))
+        self.entries = {term: entry for term, entry in self.entries.items() if term in keep}
+        self.reindex()
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most frequent terms starting with ``query``"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        key = (prefix, limit)
+        results = self.memo.get(key)
+        if results is None:
+            if len(prefix) <= self.short_prefix and limit <= self.top_k:
+                best = self.top.get(prefix, [])[:limit]
+            else:
+                # Every term starting with the prefix sorts between these two
+                start = bisect_left(self.terms, prefix)
+                end = bisect_left(self.terms, prefix + "\U0010ffff", start)
+                best = heapq.nsmallest(limit, self.terms[start:end], key=self.rank)
+            results = [
+                {"text": self.entries[term][1], "kind": self.entries[term][2], "count": self.entries[term][0]}
+                for term in best
+            ]
+            if len(self.memo) >= 1024:
+                self.memo.clear()
+            self.memo[key] = results
+        return results
+
+    async def build(self, images_collection) -> "SuggestionIndex":
+        """Build a fresh index from the images collection
+
+        Tag and category frequencies are aggregated in MongoDB; titles are
+        taken from the newest SUGGEST_TITLE_LIMIT images.
+        """
+        started = time.monotonic()
+        index = SuggestionIndex(self.max_terms, self.max_length, self.top_k, self.short_prefix)
+        pipeline = [{"$facet": {
+            "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+            "tags": [{"$unwind": "$tags"}, {"$group": {"_id": "$tags", "count": {"$sum": 1}}}]
+        }}]
+        result = (await images_collection.aggregate(pipeline).to_list(length=1))[0]
+        for kind, key in (("category", "categories"), ("tag", "tags")):
+            for row in result[key]:
+                index.add(row["_id"], kind, row["count"], sort=False)
+        cursor = images_collection.find({}, {"title": 1, "category": 1}).sort("scraped_at", -1)
+        async for image in cursor.limit(settings.SUGGEST_TITLE_LIMIT):
+            index.add(display_title(image.get("title"), image.get("category")), "title", sort=False)
+        index.reindex()
+        index.prune()
+        index.built_at = time.time()
+        logger.info(f"Suggestion index built with {len(index)} terms in {time.monotonic() - started:.2f}s")
+        return index
+
+def display_title(title: Optional[str], category: Optional[str]) -> Optional[str]:
+    """Title without the "<category> - " prefix the scraper adds"""
+    if title and category and title.lower().startswith(f"{category.lower()} - "):
+        return title[len(category) + 3:]
+    return title
+
+class Suggestions:
+    """The process-wide index, swapped for a fresh build on refresh"""
+
+    def __init__(self):
+        self.index = SuggestionIndex(settings.SUGGEST_MAX_TERMS, top_k=settings.SUGGEST_MAX_RESULTS)
+
+    async def refresh(self, images_collection):
+        # Built aside and swapped in, so lookups never see a half-built index
+        self.index = await self.index.build(images_collection)
+
+    def add_images(self, images: Iterable[Dict[str, Any]]):
+        self.index.add_images(images)
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.index.suggest(query, limit)
+
+suggestions = Suggestions()
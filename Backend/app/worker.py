@@ -0,0 +1,281 @@
+"""Standalone scraper worker.
+
+Consumes scrape jobs from the shared job store so scraping runs outside the
+API process and scales by starting more workers:
+
+    python -m app.worker
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+import uuid
+from typing import Any, Dict, Optional
+from .config import settings
+from .database import db
+from .jobs import CANCELLED, COMPLETED, job_store
+from .shards import plan_units, shard_store
+from .models import ImageResponse
+from .scraper.budget import ScrapeBudget
+from .scraper.selenium_scraper import SeleniumScraper
+
+logger = logging.getLogger(__name__)
+
+def image_event(image: ImageResponse) -> Dict[str, Any]:
+    return {
+        "type": "image",
+        "data": {
+            "_id": image.id,
+            "title": image.title,
+            "image_url": str(image.image_url),
+            "source_url": str(image.source_url),
+            "r2_url": image.r2_url,
+            "tags": image.tags,
+            "category": image.category,
+            "scraped_at": image.scraped_at
+        }
+    }
+
+async def watch_cancellation(task_id: str, budget: ScrapeBudget):
+    """Cancel the budget once DELETE /scrape/{task_id} flags the job"""
+    while True:
+        await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        try:
+            job = await job_store.get(task_id)
+        except Exception as e:
+            logger.warning(f"Error checking job {task_id} for cancellation: {str(e)}")
+            continue
+        if job is None or job.get("cancel_requested"):
+            budget.cancel()
+            return
+
+def stopped_outcome(budget: ScrapeBudget, saved_count: int, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Outcome of a job its budget stopped early, keeping what it saved; None if it ran to the end"""
+    reason = budget.exhausted
+    if reason == CANCELLED:
+        return {"status": CANCELLED, "message": f"Cancelled after saving {saved_count} images", "result": result}
+    if reason and saved_count > 0:
+        return {
+            "status": COMPLETED,
+            "message": f"Stopped at the {reason.replace('_', ' ')} budget after saving {saved_count} images",
+            "result": {**result, "stopped": reason}
+        }
+    return None
+
+async def run_scrape_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scrape job; returns the final status and message"""
+    request = job["request"]
+    category = request["category"]
+
+    async def progress(event_type: str, data: Dict[str, Any]):
+        await job_store.add_events(job["task_id"], [{"type": event_type, "data": data}])
+
+    # The scraper persists images itself; stream them to the job's event log as they land
+    saved_count = 0
+    scraper = SeleniumScraper()
+    budget = ScrapeBudget.for_request(request)
+    watcher = asyncio.create_task(watch_cancellation(job["task_id"], budget))
+    try:
+        async for image in scraper.scrape_images_iter(
+            url=request.get("url"),
+            category=category,
+            max_images=request.get("max_images", settings.MAX_IMAGES_PER_SCRAPE),
+            progress=progress,
+            budget=budget
+        ):
+            saved_count += 1
+            await job_store.add_events(job["task_id"], [image_event(image)])
+    finally:
+        watcher.cancel()
+
+    stopped = stopped_outcome(budget, saved_count, {"saved_count": saved_count})
+    if stopped:
+        return stopped
+    if saved_count > 0:
+        return {
+            "status": "completed",
+            "message": f"Successfully downloaded {saved_count} images for category '{category}'",
+            "result": {"saved_count": saved_count}
+        }
+    return {"status": "failed", "message": f"No new images found for category '{category}'"}
+
+class Worker:
+    def __init__(self, worker_id: str, concurrency: int = 1):
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.stopping = asyncio.Event()
+
+    async def heartbeat(self, task_id: str, job_task: asyncio.Task, store=job_store):
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            if not await store.heartbeat(task_id, self.worker_id):
+                logger.warning(f"Lost lease on {task_id}, stopping it")
+                job_task.cancel()
+                return
+
+    async def process_unit(self, unit: Dict[str, Any]):
+        """Scrape one work unit of a sharded job"""
+        unit_id = unit["_id"]
+        unit_task = asyncio.create_task(SeleniumScraper().scrape_unit(unit))
+        heartbeat_task = asyncio.create_task(self.heartbeat(unit_id, unit_task, store=shard_store))
+        try:
+            await shard_store.complete(unit_id, self.worker_id, await unit_task)
+        except asyncio.CancelledError:
+            if heartbeat_task.done():
+                return  # Lease lost: the unit belongs to another worker now
+            await shard_store.fail(unit_id, self.worker_id, "Worker stopped, unit requeued")
+            raise
+        except Exception as e:
+            logger.error(f"Error in work unit {unit_id}: {str(e)}")
+            await shard_store.fail(unit_id, self.worker_id, f"Error: {str(e)}")
+        finally:
+            heartbeat_task.cancel()
+
+    async def run_sharded_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Split a job into work units and help process them until it is done
+
+        Units are leased by every worker, on any node; this one also
+        aggregates their progress into the job's event stream.
+        """
+        task_id = job["task_id"]
+        request = job["request"]
+        max_images = request.get("max_images", settings.MAX_IMAGES_PER_SCRAPE)
+        await shard_store.create_units(task_id, plan_units(request))
+        budget = ScrapeBudget.for_request(request)
+        watcher = asyncio.create_task(watch_cancellation(task_id, budget))
+        last_progress = None
+        try:
+            while True:
+                progress = await shard_store.progress(task_id)
+                if progress != last_progress:
+                    await job_store.add_events(task_id, [{"type": "progress", "data": progress}])
+                    last_progress = progress
+                # Units run one page each, so the page budget is checked between them
+                budget.pages = progress["pages_visited"]
+                if progress["saved"] >= max_images or budget.exhausted:
+                    await shard_store.cancel(task_id)
+                    break
+                if not progress["pending"]:
+                    break
+                unit = await shard_store.lease(self.worker_id, task_id)
+                if unit:
+                    await self.process_unit(unit)
+                else:
+                    # Remaining units are running elsewhere
+                    await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        finally:
+            watcher.cancel()
+            # Also when stopped early with units pending; a retry of the job takes them back
+            await shard_store.expire(task_id)
+
+        saved_count = progress["saved"]
+        stopped = stopped_outcome(budget, saved_count, {"saved_count": saved_count, "units": progress["units"]})
+        if stopped:
+            return stopped
+        if saved_count > 0:
+            return {
+                "status": "completed",
+                "message": f"Successfully downloaded {saved_count} images for category '{request['category']}' "
+                           f"across {sum(progress['units'].values())} work units",
+                "result": {"saved_count": saved_count, "units": progress["units"]}
+            }
+        return {"status": "failed", "message": "Failed to save any images"}
+
+    async def process(self, job: Dict[str, Any]):
+        task_id = job["task_id"]
+        logger.info(f"Worker {self.worker_id} running job {task_id} (attempt {job['attempts']})")
+        await job_store.add_events(task_id, [{
+            "type": "status",
+            "data": {"status": "running", "message": job["message"], "attempt": job["attempts"]}
+        }])
+        if job["request"].get("sharded"):
+            job_task = asyncio.create_task(self.run_sharded_job(job))
+        else:
+            job_task = asyncio.create_task(run_scrape_job(job))
+        heartbeat_task = asyncio.create_task(self.heartbeat(task_id, job_task))
+        try:
+            outcome = await job_task
+            if outcome["status"] in (COMPLETED, CANCELLED):
+                await job_store.complete(
+                    task_id, self.worker_id, outcome["message"], outcome.get("result"), status=outcome["status"]
+                )
+            else:
+                await job_store.fail(task_id, self.worker_id, outcome["message"])
+            await job_store.add_events(task_id, [{
+                "type": "status",
+                "data": {"status": outcome["status"], "message": outcome["message"]}
+            }])
+        except asyncio.CancelledError:
+            if self.stopping.is_set():
+                # Shutting down: hand the job back for another worker
+                await job_store.fail(task_id, self.worker_id, "Worker shut down, job requeued", retry=True)
+        except Exception as e:
+            logger.error(f"Error in scrape job {task_id}: {str(e)}")
+            await job_store.fail(task_id, self.worker_id, f"Error: {str(e)}", retry=True)
+        finally:
+            heartbeat_task.cancel()
+
+    async def slot(self):
+        """One job at a time; the worker runs ``concurrency`` slots"""
+        while not self.stopping.is_set():
+            try:
+                job = await job_store.lease(self.worker_id)
+            except Exception as e:
+                logger.error(f"Error leasing job: {str(e)}")
+                job = None
+            if job is not None:
+                await self.process(job)
+                continue
+            # No job to start: help with work units of sharded jobs
+            try:
+                unit = await shard_store.lease(self.worker_id)
+            except Exception as e:
+                logger.error(f"Error leasing work unit: {str(e)}")
+                unit = None
+            if unit is not None:
+                await self.process_unit(unit)
+                continue
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        await db.connect_to_database()
+        await job_store.setup()
+        await shard_store.setup()
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} slot(s)")
+        slots = [asyncio.create_task(self.slot()) for _ in range(self.concurrency)]
+        await self.stopping.wait()
+        for slot in slots:
+            slot.cancel()
+        await asyncio.gather(*slots, return_exceptions=True)
+        await job_store.close()
+        await db.close_database_connection()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+def main():
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    worker = Worker(worker_id, concurrency=settings.WORKER_CONCURRENCY)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stopping.set)
+        except NotImplementedError:
+            pass
+    try:
+        loop.run_until_complete(worker.run())
+    finally:
+        loop.close()
+
+if __name__ == "__main__":
+    main()
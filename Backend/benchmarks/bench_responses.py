@@ -0,0 +1,111 @@
+"""Compare /images, /images/{id} and /stats throughput against FastAPI's default serialization.
+
+Seeds a throwaway database, always named "scrapershorts_bench" so the real
+collections are never dropped, and drives the app in-process through httpx's
+ASGI transport. The baseline serves the same endpoints the way they were
+written before the fast JSON path: models returned to FastAPI, validated
+against ``response_model`` and rendered by its JSONResponse.
+
+    python -m benchmarks.bench_responses --images 5000 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+BENCH_DB_NAME = "scrapershorts_bench"
+os.environ["MONGODB_DB_NAME"] = BENCH_DB_NAME  # seed() drops its collections
+os.environ["IMAGES_CACHE_ENABLED"] = "false"  # measure serialization, not the cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List
+import httpx
+from fastapi import APIRouter, FastAPI
+from app.api.routes import image_query_params
+from app.config import settings
+from app.database import db
+from app.main import app
+from app.models import ImageCreate, ImageResponse, StatsResponse
+
+CATEGORIES = ["nature", "sports", "technology", "food", "travel"]
+
+baseline_router = APIRouter()
+
+@baseline_router.get("/images", response_model=List[ImageResponse])
+async def baseline_images(limit: int = 20, compact: bool = False):
+    # There was no compact projection: the gallery fetched full images
+    query_params = image_query_params(None, None, None, None, "scraped_at", "desc", None)
+    return await db.get_images(skip=0, limit=limit, **query_params)
+
+@baseline_router.get("/images/{image_id}", response_model=ImageResponse)
+async def baseline_image(image_id: str):
+    return await db.get_image(image_id)
+
+@baseline_router.get("/stats", response_model=StatsResponse)
+async def baseline_stats():
+    return await db.get_stats()
+
+baseline_app = FastAPI()
+baseline_app.include_router(baseline_router, prefix=settings.API_V1_STR)
+
+async def seed(count: int):
+    if settings.MONGODB_DB_NAME != BENCH_DB_NAME:
+        raise SystemExit(f"Refusing to drop collections of '{settings.MONGODB_DB_NAME}'")
+    await db.images.drop()
+    await db.stats.drop()
+    await db.connect_to_database()
+    now = datetime.utcnow()
+    batch = []
+    for i in range(count):
+        batch.append(ImageCreate(
+            title=f"Benchmark image {i}",
+            image_url=f"https://cdn.example.com/bench/{i}.jpg",
+            source_url=f"https://source{i % 7}.example.com/photo/{i}",
+            tags=[CATEGORIES[i % len(CATEGORIES)], f"tag{i % 50}"],
+            scraped_at=now - timedelta(seconds=i),
+            category=CATEGORIES[i % len(CATEGORIES)],
+            r2_url=f"https://cdn.example.com/bench/{i}.jpg"
+        ))
+        if len(batch) >= settings.BULK_WRITE_BATCH_SIZE:
+            await db.create_images_bulk(batch)
+            batch = []
+    await db.create_images_bulk(batch)
+    await db.reconcile_stats()
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    # Warm up
+    await client.get(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+async def main(images: int, requests: int):
+    print(f"Seeding {images} images into '{settings.MONGODB_DB_NAME}'...")
+    await seed(images)
+    first = await db.images.find_one({}, {"_id": 1})
+    paths = [
+        f"{settings.API_V1_STR}/images?limit=1000",
+        f"{settings.API_V1_STR}/images?limit=1000&compact=true",
+        f"{settings.API_V1_STR}/images/{first['_id']}",
+        f"{settings.API_V1_STR}/stats",
+    ]
+    baseline = httpx.AsyncClient(transport=httpx.ASGITransport(app=baseline_app), base_url="http://bench")
+    fast = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    async with baseline, fast:
+        print(f"{'endpoint':<45} {'baseline req/s':>15} {'fast req/s':>12} {'speedup':>8}")
+        for path in paths:
+            before = await measure(baseline, path, requests)
+            after = await measure(fast, path, requests)
+            print(f"{path:<45} {before:>15.1f} {after:>12.1f} {after / before:>7.2f}x")
+    await db.close_database_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=5000, help="number of images to seed")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.images, args.requests))
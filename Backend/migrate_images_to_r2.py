@@ -1,6 +1,7 @@
 import os
 import asyncio
 from app.cloudflare_r2 import upload_image_to_r2
+from app.config import settings
 from app.database import Database
 from app.models import ImageCreate
 from datetime import datetime
@@ -13,6 +14,22 @@ async def migrate_images():
     await db.connect_to_database()
     migrated = 0
     skipped = 0
+    batch = []
+
+    async def flush():
+        nonlocal migrated, skipped
+        if not batch:
+            return
+        try:
+            # Images already in DB (same R2 URL) are counted as existing
+            result = await db.create_images_bulk(batch)
+            migrated += result["inserted"]
+            skipped += result["existing"]
+            print(f"Saved batch of {len(batch)}: {result['inserted']} new, {result['existing']} already in DB")
+        except Exception as e:
+            print(f"Failed to save batch of {len(batch)} to DB: {e}")
+        batch.clear()
+
     for filename in os.listdir(IMAGES_DIR):
         if not filename.lower().endswith(('.jpg', '.jpeg', '.png')):
             continue
@@ -27,14 +44,8 @@ async def migrate_images():
         except Exception as e:
             print(f"Failed to upload {filename} to R2: {e}")
             continue
-        # Check if already in DB by r2_url
-        existing = await db.images.find_one({"r2_url": r2_url})
-        if existing:
-            print(f"Already in DB: {filename}")
-            skipped += 1
-            continue
         # Compose minimal metadata
-        image_create = ImageCreate(
+        batch.append(ImageCreate(
             title=title,
             image_url=r2_url,  # Use R2 URL as image_url for legacy
             source_url=r2_url, # No original source, so use R2 URL
@@ -42,16 +53,12 @@ async def migrate_images():
             scraped_at=datetime.utcnow(),
             category=None,
             r2_url=r2_url
-        )
-        try:
-            await db.create_image(image_create)
-            print(f"Migrated: {filename}")
-            migrated += 1
-        except Exception as e:
-            print(f"Failed to save {filename} to DB: {e}")
-            continue
+        ))
+        if len(batch) >= settings.BULK_WRITE_BATCH_SIZE:
+            await flush()
+    await flush()
     print(f"Migration complete. Migrated: {migrated}, Skipped: {skipped}")
     await db.close_database_connection()
 
 if __name__ == "__main__":
-    asyncio.run(migrate_images()) 
\ No newline at end of file
+    asyncio.run(migrate_images())
@@ -0,0 +1,14 @@
+import os
+
+# The R2 client is configured at import time; tests never upload, so placeholders do
+for name, value in (
+    ("CLOUDFLARE_ACCOUNT_ID", "test"),
+    ("CLOUDFLARE_ACCESS_KEY_ID", "test"),
+    ("CLOUDFLARE_SECRET_ACCESS_KEY", "test"),
+    ("CLOUDFLARE_R2_BUCKET_NAME", "test"),
+    ("CLOUDFLARE_R2_PUBLIC_URL", "https://r2.test")
+):
+    os.environ.setdefault(name, value)
+
+# No MongoDB server here: cache generations stay in process
+os.environ.setdefault("CACHE_SHARED_GENERATIONS", "false")
@@ -0,0 +1,47 @@
+from pathlib import Path
+from app.scraper.adapters import ADAPTERS, get_adapters
+from app.scraper.adapters.pexels import PexelsScraper
+from app.scraper.adapters.pixabay import PixabayScraper
+from app.scraper.adapters.unsplash import UnsplashScraper
+from app.scraper.base_scraper import BROWSER, EMBEDDED_STATE, JSON_API, STATIC_HTML
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+def fixture(name: str) -> str:
+    return (FIXTURES / name).read_text()
+
+def test_registry_declares_a_strategy_per_site():
+    assert [adapter.name for adapter in get_adapters()] == list(ADAPTERS)
+    assert {adapter.strategy for adapter in get_adapters()} == {JSON_API, EMBEDDED_STATE, STATIC_HTML, BROWSER}
+    for adapter in get_adapters():
+        assert "{category}" in adapter.search_url
+        if adapter.uses_http:
+            assert "{page}" in adapter.page_url
+
+def test_unsplash_parses_json_api():
+    adapter = UnsplashScraper()
+    url = adapter.result_page("black cat", 2)
+    assert "query=black+cat" in url and "page=2" in url
+    candidates = adapter.parse(fixture("unsplash_search.json"), url)
+    assert [candidate["title"] for candidate in candidates] == ["orange tabby cat on white textile", "Sleeping kitten"]
+    assert candidates[0]["tags"] == ["cat", "pet"]
+    assert candidates[0]["image_url"].endswith("w=1080")
+
+def test_pexels_parses_embedded_state():
+    adapter = PexelsScraper()
+    candidates = adapter.parse(fixture("pexels_search.html"), adapter.result_page("cat", 1))
+    assert len(candidates) == 1
+    assert candidates[0]["image_url"] == "https://images.pexels.com/photos/1/a.jpeg?w=940"
+    assert candidates[0]["tags"] == ["cat", "sofa"]
+
+def test_pixabay_parses_static_html():
+    adapter = PixabayScraper()
+    candidates = adapter.parse(fixture("pixabay_search.html"), adapter.result_page("cat", 1))
+    assert [candidate["image_url"] for candidate in candidates] == [
+        "https://cdn.pixabay.com/photo/2024/01/01/cat-1_640.jpg",
+        "https://cdn.pixabay.com/photo/2024/01/02/cat-2_640.jpg"
+    ]
+
+def test_invalid_bodies_yield_no_candidates():
+    assert UnsplashScraper().parse("<html>rate limited</html>", "https://unsplash.com/napi") == []
+    assert PexelsScraper().parse(fixture("pixabay_search.html"), "https://www.pexels.com/search/cat/") == []
@@ -1,28 +1,86 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime
 from app.main import app
 from app.database import db
+from fastapi import HTTPException
+from app.api.routes import get_db, get_job_store, resolve_fields
+from app.jobs import SQLiteJobStore
+from app.models import COMPACT_IMAGE_FIELDS, ImageResponse
 import mongomock
 
 client = TestClient(app)
 
+def make_image(image_id, **overrides):
+    data = {
+        "_id": image_id,
+        "title": f"Image {image_id}",
+        "image_url": f"https://cdn.test/{image_id}.jpg",
+        "source_url": "https://photos.test/gallery",
+        "tags": ["test"],
+        "scraped_at": datetime(2024, 1, 1),
+        "category": "nature"
+    }
+    data.update(overrides)
+    return ImageResponse(**data)
+
+class FakeDB:
+    """Stands in for ``db`` through the get_db dependency"""
+
+    def __init__(self, images=None, stats=None):
+        self.images = images or []
+        self.stats = stats or {}
+
+    async def get_images(self, **kwargs):
+        self.kwargs = kwargs
+        return self.images
+
+    async def get_image(self, image_id):
+        return next((image for image in self.images if image.id == image_id), None)
+
+    async def get_stats(self):
+        return self.stats
+
+    async def get_image_facets(self, **kwargs):
+        self.facet_kwargs = kwargs
+        return {
+            "images": self.images,
+            "total": len(self.images),
+            "facets": {"categories": [{"_id": "nature", "count": len(self.images)}], "sources": [], "tags": []}
+        }
+
+@pytest.fixture
+def fake_db():
+    fake = FakeDB()
+    app.dependency_overrides[get_db] = lambda: fake
+    yield fake
+    app.dependency_overrides.pop(get_db, None)
+
 @pytest.fixture
 def mock_db():
     db.client = mongomock.MongoClient()
     db.db = db.client.db
     return db
 
+@pytest.fixture
+def job_store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=3)
+    asyncio.run(store.setup())
+    app.dependency_overrides[get_job_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_job_store, None)
+
 def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to Image Scraper API"}
 
-def test_start_scraping():
+def test_start_scraping(job_store):
     response = client.post(
         "/api/v1/scrape",
         json={
-            "query": "test",
+            "category": "test",
             "max_images": 10,
             "tags": ["test"]
         }
@@ -30,10 +88,26 @@ def test_start_scraping():
     assert response.status_code == 200
     data = response.json()
     assert "task_id" in data
-    assert data["status"] == "running"
+    assert data["status"] == "queued"
+    assert asyncio.run(job_store.get(data["task_id"]))["request"]["category"] == "test"
+
+def test_identical_scrape_requests_coalesce_into_one_job(job_store):
+    request = {"category": "nature", "max_images": 10}
+    first = client.post("/api/v1/scrape", json=request).json()
+    second = client.post("/api/v1/scrape", json={**request, "max_images": 5}).json()
+    assert second["task_id"] == first["task_id"] and second["coalesced"]
+    # Needs more images than the queued job collects
+    assert not client.post("/api/v1/scrape", json={**request, "max_images": 20}).json()["coalesced"]
 
-def test_get_images_empty(mock_db):
-    response = client.get("/api/v1/images")
+def test_scrape_requests_with_different_budgets_do_not_coalesce(job_store):
+    capped = client.post("/api/v1/scrape", json={"category": "nature", "max_images": 10, "max_pages": 2}).json()
+    unlimited = client.post("/api/v1/scrape", json={"category": "nature", "max_images": 10}).json()
+    assert not unlimited["coalesced"] and unlimited["task_id"] != capped["task_id"]
+    same = client.post("/api/v1/scrape", json={"category": "nature", "max_images": 10, "max_pages": 2}).json()
+    assert same["task_id"] == capped["task_id"]
+
+def test_get_images_empty(fake_db):
+    response = client.get("/api/v1/images", params={"search": "empty"})
     assert response.status_code == 200
     assert response.json() == []
 
@@ -50,7 +124,140 @@ def test_get_nonexistent_image():
     assert response.status_code == 404
     assert response.json()["detail"] == "Image not found"
 
-def test_get_nonexistent_task():
+def test_get_images_batch_reports_missing():
+    response = client.post("/api/v1/images/batch", json={"ids": ["nonexistent", "nonexistent", "other"]})
+    assert response.status_code == 200
+    assert response.json() == {"images": [], "missing": ["nonexistent", "other"]}
+
+def test_get_images_batch_limit():
+    response = client.post("/api/v1/images/batch", json={"ids": [str(i) for i in range(501)]})
+    assert response.status_code == 400
+
+def test_get_nonexistent_task(job_store):
     response = client.get("/api/v1/scrape/nonexistent")
     assert response.status_code == 404
-    assert response.json()["detail"] == "Task not found" 
\ No newline at end of file
+    assert response.json()["detail"] == "Task not found" 
+def test_get_images_serializes_models(fake_db):
+    fake_db.images = [make_image("a1"), make_image("a2")]
+    response = client.get("/api/v1/images", params={"search": "serialize"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [image["_id"] for image in data] == ["a1", "a2"]
+    assert data[0]["image_url"] == "https://cdn.test/a1.jpg"
+
+def test_get_image_and_stats_serialize_models(fake_db):
+    fake_db.images = [make_image("a1")]
+    fake_db.stats = {
+        "total_images": 1,
+        "top_tags": [{"_id": "test", "count": 1}],
+        "source_breakdown": [{"_id": "photos.test", "count": 1}],
+        "last_scraped": datetime(2024, 1, 1)
+    }
+    response = client.get("/api/v1/images/a1")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Image a1"
+    response = client.get("/api/v1/stats")
+    assert response.status_code == 200
+    assert response.json()["top_tags"] == [{"_id": "test", "count": 1}]
+    assert response.json()["last_scraped"] == "2024-01-01T00:00:00"
+
+class FailingDB(FakeDB):
+    async def get_images(self, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    async def get_image_facets(self, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    async def get_images_by_ids(self, image_ids, fields=None):
+        raise ConnectionError("database unavailable")
+
+def test_get_images_batch_fails_on_database_errors():
+    app.dependency_overrides[get_db] = lambda: FailingDB()
+    try:
+        response = client.post("/api/v1/images/batch", json={"ids": ["0" * 24]})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert response.status_code == 500
+
+@pytest.mark.parametrize("path", ["/api/v1/images", "/api/v1/images/facets"])
+def test_database_errors_are_not_served_or_cached(fake_db, path):
+    params = {"search": f"outage {path}"}
+    app.dependency_overrides[get_db] = lambda: FailingDB()
+    response = client.get(path, params=params)
+    assert response.status_code == 500
+    assert "cache-control" not in response.headers
+
+    # Once the database is back the same query is answered from it, not from the cache
+    app.dependency_overrides[get_db] = lambda: fake_db
+    fake_db.images = [make_image("a1")]
+    response = client.get(path, params=params)
+    assert response.status_code == 200 and response.headers["x-cache"] == "MISS"
+
+def read_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        events.append((fields.get("id"), fields["event"], fields["data"]))
+    return events
+
+def test_scrape_events_resume_after_last_event_id(job_store):
+    job = asyncio.run(job_store.enqueue({"category": "test"}, message="queued"))
+    asyncio.run(job_store.add_events(job["task_id"], [
+        {"type": "progress", "data": {"saved": 1}},
+        {"type": "image", "data": {"_id": "a1"}},
+        {"type": "status", "data": {"status": "completed", "message": "done"}}
+    ]))
+    response = client.get(f"/api/v1/scrape/{job['task_id']}/events")
+    events = read_sse(response.text)
+    assert [event[1] for event in events] == ["status", "progress", "image", "status"]
+    first_id = events[1][0]
+
+    response = client.get(f"/api/v1/scrape/{job['task_id']}/events", headers={"Last-Event-ID": first_id})
+    events = read_sse(response.text)
+    # The current status comes first, then only the events after the given id
+    assert [(event[1], event[2]) for event in events] == [
+        ("status", '{"status":"queued","message":"queued"}'),
+        ("image", '{"_id":"a1"}'),
+        ("status", '{"status":"completed","message":"done"}')
+    ]
+
+def test_cancelled_queued_job_ends_its_event_stream(job_store):
+    job = asyncio.run(job_store.enqueue({"category": "test"}, message="queued"))
+    response = client.delete(f"/api/v1/scrape/{job['task_id']}")
+    assert response.json()["status"] == "cancelled"
+    events = read_sse(client.get(f"/api/v1/scrape/{job['task_id']}/events").text)
+    assert events[-1][1] == "status" and '"cancelled"' in events[-1][2]
+
+def test_get_image_facets_serializes_models(fake_db):
+    fake_db.images = [make_image("a1"), make_image("a2")]
+    response = client.get("/api/v1/images/facets", params={"category": "Nature", "facet_limit": 5, "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [image["_id"] for image in data["images"]] == ["a1", "a2"]
+    assert data["total"] == 2
+    assert data["facets"]["categories"] == [{"_id": "nature", "count": 2}]
+    assert fake_db.facet_kwargs["category"] == "nature" and fake_db.facet_kwargs["facet_limit"] == 5
+    assert response.headers["etag"]
+
+def test_resolve_fields_always_includes_the_id():
+    assert resolve_fields("title, tags,title", compact=False) == ["_id", "title", "tags"]
+    assert resolve_fields("id,category", compact=False) == ["_id", "category"]
+    assert resolve_fields(None, compact=True) == COMPACT_IMAGE_FIELDS
+    # Explicit fields win over compact
+    assert resolve_fields("title", compact=True) == ["_id", "title"]
+    assert resolve_fields(None, compact=False) is None
+    with pytest.raises(HTTPException) as error:
+        resolve_fields("title,password,views", compact=False)
+    assert error.value.status_code == 400 and error.value.detail == "Unknown fields: password, views"
+
+def test_get_images_projects_the_requested_fields(fake_db):
+    fake_db.images = [{"_id": "a1", "title": "Image a1"}]
+    response = client.get("/api/v1/images", params={"fields": "title", "search": "projection"})
+    assert response.status_code == 200
+    assert response.json() == [{"_id": "a1", "title": "Image a1"}]
+    assert fake_db.kwargs["fields"] == ["_id", "title"]
+
+    client.get("/api/v1/images", params={"compact": "true", "search": "projection"})
+    assert fake_db.kwargs["fields"] == COMPACT_IMAGE_FIELDS
+    response = client.get("/api/v1/images", params={"fields": "title,secret"})
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.scraper.budget import CANCELLED, DEADLINE, PAGE_BUDGET, BudgetExceeded, ScrapeBudget
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_page_budget_stops_new_pages_only():
+    clock = FakeClock()
+    budget = ScrapeBudget(deadline_seconds=60, max_pages=2, clock=clock)
+    assert budget.charge_page()
+    assert budget.charge_page()
+    assert not budget.charge_page()
+    assert budget.exhausted == PAGE_BUDGET
+    assert budget.stop_reason is None
+    clock.now += 60
+    assert budget.stop_reason == DEADLINE
+
+@pytest.mark.asyncio
+async def test_cancel_interrupts_work_in_flight():
+    budget = ScrapeBudget()
+    slow = asyncio.ensure_future(budget.run(asyncio.sleep(10)))
+    await asyncio.sleep(0)
+    budget.cancel()
+    with pytest.raises(BudgetExceeded) as error:
+        await asyncio.wait_for(slow, timeout=1)
+    assert error.value.reason == CANCELLED
+    # Sleeps return early instead of raising
+    await asyncio.wait_for(budget.sleep(10), timeout=1)
+
+@pytest.mark.asyncio
+async def test_deadline_interrupts_work_in_flight():
+    budget = ScrapeBudget(deadline_seconds=0.05)
+    assert await budget.run(asyncio.sleep(0, result="done")) == "done"
+    with pytest.raises(BudgetExceeded) as error:
+        await budget.run(asyncio.sleep(10))
+    assert error.value.reason == DEADLINE
+
+def test_for_request_treats_zero_limits_as_unlimited(monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPE_MAX_PAGES", 0)
+    monkeypatch.setattr(settings, "SCRAPE_MAX_DEADLINE", 0)
+    budget = ScrapeBudget.for_request({"category": "nature"})
+    assert budget.max_pages is None and budget.deadline is None
+    assert budget.exhausted is None and budget.charge_page()
+    assert ScrapeBudget.for_request({"max_pages": 3}).max_pages == 3
+
+    monkeypatch.setattr(settings, "SCRAPE_MAX_PAGES", 10)
+    assert ScrapeBudget.for_request({}).max_pages == 10
+    assert ScrapeBudget.for_request({"max_pages": 50}).max_pages == 10
@@ -0,0 +1,51 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.cache import LocalCacheBackend, QueryCache
+
+@pytest.fixture
+def cache():
+    return QueryCache(LocalCacheBackend(max_entries=2), ttl=30)
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_miss(cache):
+    assert await cache.get("all", {"page": 1}) is None
+    await cache.set("all", {"page": 1}, b"[]")
+    assert await cache.get("all", {"page": 1}) == b"[]"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_cache_key_ignores_param_order_and_none(cache):
+    await cache.set("all", {"page": 1, "limit": 20, "search": None}, b"[]")
+    assert await cache.get("all", {"limit": 20, "page": 1}) == b"[]"
+
+@pytest.mark.asyncio
+async def test_cache_lru_eviction(cache):
+    await cache.set("all", {"page": 1}, b"1")
+    await cache.set("all", {"page": 2}, b"2")
+    await cache.get("all", {"page": 1})
+    await cache.set("all", {"page": 3}, b"3")
+    assert await cache.get("all", {"page": 2}) is None
+    assert await cache.get("all", {"page": 1}) == b"1"
+
+@pytest.mark.asyncio
+async def test_cache_invalidate_scope(cache):
+    await cache.set("nature", {"page": 1}, b"n")
+    await cache.set("sports", {"page": 1}, b"s")
+    await cache.invalidate(["nature"])
+    assert await cache.get("nature", {"page": 1}) is None
+    assert await cache.get("sports", {"page": 1}) == b"s"
+
+@pytest.mark.asyncio
+async def test_invalidations_reach_other_processes_through_shared_generations():
+    generations = AsyncMongoMockClient().db.cache_generations
+    api = QueryCache(LocalCacheBackend(generations=generations, sync_interval=0), ttl=30)
+    worker = QueryCache(LocalCacheBackend(generations=generations, sync_interval=0), ttl=30)
+    await api.set("nature", {"page": 1}, b"n")
+    await api.set("sports", {"page": 1}, b"s")
+    await worker.invalidate(["nature"])
+    assert await api.get("nature", {"page": 1}) is None
+    assert await api.get("sports", {"page": 1}) == b"s"
+    await api.set("nature", {"page": 1}, b"n2")
+    assert await api.get("nature", {"page": 1}) == b"n2"
@@ -0,0 +1,166 @@
+from collections import Counter
+from urllib.parse import urlparse
+import pytest
+import pytest_asyncio
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app import database as database_module
+from app.database import Database
+from app.models import COMPACT_IMAGE_FIELDS, ImageCreate
+
+COLLECTIONS = ("images", "stats", "scrape_yield", "crawl_checkpoints", "image_claims")
+
+@pytest_asyncio.fixture
+async def database():
+    database = Database()
+    database.client = AsyncMongoMockClient()
+    database.db = database.client.test
+    for name in COLLECTIONS:
+        setattr(database, name, database.db[name])
+    await database.images.create_index("image_url", unique=True)
+    return database
+
+def make_image(number, **overrides):
+    data = {
+        "title": f"Image {number}",
+        "image_url": f"https://cdn.test/{number}.jpg",
+        "source_url": "https://photos.test/gallery",
+        "tags": ["sky"],
+        "category": "nature"
+    }
+    data.update(overrides)
+    return ImageCreate(**data)
+
+class RacingImages:
+    """Images collection where another writer inserts the second image mid-write"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, operations, ordered=True):
+        result = await self.collection.bulk_write(operations[:1], ordered=ordered)
+        raise BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+            "upserted": [{"index": 0, "_id": result.upserted_ids[0]}]
+        })
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_counts_duplicates_in_batch_and_in_database(database):
+    await database.create_images_bulk([make_image(1)])
+    result = await database.create_images_bulk([
+        make_image(1, title="Already stored"),
+        make_image(2),
+        make_image(2, title="Repeated in batch"),
+        make_image(3)
+    ])
+    assert result["inserted"] == 2 and result["existing"] == 2
+    assert [image.title for image in result["images"]] == ["Image 2", "Image 3"]
+    assert all(isinstance(image.id, str) for image in result["images"])
+    assert await database.images.count_documents({}) == 3
+    assert (await database.images.find_one({"image_url": "https://cdn.test/1.jpg"}))["title"] == "Image 1"
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_survives_a_duplicate_key_race(database):
+    database.images = RacingImages(database.images)
+    result = await database.create_images_bulk([make_image(1), make_image(2)])
+    assert result["inserted"] == 1 and result["existing"] == 1
+    assert [image.title for image in result["images"]] == ["Image 1"]
+    assert (await database.stats.find_one({}))["total_images"] == 1
+
+@pytest.mark.asyncio
+async def test_stats_counters_match_a_full_recount(database):
+    await database.create_images_bulk([
+        make_image(1, tags=["sky", "v1.0"], source_url="https://Photos.test/a"),
+        make_image(2, tags=["sky"], category=None),
+        make_image(3, tags=[], source_url="https://other.test/b", category="cities")
+    ])
+    await database.create_images_bulk([make_image(1), make_image(4, tags=["sea", "sky"])])
+    await database.create_image(make_image(5, tags=["sea"], category="cities"))
+    await database.create_image(make_image(5))
+
+    images = [image async for image in database.images.find({})]
+    tags = Counter(tag for image in images for tag in image["tags"])
+    sources = Counter(urlparse(image["source_url"]).hostname for image in images)
+    categories = Counter(image.get("category") or "uncategorized" for image in images)
+
+    stats = await database.get_stats()
+    assert stats["total_images"] == len(images) == 5
+    assert {t["_id"]: t["count"] for t in stats["top_tags"]} == dict(tags)
+    assert {s["_id"]: s["count"] for s in stats["source_breakdown"]} == dict(sources)
+    assert {c["_id"]: c["count"] for c in stats["category_breakdown"]} == dict(categories)
+    assert stats["last_scraped"] == max(image["scraped_at"] for image in images)
+
+@pytest.mark.asyncio
+async def test_image_claims_expire_unless_stored(database):
+    await database.connect_to_database()
+    indexes = await database.image_claims.index_information()
+    ttl = next(index for index in indexes.values() if index.get("key") == [("claimed_at", 1)])
+    assert ttl["expireAfterSeconds"] == settings.JOB_LEASE_SECONDS
+
+    assert await database.claim_images(["a", "b", "c"]) == {"a", "b", "c"}
+    assert await database.claim_images(["a", "d"]) == {"d"}
+    await database.mark_claims_stored(["a"])
+    await database.release_image_claims(["b"])
+    claims = {claim["_id"]: claim["stored"] async for claim in database.image_claims.find({})}
+    assert claims == {"a": True, "c": False, "d": False}
+
+@pytest.mark.asyncio
+async def test_image_facets_count_the_filtered_images(database, monkeypatch):
+    # mongomock has no $regexFind; take the host from the URL's third "/" part instead
+    monkeypatch.setattr(database_module, "SOURCE_HOST_EXPR", {"$arrayElemAt": [{"$split": ["$source_url", "/"]}, 2]})
+    await database.create_images_bulk([
+        make_image(1, tags=["sky", "sea"]),
+        make_image(2, tags=["sky"], source_url="https://other.test/b"),
+        make_image(3, tags=["sky"], category=None),
+        make_image(4, tags=["street"], category="cities")
+    ])
+    result = await database.get_image_facets(search=None, category="nature", limit=1, fields=["_id", "title"])
+    assert result["total"] == 2
+    assert len(result["images"]) == 1 and set(result["images"][0]) == {"_id", "title"}
+    assert result["facets"]["categories"] == [{"_id": "nature", "count": 2}]
+    assert result["facets"]["sources"] == [{"_id": "other.test", "count": 1}, {"_id": "photos.test", "count": 1}]
+    assert result["facets"]["tags"] == [{"_id": "sky", "count": 2}, {"_id": "sea", "count": 1}]
+
+    everything = await database.get_image_facets(facet_limit=2)
+    assert everything["total"] == 4
+    assert all(image.id for image in everything["images"])
+    assert everything["facets"]["categories"] == [{"_id": "nature", "count": 2}, {"_id": "cities", "count": 1}]
+
+@pytest.mark.asyncio
+async def test_images_by_ids_come_back_in_request_order(database):
+    stored = (await database.create_images_bulk([make_image(1), make_image(2), make_image(3)]))["images"]
+    first, second, third = (image.id for image in stored)
+    missing = "0" * 24
+    images, not_found = await database.get_images_by_ids([third, missing, first, third, "not-an-id"])
+    assert [image.id for image in images] == [third, first]
+    assert images[0].title == "Image 3" and str(images[1].image_url) == "https://cdn.test/1.jpg"
+    assert not_found == [missing, "not-an-id"]
+
+    rows, _ = await database.get_images_by_ids([second, first], fields=["_id", "title"])
+    assert rows == [{"_id": second, "title": "Image 2"}, {"_id": first, "title": "Image 1"}]
+
+class BrokenImages:
+    def find(self, *args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+@pytest.mark.asyncio
+async def test_images_by_ids_raises_database_errors(database):
+    database.images = BrokenImages()
+    with pytest.raises(ConnectionError):
+        await database.get_images_by_ids(["0" * 24])
+
+@pytest.mark.asyncio
+async def test_projected_images_hold_only_the_requested_fields(database):
+    await database.create_images_bulk([make_image(1, r2_url="https://r2.test/1.jpg"), make_image(2)])
+    rows = await database.get_images(fields=["_id", "title"], sort_by="title", sort_order="asc")
+    assert [row["title"] for row in rows] == ["Image 1", "Image 2"]
+    assert all(set(row) == {"_id", "title"} and isinstance(row["_id"], str) for row in rows)
+
+    compact = await database.get_images(fields=COMPACT_IMAGE_FIELDS, sort_by="title", sort_order="asc")
+    assert list(compact[0]) == COMPACT_IMAGE_FIELDS
+    assert compact[0]["r2_url"] == "https://r2.test/1.jpg" and compact[1]["r2_url"] is None
+    assert compact[0]["_id"] == rows[0]["_id"] and "tags" not in compact[0]
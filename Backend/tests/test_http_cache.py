@@ -0,0 +1,72 @@
+import asyncio
+import os
+import pytest
+from app.scraper.http_cache import HttpCache
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.charset = None
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class FakeSession:
+    """Serves one body per URL with an ETag, answering 304 to a matching If-None-Match"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requests = []
+
+    def get(self, url, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        etag = f'"{len(self.bodies[url])}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.bodies[url], {"ETag": etag})
+
+@pytest.mark.asyncio
+async def test_revalidates_with_conditional_get(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1024)
+    session = FakeSession({"https://cdn.test/a.jpg": b"image-a"})
+    first = await cache.get(session, "https://cdn.test/a.jpg")
+    second = await cache.get(session, "https://cdn.test/a.jpg")
+    assert first.body == second.body == b"image-a"
+    assert session.requests[1][1]["If-None-Match"] == '"7"'
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # The index is rebuilt from disk by a new process
+    reloaded = HttpCache(str(tmp_path), max_bytes=1024)
+    assert (await reloaded.get(session, "https://cdn.test/a.jpg")).body == b"image-a"
+    assert reloaded.hits == 1
+
+@pytest.mark.asyncio
+async def test_bodies_are_shared_and_lru_evicted(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    session = FakeSession({"https://a.test/1": b"12345", "https://b.test/1": b"12345", "https://a.test/2": b"abcdef"})
+    await cache.get(session, "https://a.test/1")
+    await cache.get(session, "https://b.test/1")
+    assert cache.stats()["bytes"] == 5  # Same content stored once
+    await cache.get(session, "https://a.test/2")
+    assert cache.stats()["bytes"] == 6
+    assert cache.evictions == 2
+    assert list(cache.entries) == [cache.key("https://a.test/2")]
+
+@pytest.mark.asyncio
+async def test_concurrent_stores_of_one_body_do_not_collide(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=10 ** 6)
+    body = b"x" * 100000
+    session = FakeSession({f"https://cdn.test/{n}.jpg": body for n in range(8)})
+    await asyncio.gather(*(cache.get(session, f"https://cdn.test/{n}.jpg") for n in range(8)))
+    assert cache.stats()["bytes"] == len(body) and cache.errors == 0
+    digest = cache.entries[cache.key("https://cdn.test/0.jpg")]["digest"]
+    assert cache._read(digest) == body
+    assert os.listdir(tmp_path / "bodies" / digest[:2]) == [digest]
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.config import settings
+from app.jobs import CANCELLED, FAILED, QUEUED, RUNNING, MongoJobStore, SQLiteJobStore, _timestamp, scrape_dedupe_key
+
+async def make_store(tmp_path, max_attempts=3):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=max_attempts)
+    await store.setup()
+    return store
+
+async def set_columns(store, task_id, **values):
+    """Move a job's timestamps without waiting for them"""
+    def update(connection):
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        connection.execute(f"UPDATE scrape_jobs SET {assignments} WHERE task_id = ?", (*values.values(), task_id))
+    await store._run(update)
+
+def past() -> float:
+    return _timestamp(datetime.utcnow()) - 1
+
+@pytest.mark.asyncio
+async def test_lease_is_exclusive_until_heartbeats_stop(tmp_path):
+    store = await make_store(tmp_path)
+    job = await store.enqueue({"category": "nature", "max_images": 5}, message="queued")
+    assert job["status"] == QUEUED
+
+    leased = await store.lease("worker-1")
+    assert leased["task_id"] == job["task_id"]
+    assert leased["status"] == RUNNING and leased["attempts"] == 1
+    assert await store.lease("worker-2") is None
+    assert await store.heartbeat(job["task_id"], "worker-1", "page 1")
+    assert not await store.heartbeat(job["task_id"], "worker-2")
+    assert (await store.get(job["task_id"]))["message"] == "page 1"
+
+    # worker-1 stops heartbeating: its lease expires and another worker takes over
+    await set_columns(store, job["task_id"], lease_expires_at=past())
+    taken = await store.lease("worker-2")
+    assert taken["lease_owner"] == "worker-2" and taken["attempts"] == 2
+    assert not await store.heartbeat(job["task_id"], "worker-1")
+    # A late completion from the old owner is ignored
+    await store.complete(job["task_id"], "worker-1", "done")
+    assert (await store.get(job["task_id"]))["status"] == RUNNING
+
+@pytest.mark.asyncio
+async def test_retries_go_back_to_the_queue_until_out_of_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0)
+    store = await make_store(tmp_path, max_attempts=2)
+    job = await store.enqueue({"category": "nature"}, message="queued")
+
+    await store.lease("worker-1")
+    await store.fail(job["task_id"], "worker-1", "network error", retry=True)
+    retried = await store.get(job["task_id"])
+    assert retried["status"] == QUEUED and retried["lease_owner"] is None
+    assert retried["expires_at"] is None
+
+    assert (await store.lease("worker-1"))["attempts"] == 2
+    await store.fail(job["task_id"], "worker-1", "network error", retry=True)
+    failed = await store.get(job["task_id"])
+    assert failed["status"] == FAILED and failed["expires_at"] is not None
+    assert await store.lease("worker-1") is None
+
+@pytest.mark.asyncio
+async def test_sweep_finishes_abandoned_jobs_and_purges_expired_ones(tmp_path):
+    store = await make_store(tmp_path, max_attempts=1)
+    abandoned = await store.enqueue({"category": "nature"}, message="queued")
+    await store.lease("worker-1")
+    cancelling = await store.enqueue({"category": "cities"}, message="queued")
+    await store.lease("worker-1")
+    await store.cancel(cancelling["task_id"])
+    for job in (abandoned, cancelling):
+        await set_columns(store, job["task_id"], lease_expires_at=past())
+
+    assert await store.sweep() == 2
+    assert (await store.get(abandoned["task_id"]))["status"] == FAILED
+    assert (await store.get(cancelling["task_id"]))["status"] == CANCELLED
+
+    await set_columns(store, abandoned["task_id"], expires_at=past())
+    assert await store.sweep() == 1
+    assert await store.get(abandoned["task_id"]) is None
+    assert await store.get(cancelling["task_id"]) is not None
+
+@pytest.mark.asyncio
+async def test_mongo_events_are_ordered_by_job_sequence():
+    client = AsyncMongoMockClient()
+    store = MongoJobStore(client.db.scrape_jobs, client.db.scrape_job_events, lease_seconds=60, max_attempts=3)
+    await store.setup()
+    job = await store.enqueue({"category": "nature"}, message="queued")
+    await store.add_events(job["task_id"], [{"type": "progress", "data": {"saved": 1}}, {"type": "image", "data": {}}])
+    await store.add_events(job["task_id"], [{"type": "status", "data": {"status": "cancelled"}}])
+    await store.add_events("missing-task", [{"type": "progress", "data": {}}])
+
+    events = await store.get_events(job["task_id"])
+    assert [(event["id"], event["type"]) for event in events] == [("1", "progress"), ("2", "image"), ("3", "status")]
+    assert [event["id"] for event in await store.get_events(job["task_id"], after="2")] == ["3"]
+
+@pytest.mark.asyncio
+async def test_mongo_events_wait_briefly_on_a_sequence_gap():
+    client = AsyncMongoMockClient()
+    store = MongoJobStore(client.db.scrape_jobs, client.db.scrape_job_events, lease_seconds=60, max_attempts=3)
+    job = await store.enqueue({"category": "nature"}, message="queued")
+    # Sequence 2 was reserved by another writer that has not inserted it yet
+    await client.db.scrape_jobs.update_one({"_id": job["task_id"]}, {"$set": {"event_seq": 2}})
+    await store.add_events(job["task_id"], [{"type": "progress", "data": {}}])
+    await client.db.scrape_job_events.insert_one(
+        {"task_id": job["task_id"], "seq": 1, "type": "progress", "data": {}, "created_at": datetime.utcnow()}
+    )
+    assert [event["id"] for event in await store.get_events(job["task_id"])] == ["1"]
+
+    store.EVENT_GAP_GRACE = 0
+    assert [event["id"] for event in await store.get_events(job["task_id"])] == ["1", "3"]
+
+def test_dedupe_key_normalizes_the_request_and_keeps_its_budget():
+    key = scrape_dedupe_key({"category": " Nature ", "url": "HTTPS://Photos.test/Gallery/", "max_images": 5})
+    assert key == scrape_dedupe_key({"category": "nature", "url": "https://photos.test/Gallery", "max_images": 50})
+    assert key != scrape_dedupe_key({"category": "nature", "url": "https://photos.test/Gallery", "sharded": True})
+    assert key != scrape_dedupe_key({"category": "nature", "url": "https://photos.test/Gallery", "max_pages": 3})
+    capped = scrape_dedupe_key({"category": "nature", "deadline_seconds": 60})
+    assert capped != scrape_dedupe_key({"category": "nature", "deadline_seconds": 30})
+    assert capped != scrape_dedupe_key({"category": "nature"})
+
+async def make_mongo_store(tmp_path):
+    client = AsyncMongoMockClient()
+    store = MongoJobStore(client.db.scrape_jobs, client.db.scrape_job_events, lease_seconds=60, max_attempts=3)
+    await store.setup()
+    return store
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make", [make_store, make_mongo_store])
+async def test_find_reusable_serves_requests_for_up_to_as_many_images(tmp_path, make):
+    store = await make(tmp_path)
+    request = {"category": "nature", "max_images": 20}
+    key = scrape_dedupe_key(request)
+    fresh_after = datetime.utcnow() - timedelta(minutes=5)
+    assert await store.find_reusable(key, 20, fresh_after) is None
+
+    job = await store.enqueue(request, message="queued")
+    assert (await store.find_reusable(key, 10, fresh_after))["task_id"] == job["task_id"]
+    assert await store.find_reusable(key, 30, fresh_after) is None
+    assert await store.find_reusable(scrape_dedupe_key({**request, "max_pages": 2}), 10, fresh_after) is None
+
+    # Completed jobs are reused while fresh; cancelled ones never are
+    await store.lease("worker-1")
+    await store.complete(job["task_id"], "worker-1", "done")
+    assert (await store.find_reusable(key, 20, fresh_after))["task_id"] == job["task_id"]
+    assert await store.find_reusable(key, 20, datetime.utcnow() + timedelta(minutes=1)) is None
+    cancelled = await store.enqueue(request, message="queued")
+    await store.cancel(cancelled["task_id"])
+    assert (await store.find_reusable(key, 20, fresh_after))["task_id"] == job["task_id"]
@@ -0,0 +1,50 @@
+import pytest
+from app.scraper.politeness import CircuitBreaker, PolitenessScheduler, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # A failed trial re-opens the circuit straight away
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_throttled_host_slows_down_and_recovers():
+    clock = FakeClock()
+    scheduler = PolitenessScheduler(clock=clock)
+    url = "https://example.com/search/cats"
+    base_rate = scheduler.policy(url).bucket.rate
+    scheduler.record_throttled(url, retry_after=5)
+    policy = scheduler.policy(url)
+    assert policy.bucket.rate == base_rate / 2
+    assert policy.backoff_until == 5
+    # Other hosts and the download limiter are unaffected
+    assert scheduler.policy("https://cdn.example.com/a.jpg", "download").backoff == 0
+    scheduler.record_success(url)
+    assert policy.bucket.rate == base_rate
@@ -0,0 +1,42 @@
+from datetime import datetime
+from types import SimpleNamespace
+import orjson
+from bson import ObjectId
+from app.models import ImageResponse, StatsResponse
+from app.responses import cached_json_response, dumps, etag_for, etag_matches
+
+def test_dumps_serializes_models_by_alias():
+    image = ImageResponse(
+        _id="abc",
+        title="Sunset",
+        image_url="https://cdn.test/sunset.jpg",
+        source_url="https://photos.test/sunset",
+        tags=["sky"],
+        scraped_at=datetime(2024, 1, 2, 3, 4, 5)
+    )
+    stats = StatsResponse(total_images=1, top_tags=[{"_id": "sky", "count": 1}], source_breakdown=[])
+    payload = orjson.loads(dumps({"images": [image], "stats": stats, "oid": ObjectId("65a000000000000000000000")}))
+    assert payload["images"][0]["_id"] == "abc"
+    assert payload["images"][0]["image_url"] == "https://cdn.test/sunset.jpg"
+    assert payload["images"][0]["scraped_at"] == "2024-01-02T03:04:05"
+    assert payload["stats"]["total_images"] == 1
+    assert payload["oid"] == "65a000000000000000000000"
+
+def test_etag_matches_lists_and_weak_tags():
+    etag = etag_for(b"[]")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+def test_cached_json_response_answers_304():
+    body = b'{"total_images": 1}'
+    first = cached_json_response(SimpleNamespace(headers={}), body, "public, max-age=60")
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=60"
+    request = SimpleNamespace(headers={"if-none-match": first.headers["etag"]})
+    second = cached_json_response(request, body, "public, max-age=60")
+    assert second.status_code == 304
+    assert second.body == b""
+    assert second.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app.api.routes import get_job_store
+from app.config import settings
+from app.jobs import SQLiteJobStore
+from app.main import app
+from app.scheduler import PRIORITIES, QueueFullError, admit, client_id_for
+
+client = TestClient(app)
+
+def make_request(host, headers=None):
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/scrape",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": (host, 50000)
+    })
+
+async def make_store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=3)
+    await store.setup()
+    return store
+
+@pytest.fixture
+def job_store(tmp_path):
+    store = asyncio.run(make_store(tmp_path))
+    app.dependency_overrides[get_job_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_job_store, None)
+
+def test_client_id_header_is_only_trusted_from_configured_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+    assert client_id_for(make_request("203.0.113.7", {"X-Client-Id": "someone-else"})) == "203.0.113.7"
+    assert client_id_for(make_request("10.1.2.3", {"X-Client-Id": "user-42"})) == "user-42"
+    assert client_id_for(make_request("10.1.2.3")) == "10.1.2.3"
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+    assert client_id_for(make_request("10.1.2.3", {"X-Client-Id": "user-42"})) == "10.1.2.3"
+
+@pytest.mark.asyncio
+async def test_admit_enforces_the_global_and_per_client_bounds(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPE_QUEUE_LIMIT", 3)
+    monkeypatch.setattr(settings, "SCRAPE_MAX_QUEUED_PER_CLIENT", 2)
+    store = await make_store(tmp_path)
+    for category in ("nature", "cities"):
+        await admit(store, "client-a")
+        await store.enqueue({"category": category}, message="queued", client_id="client-a")
+    with pytest.raises(QueueFullError) as error:
+        await admit(store, "client-a")
+    assert "this client" in error.value.message and error.value.retry_after >= 5
+
+    await admit(store, "client-b")
+    await store.enqueue({"category": "nature"}, message="queued", client_id="client-b")
+    with pytest.raises(QueueFullError) as error:
+        await admit(store, "client-c")
+    assert "queue is full" in error.value.message
+
+@pytest.mark.asyncio
+async def test_jobs_are_leased_by_priority_then_round_robin_across_clients(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPE_MAX_CONCURRENT", 0)
+    store = await make_store(tmp_path)
+    a1 = await store.enqueue({"category": "a1"}, message="queued", client_id="a")
+    a2 = await store.enqueue({"category": "a2"}, message="queued", client_id="a")
+    b1 = await store.enqueue({"category": "b1"}, message="queued", client_id="b")
+    urgent = await store.enqueue({"category": "urgent"}, message="queued", client_id="a", priority=PRIORITIES["high"])
+    low = await store.enqueue({"category": "low"}, message="queued", client_id="c", priority=PRIORITIES["low"])
+
+    expected = [urgent, a1, b1, a2, low]
+    positions = [await store.queue_position(await store.get(job["task_id"])) for job in expected]
+    assert positions == [1, 2, 3, 4, 5]
+    leased = [await store.lease("worker-1") for _ in expected]
+    assert [job["task_id"] for job in leased] == [job["task_id"] for job in expected]
+    assert await store.queue_position(await store.get(a1["task_id"])) is None
+
+def test_scrape_answers_429_once_the_client_has_too_many_queued(job_store, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPE_MAX_QUEUED_PER_CLIENT", 2)
+    first = client.post("/api/v1/scrape", json={"category": "nature", "max_images": 10})
+    second = client.post("/api/v1/scrape", json={"category": "cities", "max_images": 10})
+    assert [first.json()["queue_position"], second.json()["queue_position"]] == [1, 2]
+
+    # A self-chosen X-Client-Id does not get the caller a fresh allowance
+    response = client.post(
+        "/api/v1/scrape",
+        json={"category": "sports", "max_images": 10},
+        headers={"X-Client-Id": "somebody-new"}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 5
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import time
+import pytest
+import pytest_asyncio
+from mongomock_motor import AsyncMongoMockClient
+from app import cloudflare_r2
+from app.config import settings
+from app.database import Database
+from app.models import ImageCreate
+from app.scraper.base_scraper import STATIC_HTML, BaseScraper
+from app.scraper.selenium_scraper import SeleniumScraper
+
+class FakeSite(BaseScraper):
+    """One page of results served from a list, newest first"""
+
+    name = "fakesite"
+    strategy = STATIC_HTML
+    search_url = "https://photos.test/search/{category}"
+    page_url = "https://photos.test/search/{category}?page={page}"
+
+    def __init__(self, numbers):
+        self.numbers = numbers
+
+    def parse(self, body, page_url):
+        return [
+            {"image_url": f"https://photos.test/{number}.jpg", "title": f"Photo {number}", "width": 800, "height": 600}
+            for number in self.numbers
+        ]
+
+def image_id(number):
+    return hashlib.md5(f"https://photos.test/{number}.jpg".encode()).hexdigest()
+
+@pytest_asyncio.fixture
+async def database():
+    database = Database()
+    database.client = AsyncMongoMockClient()
+    database.db = database.client.test
+    for name in ("images", "stats", "scrape_yield", "crawl_checkpoints", "image_claims"):
+        setattr(database, name, database.db[name])
+    await database.images.create_index("image_url", unique=True)
+    return database
+
+async def crawl(database, numbers):
+    """Run one crawl of "nature" over FakeSite; returns the numbers it downloaded"""
+    scraper = SeleniumScraper()
+    scraper.db = database
+    scraper.adapters = [FakeSite(numbers)]
+    downloaded = []
+
+    async def fetch_page(url):
+        scraper.counters["pages_visited"] += 1
+        return "<html></html>"
+
+    async def store_image(image_data, category):
+        # Stored like the real scraper does: R2 copy in image_url, original in source_url
+        downloaded.append(int(image_data["image_url"].rsplit("/", 1)[1][:-4]))
+        return ImageCreate(
+            title=image_data["title"],
+            image_url=f"https://r2.test/{image_data['id']}.jpg",
+            source_url=image_data["image_url"],
+            tags=image_data["tags"],
+            category=category
+        )
+
+    scraper.fetch_page = fetch_page
+    scraper.store_image = store_image
+    [image async for image in scraper.scrape_images_iter("nature", max_images=100)]
+    return downloaded
+
+@pytest.mark.asyncio
+async def test_crawl_saves_a_checkpoint_of_the_images_it_stored(database):
+    assert await crawl(database, [1, 2, 3]) == [1, 2, 3]
+    checkpoints = await database.get_crawl_checkpoints(["fakesite"], ["nature"])
+    assert checkpoints[("fakesite", "nature")] == [image_id(1), image_id(2), image_id(3)]
+
+@pytest.mark.asyncio
+async def test_recrawl_stops_at_a_run_of_known_images(database, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPER_CHECKPOINT_STOP_RUN", 3)
+    await crawl(database, [1, 2, 3, 4, 5])
+    # Two new images on top, then the previous crawl's results
+    assert await crawl(database, [7, 6, 1, 2, 3, 4, 5]) == [7, 6]
+    checkpoint = (await database.get_crawl_checkpoints(["fakesite"], ["nature"]))[("fakesite", "nature")]
+    assert checkpoint[:5] == [image_id(number) for number in (7, 6, 1, 2, 3)]
+    assert len(checkpoint) == 7
+    assert await database.images.count_documents({}) == 7
+
+@pytest.mark.asyncio
+async def test_images_stored_before_the_checkpoint_are_not_downloaded_again(database):
+    await crawl(database, [1, 2])
+    await database.crawl_checkpoints.delete_many({})
+    # Found by their original URL, which stored images keep in source_url
+    assert await crawl(database, [2, 3, 1]) == [3]
+    stored = await database.get_image_by_source_url("https://photos.test/1.jpg")
+    assert stored.id and str(stored.image_url) == f"https://r2.test/{image_id(1)}.jpg"
+
+class SlowS3:
+    def put_object(self, **kwargs):
+        time.sleep(0.3)
+
+@pytest.mark.asyncio
+async def test_r2_upload_does_not_block_the_event_loop(monkeypatch):
+    monkeypatch.setattr(cloudflare_r2, "s3", SlowS3())
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    url = await cloudflare_r2.upload_image_bytes_to_r2(b"image", "photo.jpg")
+    ticker.cancel()
+    assert url.endswith("/photo.jpg")
+    assert ticks >= 5
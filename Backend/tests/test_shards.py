@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app import worker
+from app.database import CATEGORY_MAPPING
+from app.jobs import CANCELLED, COMPLETED, SQLiteJobStore
+from app.scraper.adapters import get_adapters
+from app.shards import ShardStore, plan_units
+
+def test_units_cover_every_page_of_every_site_and_term():
+    units = plan_units({"category": "Nature", "max_images": 100})
+    keys = {(unit["site"], unit["term"], unit["page"]) for unit in units}
+    assert len(keys) == len(units)
+    assert units[0]["term"] == "nature"
+    for adapter in get_adapters():
+        pages = {unit["page"] for unit in units if unit["site"] == adapter.name}
+        assert pages == (set(range(1, adapter.max_pages + 1)) if adapter.uses_http else {1})
+
+def test_all_backfills_every_category():
+    units = plan_units({"category": "all", "max_images": 10000})
+    assert {unit["category"] for unit in units} == set(CATEGORY_MAPPING)
+
+def make_store():
+    client = AsyncMongoMockClient()
+    return client, ShardStore(client.db.scrape_units, lease_seconds=60, max_attempts=3, claims=client.db.image_claims)
+
+UNITS = [{"category": "nature", "site": "unsplash", "term": "nature", "page": page} for page in (1, 2, 3)]
+
+@pytest.mark.asyncio
+async def test_units_of_an_ended_job_expire_and_are_not_requeued():
+    client, store = make_store()
+    await store.create_units("job-1", UNITS)
+    running = await store.lease("worker-2", "job-1")
+    await store.cancel("job-1")
+    await store.expire("job-1")
+    assert await client.db.scrape_units.count_documents({"expires_at": None}) == 0
+    assert await store.lease("worker-1") is None
+
+    # The unit still running elsewhere fails after the job ended: cancelled, keeping its expiry
+    await store.fail(running["_id"], "worker-2", "Error: timeout")
+    unit = await client.db.scrape_units.find_one({"_id": running["_id"]})
+    assert unit["status"] == CANCELLED and unit["expires_at"]
+
+    # A retry of the job takes its units back
+    await store.create_units("job-1", UNITS)
+    assert await client.db.scrape_units.count_documents({"expires_at": None}) == 3
+
+@pytest.mark.asyncio
+async def test_unit_heartbeat_renews_its_image_claims():
+    client, store = make_store()
+    await store.create_units("job-1", UNITS[:1])
+    unit = await store.lease("worker-1", "job-1")
+    # MongoDB keeps milliseconds
+    old = (datetime.utcnow() - timedelta(minutes=5)).replace(microsecond=0)
+    await client.db.image_claims.insert_many([
+        {"_id": "a", "claimed_at": old, "stored": False, "unit_id": unit["_id"]},
+        {"_id": "b", "claimed_at": old, "stored": True, "unit_id": unit["_id"]},
+        {"_id": "c", "claimed_at": old, "stored": False, "unit_id": "other-unit"}
+    ])
+    assert await store.heartbeat(unit["_id"], "worker-1")
+    claims = {claim["_id"]: claim["claimed_at"] async for claim in client.db.image_claims.find({})}
+    assert claims["a"] > old and claims["b"] == claims["c"] == old
+    assert not await store.heartbeat(unit["_id"], "worker-2")
+
+@pytest.mark.asyncio
+async def test_sharded_job_stopped_early_expires_pending_units(tmp_path, monkeypatch):
+    client, store = make_store()
+    jobs = SQLiteJobStore(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=3)
+    await jobs.setup()
+    monkeypatch.setattr(worker, "shard_store", store)
+    monkeypatch.setattr(worker, "job_store", jobs)
+    monkeypatch.setattr(worker, "plan_units", lambda request: UNITS)
+    job = await jobs.enqueue({"category": "nature", "sharded": True, "max_images": 2}, message="queued")
+    await store.create_units(job["task_id"], UNITS)
+    first = await store.lease("worker-2", job["task_id"])
+    await store.complete(first["_id"], "worker-2", {"saved": 2, "pages_visited": 1})
+
+    outcome = await worker.Worker("worker-1").run_sharded_job(job)
+    assert outcome["status"] == "completed"
+    units = [unit async for unit in client.db.scrape_units.find({"task_id": job["task_id"]})]
+    assert {unit["status"] for unit in units} == {COMPLETED, CANCELLED}
+    assert all(unit.get("expires_at") for unit in units)
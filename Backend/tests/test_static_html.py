@@ -0,0 +1,36 @@
+import pytest
+from app.scraper.static_html import image_candidate, parse_selector, script_content, select
+
+HTML = """
+<html><body>
+  <img src="/logo.svg" alt="Logo">
+  <img src="https://images.pexels.com/photos/1/a.jpeg?w=640&h=427" alt="A cat">
+  <div><img data-src="https://images.pexels.com/photos/2/b.jpeg" width="800" height="600" alt="A dog"/></div>
+  <img src="https://cdn.example.com/photo-3.jpg" alt="Photo">
+</body></html>
+"""
+
+def test_select_matches_attribute_substrings_in_document_order():
+    elements = select(HTML, "img[src*='pexels.com'], img[data-src*='pexels.com']")
+    assert [element["alt"] for element in elements] == ["A cat", "A dog"]
+
+def test_select_supports_prefix_suffix_and_presence():
+    assert len(select(HTML, "img[src^='https://cdn.']")) == 1
+    assert len(select(HTML, "img[src$='.svg']")) == 1
+    assert len(select(HTML, "img[width]")) == 1
+
+def test_unsupported_selector_is_rejected():
+    with pytest.raises(ValueError):
+        parse_selector("div > img")
+
+def test_image_candidate_reads_size_from_cdn_query_string():
+    candidate = image_candidate(select(HTML, "img[alt='A cat']")[0], "https://www.pexels.com/search/cat/")
+    assert (candidate["width"], candidate["height"]) == (640, 427)
+    candidate = image_candidate({"src": "/logo.svg"}, "https://www.pexels.com/search/cat/")
+    assert candidate["image_url"] == "https://www.pexels.com/logo.svg"
+    assert candidate["width"] is None
+
+def test_script_content_returns_embedded_state():
+    html = '<script>var a = 1;</script><script id="__NEXT_DATA__" type="application/json">{"a": "<b>"}</script>'
+    assert script_content(html, "__NEXT_DATA__") == '{"a": "<b>"}'
+    assert script_content(html, "missing") is None
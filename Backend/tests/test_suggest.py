@@ -0,0 +1,38 @@
+from app.suggest import SuggestionIndex, display_title
+
+def test_prefix_lookup_ranks_by_frequency():
+    index = SuggestionIndex(max_terms=100)
+    index.add_images([
+        {"title": "Sports - Football final", "category": "sports", "tags": ["football", "stadium"]},
+        {"title": "Sports - Football fans", "category": "sports", "tags": ["football"]},
+        {"title": "Nature - Forest", "category": "nature", "tags": ["forest"]}
+    ])
+    texts = [s["text"] for s in index.suggest("FO")]
+    assert texts[0] == "football"
+    # A tag and a title with the same text are one term
+    assert sorted(texts[1:]) == ["Football fans", "Football final", "forest"]
+    assert index.suggest("spo") == [{"text": "sports", "kind": "category", "count": 2}]
+    assert index.suggest("xyz") == [] and index.suggest("  ") == []
+    assert display_title("Nature - Forest", "nature") == "Forest"
+
+def test_memory_is_bounded_by_pruning_rare_terms():
+    index = SuggestionIndex(max_terms=10)
+    index.add_images({"title": f"photo {n}", "tags": ["common"]} for n in range(20))
+    assert len(index) <= 10
+    assert index.suggest("com")[0]["count"] == 20
+    assert index.terms == sorted(index.entries)
+
+def test_short_prefixes_rank_every_match():
+    index = SuggestionIndex(max_terms=20000)
+    index.add_images({"title": f"a{n:05d}", "tags": [f"b{n:05d}"] * (n % 7)} for n in range(12000))
+    # The most frequent match sorts after thousands of others
+    index.add_images([{"title": "azure sky", "tags": ["azure"]}] * 9)
+    assert [s["text"] for s in index.suggest("a", limit=3)] == ["azure", "azure sky", "a00000"]
+    assert index.suggest("az")[0] == {"text": "azure", "kind": "tag", "count": 9}
+
+    # Short-prefix lists match a full ranking, also once counts change
+    index.add("b11999", "tag", weight=5)
+    for prefix in ("b", "b1", "b11", "a1"):
+        matches = [term for term in index.entries if term.startswith(prefix)]
+        expected = sorted(matches, key=lambda term: (-index.entries[term][0], term))[:10]
+        assert [s["text"] for s in index.suggest(prefix)] == expected
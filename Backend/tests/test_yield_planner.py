@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from app.scraper.adapters.pexels import PexelsScraper
+from app.scraper.adapters.unsplash import UnsplashScraper
+from app.scraper.yield_planner import YieldPlanner, search_terms_for
+
+SITES = [UnsplashScraper(), PexelsScraper()]
+
+def test_search_terms_are_deduplicated_in_order():
+    terms = search_terms_for("Health")
+    assert terms[0] == "health"
+    assert len(terms) == len(set(terms))
+    assert terms == search_terms_for("health")
+
+def test_untried_pairs_go_first_then_best_yield():
+    stats = {
+        ("unsplash", "cat"): {"pages": 10, "new_images": 5, "duplicates": 5},
+        ("pexels", "cat"): {"pages": 10, "new_images": 200, "duplicates": 10}
+    }
+    planner = YieldPlanner(SITES, ["cat", "dog"], stats)
+    first, second = planner.next(), planner.next()
+    assert {first[1], second[1]} == {"dog"}
+    adapter, term = planner.next()
+    assert (adapter.name, term) == ("pexels", "cat")
+
+def test_pairs_returning_only_duplicates_are_skipped_until_retry():
+    now = datetime.utcnow()
+    stale = {"pages": 5, "new_images": 0, "duplicates": 100}
+    planner = YieldPlanner(SITES[:1], ["cat"], {("unsplash", "cat"): {**stale, "last_run": now}}, now=now)
+    assert planner.next() is None
+    old_run = now - timedelta(days=30)
+    planner = YieldPlanner(SITES[:1], ["cat"], {("unsplash", "cat"): {**stale, "last_run": old_run}}, now=now)
+    assert planner.next() is not None
+
+def test_failure_rate_lowers_a_pair_with_equal_yield():
+    stats = {
+        ("unsplash", "cat"): {"pages": 10, "runs": 4, "new_images": 100, "duplicates": 0, "failures": 2},
+        ("pexels", "cat"): {"pages": 10, "runs": 4, "new_images": 100, "duplicates": 0, "failures": 0}
+    }
+    planner = YieldPlanner(SITES, ["cat"], stats)
+    adapter, _ = planner.next()
+    assert adapter.name == "pexels"
+
+def test_record_charges_every_page_of_a_run():
+    planner = YieldPlanner(SITES[:1], ["cat"], {})
+    adapter, term = planner.next()
+    planner.record(adapter, term, new_images=12, duplicates=3, latency=2.0, failed=False, pages=5)
+    planner.record(adapter, term, new_images=0, duplicates=0, latency=1.0, failed=True)
+    stats = planner.stats[("unsplash", "cat")]
+    assert stats["pages"] == 6 and stats["runs"] == 2 and stats["failures"] == 1
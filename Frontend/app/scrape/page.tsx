@@ -15,7 +15,7 @@ import { Skeleton } from "@/components/ui/skeleton"
 export default function ScrapePage() {
   const [searchQuery, setSearchQuery] = useState("")
   const [maxImages, setMaxImages] = useState(20) // Default to 20 images
-  const { isLoading, startScraping, taskStatus, images, error } = useScraper()
+  const { isLoading, startScraping, taskStatus, progress, images, error } = useScraper()
   const router = useRouter()
 
   const handleScrape = async () => {
@@ -129,6 +129,11 @@ export default function ScrapePage() {
                     {taskStatus.message && (
                       <p className="text-sm text-muted-foreground">{taskStatus.message}</p>
                     )}
+                    {progress && (
+                      <p className="text-xs text-muted-foreground">
+                        {progress.pages_visited} pages · {progress.candidates_found} found · {progress.downloaded} downloaded · {progress.deduped} duplicates · {progress.saved} saved
+                      </p>
+                    )}
                   </div>
                 )}
               </Card>
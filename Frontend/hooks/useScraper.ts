@@ -2,11 +2,27 @@ import { useState, useCallback, useEffect } from 'react';
 import { ApiService } from '@/lib/api-service';
 import { ScrapeRequest, ScrapeResponse, ImageData } from '@/lib/api-config';
 
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1';
+
+// Task states after which the server sends no further updates
+const FINISHED_STATUSES = ['completed', 'failed', 'cancelled'];
+
+export interface ScrapeProgress {
+    pages_visited: number;
+    candidates_found: number;
+    downloaded: number;
+    deduped: number;
+    saved: number;
+    search_term?: string;
+    source?: string;
+}
+
 export const useScraper = () => {
     const [isLoading, setIsLoading] = useState(false);
     const [error, setError] = useState<string | null>(null);
     const [taskId, setTaskId] = useState<string | null>(null);
     const [taskStatus, setTaskStatus] = useState<ScrapeResponse | null>(null);
+    const [progress, setProgress] = useState<ScrapeProgress | null>(null);
     const [images, setImages] = useState<ImageData[]>([]);
 
     const startScraping = useCallback(async (request: ScrapeRequest) => {
@@ -14,9 +30,10 @@ export const useScraper = () => {
             setIsLoading(true);
             setError(null);
             setImages([]);
+            setProgress(null);
             setTaskId(null);
             setTaskStatus(null);
-            
+
             const response = await ApiService.startScraping(request);
             setTaskId(response.task_id);
             setTaskStatus(response);
@@ -32,23 +49,10 @@ export const useScraper = () => {
         try {
             const status = await ApiService.getTaskStatus(taskId);
             setTaskStatus(status);
-
-            if (status.status === 'completed') {
-                // Fetch images when task is completed
-                const fetchedImages = await ApiService.getImages({ 
-                    page: 1, 
-                    limit: 1000,
-                    category: taskStatus?.message?.split("'")[1], // Extract category from message
-                    sort_by: "scraped_at",
-                    sort_order: "desc" // Use string value instead of number
-                });
-                setImages(fetchedImages);
-                setIsLoading(false);
-            } else if (status.status === 'failed') {
-                setError(status.message);
+            if (FINISHED_STATUSES.includes(status.status)) {
+                if (status.status === 'failed') setError(status.message);
                 setIsLoading(false);
             }
-
             return status;
         } catch (err) {
             // If task not found (404), reset the state
@@ -61,20 +65,42 @@ export const useScraper = () => {
             setError(err instanceof Error ? err.message : 'Failed to check task status');
             return null;
         }
-    }, [taskId, taskStatus]);
+    }, [taskId]);
 
-    // Poll for task status when taskId is set
+    // Stream progress and saved images while the task runs
     useEffect(() => {
         if (!taskId) return;
 
-        const pollInterval = setInterval(async () => {
-            const status = await checkTaskStatus();
-            if (!status || status.status === 'completed' || status.status === 'failed') {
-                clearInterval(pollInterval);
+        const source = new EventSource(`${API_BASE_URL}/scrape/${taskId}/events`);
+
+        source.addEventListener('status', (event) => {
+            const data = JSON.parse((event as MessageEvent).data);
+            setTaskStatus({ task_id: taskId, status: data.status, message: data.message });
+            if (FINISHED_STATUSES.includes(data.status)) {
+                if (data.status === 'failed') setError(data.message);
+                setIsLoading(false);
+                source.close();
+            }
+        });
+
+        source.addEventListener('progress', (event) => {
+            setProgress(JSON.parse((event as MessageEvent).data));
+        });
+
+        source.addEventListener('image', (event) => {
+            const image: ImageData = JSON.parse((event as MessageEvent).data);
+            setImages((prev) => (prev.some((img) => img._id === image._id) ? prev : [...prev, image]));
+        });
+
+        source.onerror = () => {
+            // The browser reconnects on its own (resuming via Last-Event-ID);
+            // if the stream was closed for good, fall back to a single status check
+            if (source.readyState === EventSource.CLOSED) {
+                checkTaskStatus();
             }
-        }, 2000); // Poll every 2 seconds
+        };
 
-        return () => clearInterval(pollInterval);
+        return () => source.close();
     }, [taskId, checkTaskStatus]);
 
     return {
@@ -82,8 +108,9 @@ export const useScraper = () => {
         error,
         taskId,
         taskStatus,
+        progress,
         images,
         startScraping,
         checkTaskStatus,
     };
-}; 
\ No newline at end of file
+};